@@ -5,11 +5,10 @@ Starts MCP server, GUI, and system tray in unified architecture.
 """
 
 import os
+import re
 import sys
-import signal
-import asyncio
+from functools import lru_cache
 from pathlib import Path
-import platform
 
 # Configure UTF-8 output for Windows
 if os.name == 'nt':  # Windows
@@ -17,25 +16,35 @@ if os.name == 'nt':  # Windows
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# ASCII stand-ins for emoji when the console can't encode them. Some entries
+# are multi-codepoint (emoji + variation selector), so a regex is used rather
+# than str.translate.
+_EMOJI_FALLBACKS = {
+    "🚀": "[START]",
+    "⚠️": "[WARNING]",
+    "🔌": "[CONNECT]",
+    "🛑": "[STOP]",
+    "🎛️": "[TRAY]",
+    "❌": "[ERROR]",
+    "✅": "[OK]",
+}
+_EMOJI_PATTERN = re.compile("|".join(map(re.escape, _EMOJI_FALLBACKS)))
+
 def safe_print(message):
     """Print with fallback for encoding issues."""
     try:
         print(message, file=sys.stderr)  # All output to stderr for MCP compatibility
     except UnicodeEncodeError:
         # Fallback: replace emojis with simple text
-        fallback = (
-            message.replace("🚀", "[START]")
-                   .replace("⚠️", "[WARNING]")
-                   .replace("🔌", "[CONNECT]")
-                   .replace("🛑", "[STOP]")
-                   .replace("🎛️", "[TRAY]")
-                   .replace("❌", "[ERROR]")
-                   .replace("✅", "[OK]")
-        )
+        fallback = _EMOJI_PATTERN.sub(lambda m: _EMOJI_FALLBACKS[m.group(0)], message)
         print(fallback, file=sys.stderr)
 
+@lru_cache(maxsize=None)
 def is_wsl():
     """Detect if running under Windows Subsystem for Linux."""
+    if os.name != 'posix':
+        return False
+
     try:
         # Check for WSL in /proc/version
         if os.path.exists('/proc/version'):
@@ -67,7 +76,7 @@ def should_enable_gui():
         return False
     
     # Check if we're in a headless environment (no DISPLAY on Linux)
-    if platform.system() == 'Linux' and not os.environ.get('DISPLAY'):
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
         return False
     
     # Default to GUI enabled on Windows and when DISPLAY is available
@@ -75,6 +84,9 @@ def should_enable_gui():
 
 def main():
     """Main entry point using unified architecture."""
+    import asyncio
+    import signal
+
     # Initialize logging first
     from src.logging_config import setup_logging, get_logger
     setup_logging()
@@ -98,35 +110,82 @@ def main():
     
     app = MemoireApp(enable_gui=gui_enabled)
     
+    # Drive the loop manually so signals can be routed into it
+    loop = _new_event_loop()
+    asyncio.set_event_loop(loop)
+    main_task = loop.create_task(app.run())
+    
     # Handle shutdown gracefully
-    def signal_handler(signum, frame):
+    def request_shutdown(signum):
         app_logger.info(f"Received signal {signum}, shutting down...")
         safe_print("\n🛑 Shutting down Memoire...")
-        app.quit_app()
+        try:
+            # Same shutdown path as on Windows and from the tray menu
+            app.quit_app()
+        finally:
+            # quit_app normally exits via SystemExit; stop the main task either way
+            main_task.cancel()
     
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    if os.name == 'nt':
+        # Windows event loops don't support add_signal_handler
+        def signal_handler(signum, frame):
+            app_logger.info(f"Received signal {signum}, shutting down...")
+            safe_print("\n🛑 Shutting down Memoire...")
+            app.quit_app()
+        
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+    else:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, request_shutdown, sig)
     
     try:
         # Run the unified app
         app_logger.info("Starting unified application")
-        success = asyncio.run(app.run())
+        success = loop.run_until_complete(main_task)
         if not success:
             app_logger.error("Application failed to start")
             sys.exit(1)
             
+    except asyncio.CancelledError:
+        app_logger.info("Application cancelled by shutdown signal")
     except KeyboardInterrupt:
         app_logger.info("Received keyboard interrupt")
         safe_print("\n🛑 Received interrupt signal")
     except Exception as e:
-        app_logger.info(f"Error in main process: {e}", exc_info=True)
+        app_logger.exception(f"Error in main process: {e}")
         safe_print(f"❌ Error in main process: {e}")
-        import traceback
-        safe_print(f"📊 Main traceback:\n{traceback.format_exc()}")
         sys.exit(1)
     finally:
+        _close_loop(loop)
         app_logger.info("Application stopped")
         safe_print("✅ Process stopped")
 
+def _new_event_loop():
+    """Create the event loop, using uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        import asyncio
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+def _close_loop(loop):
+    """Cancel leftover tasks and close the loop, as asyncio.run() would."""
+    import asyncio
+
+    try:
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        # Storage calls run in the default executor; let them finish
+        loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
 if __name__ == "__main__":
     main()
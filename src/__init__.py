@@ -19,9 +19,19 @@ __version__ = "0.1.0"
 __author__ = "memoire Team"
 __description__ = "Semantic memory service for LLMs - testground for memoire concepts"
 
-# Import main components for easy access
-from .core import StorageManager, EmbeddingService, MemoryService
-from .models import Project, MemoryFragment, MemoryContext, CognitiveAnchor, SearchOptions, SearchResult
+# Main components are resolved lazily on first access (PEP 562) so that
+# `import src` does not pull in Qdrant, SQLite and the Gemini client.
+_LAZY_EXPORTS = {
+    "StorageManager": ".core.storage",
+    "EmbeddingService": ".core.embedding",
+    "MemoryService": ".core.memory",
+    "Project": ".models",
+    "MemoryFragment": ".models",
+    "MemoryContext": ".models",
+    "CognitiveAnchor": ".models",
+    "SearchOptions": ".models",
+    "SearchResult": ".models",
+}
 
 __all__ = [
     "StorageManager",
@@ -34,3 +44,19 @@ __all__ = [
     "SearchOptions",
     "SearchResult"
 ]
+
+
+def __getattr__(name):
+    """Import exported components on first access and cache them."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,6 +3,7 @@ Memoire Unified Application
 Single class that manages MCP server, GUI, tray, and all services.
 """
 
+import importlib.util
 import os
 import subprocess
 import sys
@@ -40,13 +41,12 @@ def restart_server():
         logger.error(f"Failed to restart server: {e}", exc_info=True)
 
 
-# Tray imports (keep optional)
-try:
-    import pystray
-    from PIL import Image, ImageDraw
-    TRAY_AVAILABLE = True
-except ImportError:
-    TRAY_AVAILABLE = False
+# Tray dependencies (keep optional). Only probe for them here; pystray and
+# PIL are imported by SimplifiedTray when the tray thread actually starts.
+TRAY_AVAILABLE = (
+    importlib.util.find_spec("pystray") is not None
+    and importlib.util.find_spec("PIL") is not None
+)
 
 logger = get_logger(__name__)
 
@@ -84,7 +84,6 @@ class MemoireApp:
         self.gui_visible = False
         
         # Thread safety
-        import threading
         self._gui_lock = threading.Lock()
         
     async def initialize_core_services(self):
@@ -142,11 +141,9 @@ class MemoireApp:
         """Initialize simplified tray system."""
         if not self.enable_gui:
             self.logger.info("GUI disabled - skipping tray initialization")
-            self.logger.info("GUI disabled - running in headless mode")
             return True  # Return True so app continues
             
         if not TRAY_AVAILABLE:
-            self.logger.warning("Tray dependencies not available")
             self.logger.warning("Tray dependencies not available")
             return False
             
@@ -154,12 +151,10 @@ class MemoireApp:
             self.logger.info("Configuring simplified tray system...")
             # Tray will be created later with direct GUI instance reference
             self.logger.info("Tray system configured successfully")
-            self.logger.info("Tray system configured")
             return True
             
         except Exception as e:
             self.logger.error(f"Error initializing tray: {e}", exc_info=True)
-            self.logger.error(f"Tray error: {e}")
             return False
     
 
@@ -175,6 +170,7 @@ class MemoireApp:
             
         def run_tray():
             try:
+                # Importing SimplifiedTray is what loads pystray and PIL
                 self.logger.debug("Importing SimplifiedTray...")
                 from src.tray.simple_tray import SimplifiedTray
                 
@@ -189,7 +185,6 @@ class MemoireApp:
                 
             except Exception as e:
                 self.logger.error(f"Tray thread error: {e}", exc_info=True)
-                self.logger.error(f"Tray thread error: {e}", exc_info=True)
                 
         
         self.logger.info("Starting tray thread...")
@@ -207,7 +202,6 @@ class MemoireApp:
             if self.gui_created and self.gui_instance:
                 # GUI already exists, just show it
                 self.logger.info("Bringing existing GUI to front")
-                self.logger.info("Bringing existing GUI to front")
                 try:
                     self.gui_instance.show_window()
                     self.gui_visible = True
@@ -221,7 +215,6 @@ class MemoireApp:
             if not self.gui_created:
                 # Create new GUI instance
                 self.logger.info("Creating new GUI instance")
-                self.logger.info("Creating new GUI instance")
                 
                 def run_gui():
                     try:
@@ -251,7 +244,6 @@ class MemoireApp:
                         self.gui_instance = None
                         
                     except Exception as e:
-                        self.logger.error(f"GUI error: {e}", exc_info=True)
                         self.logger.error(f"GUI error: {e}", exc_info=True)
                         self.gui_created = False
                         self.gui_instance = None
@@ -260,7 +252,6 @@ class MemoireApp:
                 self.gui_thread.start()
                 
                 self.logger.info("GUI thread started")
-                self.logger.info("GUI thread started")
     
     def hide_gui(self):
         """Hide GUI window."""
@@ -297,38 +288,42 @@ class MemoireApp:
         if not os.getenv("GOOGLE_API_KEY"):
             self.logger.warning("GOOGLE_API_KEY not set")
         
-        # Initialize all components
+        # Initialize all components. The MCP server needs the core services,
+        # but tray/GUI setup does not depend on it and overlaps with MCP init.
         if not await self.initialize_core_services():
             self.logger.error("Core services initialization failed")
             return False
-            
-        if not await self.initialize_mcp_server():
-            self.logger.error("MCP server initialization failed")
-            return False
+        
+        mcp_task = asyncio.create_task(self.initialize_mcp_server())
             
         if not self.initialize_gui_system():
             self.logger.error("GUI system initialization failed")
+            mcp_task.cancel()
             return False
             
         if not self.initialize_tray():
             self.logger.warning("Tray initialization failed, continuing without tray")
-            self.logger.warning("Continuing without system tray")
         
         # Start tray only if GUI is enabled (GUI opens on demand)
         if self.enable_gui:
             self.create_and_start_tray()
-            # Give threads a moment to start
-            await asyncio.sleep(1)
         else:
             self.logger.info("Running in headless mode - no GUI/tray")
         
+        if not await mcp_task:
+            self.logger.error("MCP server initialization failed")
+            return False
+        
         # Run MCP server (this blocks until shutdown)
         self.logger.info("All components started, running MCP server...")
         self.is_running = True
         
+        maintenance_task = asyncio.create_task(self.memory.run_storage_maintenance())
         try:
             await self.mcp_server.run()
         except Exception as e:
             self.logger.error(f"MCP server stopped: {e}")
+        finally:
+            maintenance_task.cancel()
             
         return True
\ No newline at end of file
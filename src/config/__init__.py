@@ -3,19 +3,69 @@ Configuration manager for Memoire.
 Handles JSON config loading, hot reloading, and environment variable overrides.
 """
 
-import json
+import copy
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional
-from threading import Lock
+from threading import Lock, RLock
 
-from src.logging_config import get_logger
 
-logger = get_logger(__name__)
+class _LazyLogger:
+    """Resolve the module logger on first use.
+
+    Almost every module imports config, so importing ``src.logging_config``
+    here (which creates the logs directory) is deferred until something is
+    actually logged.
+    """
+    _logger = None
+
+    def __getattr__(self, name):
+        if self._logger is None:
+            from src.logging_config import get_logger
+            self._logger = get_logger(__name__)
+        return getattr(self._logger, name)
+
+
+logger = _LazyLogger()
+
+# orjson is optional; fall back to the stdlib with identical output options.
+try:
+    import orjson
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+except ImportError:
+    import json
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+# Environment variables that override config values: env var -> (key path, converter)
+_ENV_MAPPINGS = {
+    "GOOGLE_API_KEY": ("api_keys.google", str),
+    "MEMOIRE_USE_MEMORY": ("storage.use_memory", lambda x: x.lower() == "true"),
+    "MEMOIRE_DATA_DIR": ("storage.data_dir", str),
+    "MEMOIRE_LOG_LEVEL": ("logging.level", str),
+    "MEMOIRE_SIMILARITY_THRESHOLD": ("search.similarity_threshold", float),
+    "MEMOIRE_MAX_RESULTS": ("search.max_results", int),
+}
 
 
 class ConfigManager:
-    """Thread-safe configuration manager with hot reload support."""
+    """Thread-safe configuration manager with hot reload support.
+
+    Reads are lock-free: writers build a new dict and publish it with a
+    single attribute assignment, so readers always see a complete snapshot.
+    Each snapshot carries a flattened dotted-path index so ``get()`` is a
+    single dict lookup.
+    """
     
     def __init__(self, config_path: str = "config.json"):
         # Always resolve paths relative to project root
@@ -26,12 +76,37 @@ class ConfigManager:
             self.config_path = Path(config_path)
         
         self._config: Dict[str, Any] = {}
-        self._lock = Lock()
-        self._observers = []
+        self._lock = RLock()  # Serializes writers only
+        self._observers: tuple = ()  # Rebuilt on add/remove, iterated without copying
         
         # Load initial config
         self.load_config()
     
+    @property
+    def _config(self) -> Dict[str, Any]:
+        return self._snapshot[0]
+    
+    @_config.setter
+    def _config(self, value: Dict[str, Any]):
+        # Publish the config and its flat index together so readers never
+        # pair a new config with a stale index.
+        flat: Dict[str, Any] = {}
+        self._flatten(value, flat)
+        self._snapshot = (value, flat)
+    
+    @property
+    def _flat(self) -> Dict[str, Any]:
+        return self._snapshot[1]
+    
+    @classmethod
+    def _flatten(cls, d: Dict[str, Any], flat: Dict[str, Any], prefix: str = ""):
+        """Index every section and leaf of ``d`` by its dotted path."""
+        for key, value in d.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, dict):
+                cls._flatten(value, flat, f"{path}.")
+    
     def load_config(self) -> bool:
         """Load configuration from JSON file with env var overrides."""
         try:
@@ -41,8 +116,7 @@ class ConfigManager:
                     self._config = self._get_default_config()
                     return False
                 
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    self._config = json.load(f)
+                self._config = _loads(self.config_path.read_bytes())
                 
                 # Apply environment variable overrides
                 self._apply_env_overrides()
@@ -55,21 +129,34 @@ class ConfigManager:
             self._config = self._get_default_config()
             return False
     
-    def save_config(self) -> bool:
-        """Save current configuration to JSON file."""
+    def save_config(self, backup: bool = False) -> bool:
+        """Save current configuration to JSON file.
+
+        The file is replaced atomically, so a crash mid-save never leaves a
+        truncated config behind. Pass ``backup=True`` to also keep the
+        previous version as ``.json.bak``.
+        """
         try:
             with self._lock:
-                # Create backup
-                if self.config_path.exists():
-                    backup_path = self.config_path.with_suffix('.json.bak')
-                    # Only create backup if original exists
-                    import shutil
-                    shutil.copy2(self.config_path, backup_path)
-                
-                with open(self.config_path, 'w', encoding='utf-8') as f:
-                    json.dump(self._config, f, indent=2, ensure_ascii=False)
+                new_bytes = _dumps(self._config).encode('utf-8')
                 
-                logger.info(f"Configuration saved to {self.config_path}")
+                # Skip the write (and backup) if the file already holds this
+                # config; observers are still notified, since the in-memory
+                # config may have changed since they last saw it
+                if self.config_path.exists() and self.config_path.read_bytes() == new_bytes:
+                    logger.debug(f"Configuration unchanged, skipping save to {self.config_path}")
+                else:
+                    if backup and self.config_path.exists():
+                        import shutil
+                        backup_path = self.config_path.with_suffix('.json.bak')
+                        shutil.copy2(self.config_path, backup_path)
+
+                    tmp_path = self.config_path.with_suffix('.json.tmp')
+                    tmp_path.write_bytes(new_bytes)
+                    os.replace(tmp_path, self.config_path)
+
+                    logger.info(f"Configuration saved to {self.config_path}")
+
                 self._notify_observers()
                 return True
                 
@@ -79,32 +166,28 @@ class ConfigManager:
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """Get configuration value using dot notation (e.g., 'processing.model')."""
-        with self._lock:
-            keys = key_path.split('.')
-            value = self._config
-            
-            try:
-                for key in keys:
-                    value = value[key]
-                return value
-            except (KeyError, TypeError):
-                return default
+        flat = self._flat
+        if key_path in flat:
+            return flat[key_path]
+        
+        keys = key_path.split('.')
+        value = self._config
+        
+        try:
+            for key in keys:
+                value = value[key]
+            return value
+        except (KeyError, TypeError):
+            return default
     
     def set(self, key_path: str, value: Any, save: bool = True) -> bool:
         """Set configuration value using dot notation."""
         with self._lock:
-            keys = key_path.split('.')
-            config = self._config
+            new_config = copy.deepcopy(self._config)
             
             try:
-                # Navigate to parent
-                for key in keys[:-1]:
-                    if key not in config:
-                        config[key] = {}
-                    config = config[key]
-                
-                # Set value
-                config[keys[-1]] = value
+                self._set_nolock(new_config, key_path, value)
+                self._config = new_config
                 
                 if save:
                     return self.save_config()
@@ -114,18 +197,33 @@ class ConfigManager:
                 logger.error(f"Failed to set config {key_path}: {e}")
                 return False
     
+    @staticmethod
+    def _set_nolock(config: Dict[str, Any], key_path: str, value: Any):
+        """Assign a dotted-path value in ``config`` in place. Caller holds the lock."""
+        keys = key_path.split('.')
+        
+        # Navigate to parent
+        for key in keys[:-1]:
+            if key not in config:
+                config[key] = {}
+            config = config[key]
+        
+        # Set value
+        config[keys[-1]] = value
+    
     def get_section(self, section: str) -> Dict[str, Any]:
         """Get entire configuration section."""
         return self.get(section, {})
     
     def add_observer(self, callback):
         """Add observer for configuration changes."""
-        self._observers.append(callback)
+        with self._lock:
+            self._observers = (*self._observers, callback)
     
     def remove_observer(self, callback):
         """Remove configuration change observer."""
-        if callback in self._observers:
-            self._observers.remove(callback)
+        with self._lock:
+            self._observers = tuple(o for o in self._observers if o is not callback)
     
     def _notify_observers(self):
         """Notify all observers of configuration changes."""
@@ -137,26 +235,24 @@ class ConfigManager:
     
     def _apply_env_overrides(self):
         """Apply environment variable overrides to configuration."""
-        # API Keys
-        if os.getenv("GOOGLE_API_KEY"):
-            self._config.setdefault("api_keys", {})["google"] = os.getenv("GOOGLE_API_KEY")
-        
-        # Override specific settings from env vars
-        env_mappings = {
-            "MEMOIRE_USE_MEMORY": ("storage.use_memory", lambda x: x.lower() == "true"),
-            "MEMOIRE_DATA_DIR": ("storage.data_dir", str),
-            "MEMOIRE_LOG_LEVEL": ("logging.level", str),
-            "MEMOIRE_SIMILARITY_THRESHOLD": ("search.similarity_threshold", float),
-            "MEMOIRE_MAX_RESULTS": ("search.max_results", int),
-        }
-        
-        for env_var, (config_key, converter) in env_mappings.items():
+        overrides = []
+        for env_var, (config_key, converter) in _ENV_MAPPINGS.items():
             env_value = os.getenv(env_var)
             if env_value:
                 try:
-                    self.set(config_key, converter(env_value), save=False)
+                    overrides.append((config_key, converter(env_value)))
                 except Exception as e:
                     logger.warning(f"Failed to apply env override {env_var}: {e}")
+        
+        if not overrides:
+            return
+        
+        # Apply every override to one copy and publish it once
+        with self._lock:
+            new_config = copy.deepcopy(self._config)
+            for config_key, value in overrides:
+                self._set_nolock(new_config, config_key, value)
+            self._config = new_config
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration when file is missing."""
@@ -166,8 +262,12 @@ class ConfigManager:
                 "model": "gemini-embedding-001",
                 "dimension": 3072,
                 "cache_ttl_hours": 24,
+                "cache_dtype": "fp32",
+                "cache_max_size": 10000,
+                "cache_persist": False,
+                "cache_persist_max_entries": 20000,
                 "batch_size": 10,
-                "delay_seconds": 0.1
+                "concurrency": 8
             },
             "processing": {
                 "model": "gemini-2.5-flash",
@@ -188,10 +288,13 @@ class ConfigManager:
                 "data_dir": "data",
                 "use_memory": False,
                 "backup_enabled": True,
+                "optimize_interval_hours": 24,
+                "vacuum_free_page_ratio": 0.25,
                 "qdrant": {
                     "hnsw_m": 16,
                     "hnsw_ef_construct": 100,
-                    "optimizers_default_segment_number": 2
+                    "optimizers_default_segment_number": 2,
+                    "scalar_quantization": True
                 }
             },
             "fragment_limits": {
@@ -239,5 +342,17 @@ class ConfigManager:
         return warnings
 
 
-# Global config instance
-config = ConfigManager()
+# Global config instance, created on first access so that importing this
+# module does not read config.json or scan the environment.
+_config_lock = Lock()
+
+
+def __getattr__(name):
+    if name == "config":
+        with _config_lock:
+            instance = globals().get("config")
+            if instance is None:
+                instance = ConfigManager()
+                globals()["config"] = instance
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
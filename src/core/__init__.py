@@ -13,12 +13,32 @@ Key components:
 - MemoryService: High-level memory operations and search
 """
 
-from .storage import StorageManager
-from .embedding import EmbeddingService  
-from .memory import MemoryService
+# Each component is imported from its own subpackage on first access, so
+# importing one half of the stack does not drag in the others.
+_LAZY_EXPORTS = {
+    "StorageManager": ".storage",
+    "EmbeddingService": ".embedding",
+    "MemoryService": ".memory",
+}
 
 __all__ = [
     "StorageManager",
     "EmbeddingService", 
     "MemoryService"
 ]
+
+
+def __getattr__(name):
+    """Import exported components on first access and cache them."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
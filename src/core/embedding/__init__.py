@@ -5,12 +5,52 @@ This module provides semantic embedding capabilities using external APIs.
 Organized into logical units for maintainability.
 """
 
-from .service import EmbeddingService
-from .cache import EmbeddingCache  
-from .providers import GeminiProvider
+import importlib.util
+import sys
+
+
+def _lazy_module(name):
+    """Register a module whose body only runs on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# The providers module imports google-genai (and grpc/protobuf behind it).
+# Keep it a stub until a provider is actually constructed.
+providers = _lazy_module(f"{__name__}.providers")
+
+_LAZY_EXPORTS = {
+    "EmbeddingService": ".service",
+    "EmbeddingCache": ".cache",
+    "GeminiProvider": ".providers",
+}
 
 __all__ = [
     "EmbeddingService",
     "EmbeddingCache", 
     "GeminiProvider"
 ]
+
+
+def __getattr__(name):
+    """Import exported components on first access and cache them."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,48 +2,401 @@
 Cache management for embeddings.
 
 Handles in-memory caching of embeddings to avoid duplicate API calls.
+Vectors are kept in contiguous matrices (one row per entry) rather than
+as per-entry Python lists, optionally stored as fp16 or int8 to cut memory.
+An optional on-disk tier (memory-mapped vectors plus a SQLite index) keeps
+embeddings across restarts.
 """
 
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import heapq
+import logging
+import mmap
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Any
+
+import numpy as np
 
 from src.logging_config import get_logger
 
 logger = get_logger('memoire.mcp.embedding')
 
+# In-memory cache keys are 16-byte digests. BLAKE3 is optional; blake2b is
+# the fallback. Never persist these: the algorithm depends on the install.
+try:
+    from blake3 import blake3 as _blake3
+
+    def _digest(data: bytes) -> bytes:
+        return _blake3(data).digest(length=16)
+
+except ImportError:
+    def _digest(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _persistent_digest(data: bytes) -> bytes:
+    """16-byte key for the on-disk tier; fixed so keys survive installs changing."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+CacheDtype = Literal["fp32", "fp16", "int8"]
+
+_STORAGE_DTYPES = {
+    "fp32": np.float32,
+    "fp16": np.float16,
+    "int8": np.int8,
+}
+
+
+_DISK_COMMIT_BATCH = 64  # Index writes grouped into one commit
+_DISK_COMMIT_INTERVAL = 1.0  # Seconds an index write may stay uncommitted
+
+
+class _DiskTier:
+    """Persistent embedding store: float32 rows in a memmap, indexed by SQLite.
+    
+    Expiry uses wall-clock time so entries survive restarts. When the file
+    is full, the row of the entry closest to (or furthest past) expiry is
+    reused, so rows never leak. Index writes are committed in batches; a
+    crash loses at most the last uncommitted batch, which is re-embedded.
+    """
+    
+    def __init__(self, directory: Path, capacity: int, dimension: Optional[int]):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self._vecs_path = directory / "vecs.f32"
+        self._lock = threading.Lock()
+        self._pending = 0  # Index writes since the last commit
+        self._last_commit = time.monotonic()
+        self._db = sqlite3.connect(directory / "index.db", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key BLOB PRIMARY KEY,
+                row INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries(expires_at)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.commit()
+        
+        stored = self._db.execute("SELECT value FROM meta WHERE name = 'dimension'").fetchone()
+        stored_dimension = int(stored[0]) if stored else None
+        self.dimension = dimension or stored_dimension
+        self._vecs: Optional[np.memmap] = None
+        self._next_row = 0
+        
+        if self.dimension is not None:
+            self._open(reset=stored_dimension != self.dimension)
+    
+    def _open(self, reset: bool) -> None:
+        """Map the vector file, discarding existing entries if ``reset``."""
+        shape = (self.capacity, self.dimension)
+        expected_size = self.capacity * self.dimension * 4
+        if reset or not self._vecs_path.exists() or self._vecs_path.stat().st_size != expected_size:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dimension', ?)",
+                             (str(self.dimension),))
+            self._commit()
+            self._vecs = np.memmap(self._vecs_path, dtype=np.float32, mode="w+", shape=shape)
+        else:
+            self._vecs = np.memmap(self._vecs_path, dtype=np.float32, mode="r+", shape=shape)
+            # Ask the kernel to start reading existing rows into the page cache
+            raw = getattr(self._vecs, "_mmap", None)
+            if raw is not None and hasattr(mmap, "MADV_WILLNEED"):
+                raw.madvise(mmap.MADV_WILLNEED)
+        
+        self._next_row = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM entries").fetchone()[0]
+        logger.info("Persistent embedding cache opened at %s (%d/%d rows used)",
+                    self._vecs_path.parent, self._next_row, self.capacity)
+    
+    def get(self, key: bytes) -> Optional[tuple[np.ndarray, float]]:
+        """Return (vector copy, wall-clock expiry) for ``key`` if present and unexpired."""
+        if self._vecs is None:
+            return None
+        with self._lock:
+            hit = self._db.execute("SELECT row, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if hit is None or hit[1] <= time.time():
+                return None
+            return np.array(self._vecs[hit[0]]), hit[1]
+    
+    def set(self, key: bytes, vector: np.ndarray, expires_at: float) -> None:
+        """Write ``vector`` for ``key``, reusing the key's row if it already has one."""
+        with self._lock:
+            if self._vecs is None:
+                self.dimension = vector.shape[0]
+                self._open(reset=True)
+            if vector.shape != (self.dimension,):
+                return
+            existing = self._db.execute("SELECT row FROM entries WHERE key = ?", (key,)).fetchone()
+            if existing is not None:
+                row = existing[0]
+            elif self._next_row < self.capacity:
+                row = self._next_row
+                self._next_row += 1
+            else:
+                oldest = self._db.execute(
+                    "SELECT key, row FROM entries ORDER BY expires_at LIMIT 1"
+                ).fetchone()
+                self._db.execute("DELETE FROM entries WHERE key = ?", (oldest[0],))
+                row = oldest[1]
+            self._vecs[row] = vector
+            self._db.execute("INSERT OR REPLACE INTO entries (key, row, expires_at) VALUES (?, ?, ?)",
+                             (key, row, expires_at))
+            self._pending += 1
+            if (self._pending >= _DISK_COMMIT_BATCH
+                    or time.monotonic() - self._last_commit >= _DISK_COMMIT_INTERVAL):
+                self._commit()
+    
+    def _commit(self) -> None:
+        """Commit pending index writes. Caller holds the lock."""
+        self._db.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+    
+    def flush(self) -> None:
+        """Commit any pending index writes."""
+        with self._lock:
+            if self._pending:
+                self._commit()
+    
+    def clear(self) -> None:
+        """Drop all persisted entries (the vector file is reused in place)."""
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._commit()
+            self._next_row = 0
+    
+    def count(self) -> int:
+        """Number of persisted entries, expired or not."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    
+    def close(self) -> None:
+        """Flush vectors to disk and close the index."""
+        with self._lock:
+            if self._vecs is not None:
+                self._vecs.flush()
+            self._commit()
+            self._db.close()
+
+
+_SHARD_COUNT = 16  # Power of two; a key's shard is picked from its first byte
+
+
+class _Shard:
+    """One slice of the in-memory cache, with its own matrix, LRU order and lock.
+    
+    Keys are spread over shards by their first digest byte, so concurrent
+    callers usually lock different shards.
+    """
+    
+    def __init__(self, max_size: int, initial_capacity: int, dtype: CacheDtype):
+        self.lock = threading.Lock()
+        self.dtype = dtype
+        self.max_size = max_size
+        self._capacity = max(1, min(initial_capacity, max_size))
+        self._vecs: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None  # Per-row dequantization scale (int8 only)
+        # Key -> (matrix row, expiry deadline in monotonic ns), in LRU order
+        self.entries: OrderedDict[bytes, tuple[int, int]] = OrderedDict()
+        self._free: List[int] = []
+        self._next_row = 0
+        # Min-heap of (deadline, key) so cleanup only visits expired entries.
+        # Heap items whose deadline no longer matches the entry are stale and
+        # skipped when popped.
+        self._expiry: List[tuple[int, bytes]] = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def read_row(self, row: int) -> np.ndarray:
+        """Return a float32 copy of the vector in ``row``, dequantizing int8 storage."""
+        if self._scales is not None:
+            return self._vecs[row].astype(np.float32) * self._scales[row]
+        return self._vecs[row].astype(np.float32)
+    
+    def store(self, key: bytes, vector: np.ndarray, expires_at: int, dimension: int) -> None:
+        """Place ``vector`` in the shard matrix with a monotonic-ns deadline. Caller holds the lock."""
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_size:
+                oldest_key = next(iter(self.entries))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache full, evicting least recently used key: %s", oldest_key.hex())
+                self.remove(oldest_key)
+                self.evictions += 1
+            row = self._allocate_row(dimension)
+        else:
+            row = entry[0]
+            self.entries.move_to_end(key)
+        if self._scales is not None:
+            peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+            scale = peak / 127 if peak > 0 else 1.0
+            self._vecs[row] = np.clip(np.rint(vector / scale), -127, 127)
+            self._scales[row] = scale
+        else:
+            self._vecs[row] = vector
+        self.entries[key] = (row, expires_at)
+        heapq.heappush(self._expiry, (expires_at, key))
+        
+        # Compact once stale heap entries (from overwrites/removals) dominate
+        if len(self._expiry) > 2 * len(self.entries) + 64:
+            self._expiry = [(exp, k) for k, (_, exp) in self.entries.items()]
+            heapq.heapify(self._expiry)
+    
+    def _allocate_row(self, dimension: int) -> int:
+        """Return a free matrix row, growing the matrix by doubling (up to max_size) when full."""
+        if self._free:
+            return self._free.pop()
+        
+        storage_dtype = _STORAGE_DTYPES[self.dtype]
+        if self._vecs is None:
+            self._vecs = np.empty((self._capacity, dimension), dtype=storage_dtype)
+            if self.dtype == "int8":
+                self._scales = np.empty(self._capacity, dtype=np.float32)
+        elif self._next_row == self._capacity:
+            new_capacity = min(self._capacity * 2, self.max_size)
+            grown = np.empty((new_capacity, dimension), dtype=storage_dtype)
+            grown[:self._capacity] = self._vecs
+            self._vecs = grown
+            if self._scales is not None:
+                grown_scales = np.empty(new_capacity, dtype=np.float32)
+                grown_scales[:self._capacity] = self._scales
+                self._scales = grown_scales
+            self._capacity = new_capacity
+        
+        row = self._next_row
+        self._next_row += 1
+        return row
+    
+    def remove(self, key: bytes) -> None:
+        """Remove entry from the shard. Caller holds the lock."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._free.append(entry[0])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Removed key %s from cache", key.hex())
+    
+    def clear(self) -> int:
+        """Drop every entry. Caller holds the lock."""
+        cleared_count = len(self.entries)
+        self.entries.clear()
+        self._free.clear()
+        self._next_row = 0
+        self._expiry.clear()
+        return cleared_count
+    
+    def count_expired(self, now: int) -> int:
+        """Count entries whose deadline is at or before ``now``, without removing them.
+        
+        Only the heap items already due are visited (a heap item never falls
+        due before its parent), so the cost follows the number of expired
+        entries, not the shard size. Caller holds the lock.
+        """
+        heap = self._expiry
+        expired = 0
+        stack = [0] if heap else []
+        while stack:
+            index = stack.pop()
+            expires_at, key = heap[index]
+            if expires_at > now:
+                continue
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                expired += 1
+            stack.extend(child for child in (2 * index + 1, 2 * index + 2) if child < len(heap))
+        return expired
+    
+    def cleanup_expired(self, now: int) -> int:
+        """Remove entries whose deadline is at or before ``now``. Caller holds the lock."""
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self.remove(key)
+                removed += 1
+        return removed
+
 
 class EmbeddingCache:
-    """In-memory cache for embeddings with TTL support."""
+    """Thread-safe in-memory LRU cache for embeddings with TTL support.
     
-    def __init__(self, ttl_hours: int = 24):
+    Entries are split across 16 shards, each with its own lock, so callers on
+    different threads rarely contend. LRU eviction is per shard, so
+    ``max_size`` is approximate: each shard holds at most
+    ``ceil(max_size / 16)`` entries, and a shard that receives more than its
+    share of keys evicts its own oldest entry even while others have room.
+    The cache never holds more than ``16 * ceil(max_size / 16)`` entries.
+    """
+    
+    eviction_policy = "lru"
+    
+    def __init__(self, ttl_hours: int = 24, dimension: Optional[int] = None,
+                 initial_capacity: int = 1024, dtype: CacheDtype = "fp32",
+                 max_size: int = 10_000, persist_path: Optional[Path] = None,
+                 persist_capacity: int = 20_000):
         """Initialize cache with specified TTL.
         
         Args:
             ttl_hours: Time to live for cache entries in hours
+            dimension: Embedding dimension (taken from the first stored vector if None)
+            initial_capacity: Number of rows to allocate up front; doubles when full
+            dtype: Storage precision. "fp16" halves memory; "int8" quarters it
+                using a symmetric per-row scale. Vectors are returned as floats.
+            max_size: Approximate maximum number of entries. Each shard gets
+                a fixed ``ceil(max_size / 16)`` budget and evicts its own least
+                recently used entry when full, so eviction can start before
+                the cache as a whole reaches ``max_size``
+            persist_path: Directory for the on-disk tier; None keeps the cache
+                in memory only. In-memory misses fall through to disk.
+            persist_capacity: Maximum number of entries kept on disk
         """
-        self._cache: Dict[str, List[float]] = {}
-        self._timestamps: Dict[str, datetime] = {}
+        if dtype not in _STORAGE_DTYPES:
+            raise ValueError(f"Unsupported cache dtype: {dtype}")
+        
+        self.dtype = dtype
+        self._dimension = dimension
+        self._dimension_lock = threading.Lock()
+        self.max_size = max_size
+        shard_max_size = -(-max_size // _SHARD_COUNT)
+        shard_capacity = -(-initial_capacity // _SHARD_COUNT)
+        self._shards = [_Shard(shard_max_size, shard_capacity, dtype) for _ in range(_SHARD_COUNT)]
+        self._model_prefixes: Dict[str, bytes] = {}
         self.ttl = timedelta(hours=ttl_hours)
+        self._ttl_ns = int(self.ttl.total_seconds() * 1_000_000_000)
+        
+        self._disk: Optional[_DiskTier] = None
+        if persist_path is not None:
+            try:
+                self._disk = _DiskTier(Path(persist_path), persist_capacity, dimension)
+                if self._dimension is None:
+                    self._dimension = self._disk.dimension
+            except Exception as e:
+                logger.error(f"Failed to open persistent embedding cache at {persist_path}: {e}", exc_info=True)
         
-        logger.info(f"EmbeddingCache initialized with {ttl_hours}h TTL")
+        logger.info("EmbeddingCache initialized with %sh TTL, max %d entries (%s)", ttl_hours, max_size, dtype)
 
-    def _generate_key(self, text: str, model: str) -> str:
-        """Generate cache key for text and model combination."""
-        combined = f"{model}:{text}"
-        key = hashlib.md5(combined.encode()).hexdigest()
-        return key
+    def _key_data(self, text: str, model: str) -> bytes:
+        """Bytes hashed into the cache keys for a text and model combination."""
+        prefix = self._model_prefixes.get(model)
+        if prefix is None:
+            prefix = self._model_prefixes[model] = model.encode() + b"\x00"
+        return prefix + text.encode()
     
-    def _is_valid(self, key: str) -> bool:
-        """Check if cache entry is still valid."""
-        if key not in self._timestamps:
-            return False
-        
-        age = datetime.now() - self._timestamps[key]
-        is_valid = age < self.ttl
-        return is_valid
+    def _shard_for(self, key: bytes) -> _Shard:
+        """Shard responsible for ``key``."""
+        return self._shards[key[0] & (_SHARD_COUNT - 1)]
     
-    def get(self, text: str, model: str) -> Optional[List[float]]:
+    def get(self, text: str, model: str) -> Optional[np.ndarray]:
         """Get embedding from cache if valid.
         
         Args:
@@ -51,20 +404,40 @@ class EmbeddingCache:
             model: Model used for embedding
             
         Returns:
-            Cached embedding vector or None if not found/expired
+            Cached embedding as a float32 copy, or None if not found/expired
         """
-        key = self._generate_key(text, model)
+        data = self._key_data(text, model)
+        key = _digest(data)
+        shard = self._shard_for(key)
         
-        if key in self._cache and self._is_valid(key):
-            logger.debug(f"Cache hit for key: {key}")
-            return self._cache[key]
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None:
+                row, expires_at = entry
+                if time.monotonic_ns() < expires_at:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Cache hit for key: %s", key.hex())
+                    shard.entries.move_to_end(key)
+                    shard.hits += 1
+                    return shard.read_row(row)
+                
+                # Clean up expired entry
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache miss due to expiration for key: %s", key.hex())
+                shard.remove(key)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Cache miss, key not found: %s", key.hex())
+            shard.misses += 1
         
-        # Clean up expired entry if it exists
-        if key in self._cache:
-            logger.debug(f"Cache miss due to expiration for key: {key}")
-            self._remove(key)
-        else:
-            logger.debug(f"Cache miss, key not found: {key}")
+        if self._disk is not None:
+            persisted = self._disk.get(_persistent_digest(data))
+            if persisted is not None:
+                vector, expires_at = persisted
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Persistent cache hit for key: %s", key.hex())
+                remaining_ns = int((expires_at - time.time()) * 1_000_000_000)
+                self._store(key, vector, time.monotonic_ns() + remaining_ns)
+                return vector
 
         return None
     
@@ -76,25 +449,64 @@ class EmbeddingCache:
             model: Model used for embedding
             embedding: Embedding vector to cache
         """
-        key = self._generate_key(text, model)
-        self._cache[key] = embedding
-        self._timestamps[key] = datetime.now()
+        vector = np.asarray(embedding, dtype=np.float32)
+        data = self._key_data(text, model)
+        key = _digest(data)
+        if not self._store(key, vector, time.monotonic_ns() + self._ttl_ns):
+            return
+        
+        if self._disk is not None:
+            try:
+                self._disk.set(_persistent_digest(data), vector, time.time() + self._ttl_ns / 1_000_000_000)
+            except Exception as e:
+                logger.warning("Failed to persist embedding for key %s: %s", key.hex(), e)
         
-        logger.debug(f"Cached embedding for key: {key}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cached embedding for key: %s", key.hex())
 
-    def _remove(self, key: str) -> None:
-        """Remove entry from cache."""
-        self._cache.pop(key, None)
-        self._timestamps.pop(key, None)
-        logger.debug(f"Removed key {key} from cache")
+    def _store(self, key: bytes, vector: np.ndarray, expires_at: int) -> bool:
+        """Place ``vector`` in its shard with a monotonic-ns deadline.
+        
+        Returns:
+            False if the vector's shape doesn't match the cache dimension
+        """
+        if self._dimension is None:
+            with self._dimension_lock:
+                if self._dimension is None:
+                    self._dimension = vector.shape[0]
+        if vector.shape != (self._dimension,):
+            logger.warning("Not caching embedding with shape %s, expected (%d,)", vector.shape, self._dimension)
+            return False
+        
+        shard = self._shard_for(key)
+        with shard.lock:
+            shard.store(key, vector, expires_at, self._dimension)
+        return True
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        cleared_count = len(self._cache)
-        self._cache.clear()
-        self._timestamps.clear()
+        cleared_count = 0
+        for shard in self._shards:
+            with shard.lock:
+                cleared_count += shard.clear()
+        if self._disk is not None:
+            self._disk.clear()
         
-        logger.info(f"Cache cleared: {cleared_count} entries removed")
+        logger.info("Cache cleared: %d entries removed", cleared_count)
+
+    def flush(self) -> None:
+        """Commit pending writes to the on-disk tier, if any."""
+        if self._disk is not None:
+            try:
+                self._disk.flush()
+            except Exception as e:
+                logger.warning("Failed to flush persistent embedding cache: %s", e)
+
+    def close(self) -> None:
+        """Flush and close the on-disk tier, if any."""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
 
     def cleanup_expired(self) -> int:
         """Remove expired entries from cache.
@@ -102,19 +514,16 @@ class EmbeddingCache:
         Returns:
             Number of entries removed
         """
-        now = datetime.now()
-        expired_keys = [
-            key for key, timestamp in self._timestamps.items()
-            if now - timestamp >= self.ttl
-        ]
-
-        for key in expired_keys:
-            self._remove(key)
+        now = time.monotonic_ns()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.cleanup_expired(now)
         
-        if expired_keys:
-            logger.info(f"Cache cleanup: {len(expired_keys)} expired entries removed")
+        if removed:
+            logger.info("Cache cleanup: %d expired entries removed", removed)
         
-        return len(expired_keys)
+        return removed
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -122,17 +531,32 @@ class EmbeddingCache:
         Returns:
             Dictionary with cache statistics
         """
-        now = datetime.now()
-        valid_entries = sum(
-            1 for timestamp in self._timestamps.values()
-            if now - timestamp < self.ttl
-        )
+        now = time.monotonic_ns()
+        total_entries = 0
+        expired_entries = 0
+        hits = misses = evictions = 0
+        for shard in self._shards:
+            with shard.lock:
+                total_entries += len(shard.entries)
+                expired_entries += shard.count_expired(now)
+                hits += shard.hits
+                misses += shard.misses
+                evictions += shard.evictions
         
+        valid_entries = total_entries - expired_entries
         stats = {
-            "total_entries": len(self._cache),
+            "total_entries": total_entries,
+            "max_size": self.max_size,
             "valid_entries": valid_entries,
-            "expired_entries": len(self._cache) - valid_entries,
-            "hit_ratio": valid_entries / max(len(self._cache), 1),
-            "ttl_hours": self.ttl.total_seconds() / 3600
+            "expired_entries": expired_entries,
+            "hit_ratio": valid_entries / max(total_entries, 1),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / max(hits + misses, 1),
+            "evictions": evictions,
+            "eviction_policy": self.eviction_policy,
+            "ttl_hours": self.ttl.total_seconds() / 3600,
+            "dtype": self.dtype,
+            "persistent_entries": self._disk.count() if self._disk is not None else 0
         }
         return stats
@@ -7,7 +7,8 @@ Each provider handles API-specific authentication and request formatting.
 import asyncio
 import os
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 from pathlib import Path
 from google.genai import types
 
@@ -21,19 +22,58 @@ from ...config import config
 # Load .env from project root
 project_root = Path(__file__).parent.parent.parent.parent
 env_path = project_root / ".env"
-load_dotenv(env_path)
+if env_path.exists():
+    load_dotenv(env_path)
 
 logger = get_logger('memoire.mcp.embedding')
 
 
+@lru_cache(maxsize=1)
+def _resolve_api_key() -> Optional[str]:
+    """Find the Google API key once per process.
+    
+    Checks GOOGLE_API_KEY, then the memoire server entry in
+    .gemini/settings.json (ignoring the placeholder value).
+    """
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if api_key:
+        return api_key
+    
+    try:
+        import json
+        settings_path = project_root / ".gemini" / "settings.json"
+        if settings_path.exists():
+            with open(settings_path, 'r') as f:
+                settings = json.load(f)
+            api_key = settings.get("mcpServers", {}).get("memoire", {}).get("env", {}).get("GOOGLE_API_KEY")
+            if api_key != "your-google-ai-api-key":  # Don't use the placeholder
+                return api_key
+    except Exception as e:
+        logger.warning(f"Could not load API key from .gemini/settings.json: {e}")
+    
+    return None
+
+
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
     
+    # Largest number of texts a single generate_embeddings_batch call accepts
+    max_batch_size: int = 1
+    
     @abstractmethod
-    async def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding(self, text: str, task_type: str = None) -> List[float]:
         """Generate embedding for a single text."""
         pass
     
+    async def generate_embeddings_batch(self, texts: List[str], task_type: str = None) -> List[List[float]]:
+        """Generate embeddings for several texts.
+        
+        Providers whose API accepts multiple inputs per request should
+        override this and raise ``max_batch_size``. The default embeds one
+        text at a time.
+        """
+        return [await self.generate_embedding(text, task_type=task_type) for text in texts]
+    
     @abstractmethod
     def get_dimension(self) -> int:
         """Get the dimension of embeddings produced by this provider."""
@@ -48,6 +88,12 @@ class EmbeddingProvider(ABC):
 class GeminiProvider(EmbeddingProvider):
     """Google Gemini API provider for embeddings."""
     
+    # embed_content accepts up to 100 contents per request
+    max_batch_size = 100
+    
+    # One EmbedContentConfig per task type, built on first use
+    _CONFIG_CACHE: Dict[str, "types.EmbedContentConfig"] = {}
+    
     def __init__(self, api_key: Optional[str] = None, model: str = None):
         """Initialize Gemini provider.
         
@@ -57,20 +103,7 @@ class GeminiProvider(EmbeddingProvider):
         """
         # Get config values if not provided
         
-        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
-
-        if not self.api_key:
-            try:
-                import json
-                settings_path = project_root / ".gemini" / "settings.json"
-                if settings_path.exists():
-                    with open(settings_path, 'r') as f:
-                        settings = json.load(f)
-                        self.api_key = settings.get("mcpServers", {}).get("memoire", {}).get("env", {}).get("GOOGLE_API_KEY")
-                        if self.api_key == "your-google-ai-api-key":
-                            self.api_key = None # Don't use the placeholder
-            except Exception as e:
-                logger.warning(f"Could not load API key from .gemini/settings.json: {e}")
+        self.api_key = api_key or _resolve_api_key()
         
         if model is None:
             config_model = config.get("embedding.model")
@@ -82,6 +115,8 @@ class GeminiProvider(EmbeddingProvider):
         self._dimension = config.get("embedding.dimension")
 
         if not self.api_key:
+            # Don't remember the miss, so a key configured later is picked up
+            _resolve_api_key.cache_clear()
             logger.error("Google API key not found after all checks.")
             raise ValueError(
                 "Google API key not found. Please set GOOGLE_API_KEY environment variable "
@@ -92,7 +127,7 @@ class GeminiProvider(EmbeddingProvider):
         try:
             from google import genai
             self.client = genai.Client(api_key=self.api_key)
-            logger.info(f"GeminiProvider initialized with model: {model}")
+            logger.info("GeminiProvider initialized with model: %s", model)
         except ImportError:
             logger.error("google-genai package not installed.")
             raise ImportError(
@@ -118,9 +153,9 @@ class GeminiProvider(EmbeddingProvider):
         
         try:
             # Call Gemini API
-            config = types.EmbedContentConfig(task_type=task_type) if task_type else None
-            logger.debug(f"Calling Gemini API with model={self.model}, task_type={task_type}")
-            response = self.client.models.embed_content(
+            config = self._embed_config(task_type)
+            logger.debug("Calling Gemini API with model=%s, task_type=%s", self.model, task_type)
+            response = await self.client.aio.models.embed_content(
                 model=self.model,
                 contents=text,
                 config=config
@@ -135,6 +170,52 @@ class GeminiProvider(EmbeddingProvider):
             logger.error(f"Gemini API call failed: {e}", exc_info=True)
             raise RuntimeError(f"Failed to generate embedding: {e}")
     
+    async def generate_embeddings_batch(self, texts: List[str], task_type: str = None) -> List[List[float]]:
+        """Generate embeddings for several texts in one Gemini API call.
+        
+        Args:
+            texts: Texts to embed (at most ``max_batch_size``)
+            task_type: The task type for the embeddings (e.g., 'RETRIEVAL_DOCUMENT')
+            
+        Returns:
+            Embedding vectors, in the same order as ``texts``
+            
+        Raises:
+            RuntimeError: If API call fails
+        """
+        if any(not text or not text.strip() for text in texts):
+            logger.error("generate_embeddings_batch called with empty text")
+            raise ValueError("Text cannot be empty")
+        
+        try:
+            config = self._embed_config(task_type)
+            logger.debug("Calling Gemini API with model=%s, task_type=%s, batch=%d", self.model, task_type, len(texts))
+            response = await self.client.aio.models.embed_content(
+                model=self.model,
+                contents=texts,
+                config=config
+            )
+            
+            embeddings = [embedding.values for embedding in response.embeddings]
+            if len(embeddings) != len(texts):
+                raise RuntimeError(f"expected {len(texts)} embeddings, got {len(embeddings)}")
+            
+            return embeddings
+            
+        except Exception as e:
+            logger.error(f"Gemini batch API call failed: {e}", exc_info=True)
+            raise RuntimeError(f"Failed to generate embeddings: {e}")
+    
+    @classmethod
+    def _embed_config(cls, task_type: Optional[str]) -> Optional["types.EmbedContentConfig"]:
+        """Return the shared EmbedContentConfig for ``task_type`` (None if no task type)."""
+        if not task_type:
+            return None
+        embed_config = cls._CONFIG_CACHE.get(task_type)
+        if embed_config is None:
+            embed_config = cls._CONFIG_CACHE[task_type] = types.EmbedContentConfig(task_type=task_type)
+        return embed_config
+    
     def get_dimension(self) -> int:
         """Get embedding dimension."""
         return self._dimension
@@ -156,7 +237,7 @@ class AnthropicProvider(EmbeddingProvider):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         logger.warning("AnthropicProvider is a placeholder - embeddings API not yet available")
 
-    async def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding(self, text: str, task_type: str = None) -> List[float]:
         """Generate embedding using Anthropic API (not yet available)."""
         logger.error("generate_embedding called on placeholder AnthropicProvider")
         raise NotImplementedError("Anthropic embeddings API not yet available")
@@ -5,11 +5,12 @@ This is the main interface that other parts of the system use.
 """
 
 import asyncio
+from pathlib import Path
 from typing import List, Optional, Dict, Any
 
 from src.logging_config import get_logger
 from .cache import EmbeddingCache
-from .providers import EmbeddingProvider, GeminiProvider
+from . import providers
 from ...config import config
 
 logger = get_logger('memoire.mcp.embedding')
@@ -19,7 +20,7 @@ class EmbeddingService:
     """Main service for generating semantic embeddings."""
     
     def __init__(self, 
-                 provider: Optional[EmbeddingProvider] = None,
+                 provider: Optional["providers.EmbeddingProvider"] = None,
                  cache_ttl_hours: int = None):
         """Initialize embedding service.
         
@@ -32,11 +33,25 @@ class EmbeddingService:
         if cache_ttl_hours is None:
             cache_ttl_hours = config.get("embedding.cache_ttl_hours", 24)
             
-        self.provider = provider or GeminiProvider()
-        self.cache = EmbeddingCache(ttl_hours=cache_ttl_hours)
+        self.provider = provider or providers.GeminiProvider()
+        self.cache = EmbeddingCache(ttl_hours=cache_ttl_hours,
+                                    dtype=config.get("embedding.cache_dtype", "fp32"),
+                                    max_size=config.get("embedding.cache_max_size", 10000),
+                                    persist_path=self._cache_persist_path(),
+                                    persist_capacity=config.get("embedding.cache_persist_max_entries", 20000))
         
         logger.info(f"EmbeddingService initialized with {self.provider.__class__.__name__}")
 
+    @staticmethod
+    def _cache_persist_path() -> Optional[Path]:
+        """Directory for the on-disk embedding cache, or None if disabled."""
+        if not config.get("embedding.cache_persist", False):
+            return None
+        data_dir = Path(config.get("storage.data_dir", "data"))
+        if not data_dir.is_absolute():
+            project_root = Path(__file__).parent.parent.parent.parent  # From src/core/embedding/ to project root
+            data_dir = project_root / data_dir
+        return data_dir / "embedding_cache"
     
     @property
     def dimension(self) -> int:
@@ -48,12 +63,15 @@ class EmbeddingService:
         """Get the model name used by the current provider."""
         return self.provider.get_model_name()
     
-    async def generate_embedding(self, text: str, task_type: str = None) -> List[float]:
+    async def generate_embedding(self, text: str, task_type: str = None,
+                                 _skip_validation: bool = False) -> List[float]:
         """Generate embedding for a single text.
         
         Args:
             text: Text to embed
             task_type: The task type for the embedding (e.g., 'RETRIEVAL_DOCUMENT')
+            _skip_validation: Skip the empty-text check when the caller has
+                already validated ``text``
             
         Returns:
             Embedding vector
@@ -62,7 +80,7 @@ class EmbeddingService:
             ValueError: If text is empty
             RuntimeError: If embedding generation fails
         """
-        if not text or not text.strip():
+        if not _skip_validation and (not text or text.isspace()):
             logger.error("generate_embedding called with empty text")
             raise ValueError("Text cannot be empty")
         
@@ -71,7 +89,7 @@ class EmbeddingService:
         cached_embedding = self.cache.get(text, self.model) # Pass text and model separately
         if cached_embedding is not None:
             logger.debug("Cache hit for text")
-            return cached_embedding
+            return cached_embedding.tolist()
         
         logger.debug("Cache miss, generating new embedding")
         # Generate new embedding
@@ -83,18 +101,25 @@ class EmbeddingService:
 
         return embedding
     
-    async def batch_embeddings(self, texts: List[str], 
+    async def batch_embeddings(self, texts: List[str],
+                             task_type: str = None,
                              batch_size: int = None,
-                             delay_seconds: float = None) -> List[List[float]]:
+                             concurrency: int = None) -> List[List[float]]:
         """Generate embeddings for multiple texts.
         
+        Cache hits are served directly. The remaining texts are sent to the
+        provider in chunks of up to ``batch_size`` texts per request (capped
+        by the provider's ``max_batch_size``), with at most ``concurrency``
+        requests in flight at once.
+        
         Args:
             texts: List of texts to embed
-            batch_size: Number of requests to process before adding delay
-            delay_seconds: Delay between batches to respect rate limits
+            task_type: The task type for the embeddings (e.g., 'RETRIEVAL_DOCUMENT')
+            batch_size: Maximum number of texts per provider request
+            concurrency: Maximum number of simultaneous provider requests
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in the same order as ``texts``
         """
         if not texts:
             logger.warning("batch_embeddings called with empty list")
@@ -104,28 +129,70 @@ class EmbeddingService:
         
         if batch_size is None:
             batch_size = config.get("embedding.batch_size", 10)
-        if delay_seconds is None:
-            delay_seconds = config.get("embedding.delay_seconds", 0.1)
+        if concurrency is None:
+            concurrency = config.get("embedding.concurrency", 8)
+        batch_size = max(1, min(batch_size, self.provider.max_batch_size))
 
         logger.info(f"Generating embeddings for {len(texts)} texts")
         
-        embeddings = []
+        model = self.model
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
         
+        # Group repeated texts so each distinct text is looked up and embedded once
+        positions: Dict[str, List[int]] = {}
         for i, text in enumerate(texts):
-            try:
-                embedding = await self.generate_embedding(text)
-                embeddings.append(embedding)
-                
-                # Add delay between batches to respect rate limits
-                if i > 0 and i % batch_size == 0:
-                    logger.debug(f"Batch limit reached, sleeping for {delay_seconds}s")
-                    await asyncio.sleep(delay_seconds)
-                    
-            except Exception as e:
-                logger.error(f"Failed to generate embedding for text {i}: {e}")
-                # Use zero vector as fallback
-                logger.warning(f"Using zero vector as fallback for text {i}")
-                embeddings.append([0.0] * self.dimension)
+            if not text or not text.strip():
+                logger.error(f"Cannot embed empty text {i}, using zero vector as fallback")
+                embeddings[i] = [0.0] * self.dimension
+                continue
+            positions.setdefault(text, []).append(i)
+        
+        missing: List[str] = []
+        for text, indices in positions.items():
+            cached_embedding = self.cache.get(text, model)
+            if cached_embedding is None:
+                missing.append(text)
+                continue
+            embedding = cached_embedding.tolist()
+            for i in indices:
+                embeddings[i] = embedding
+        
+        logger.debug(f"{len(positions)} distinct texts, {len(missing)} to embed")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def embed_chunk(chunk: List[str]) -> None:
+            async with semaphore:
+                try:
+                    vectors = await self.provider.generate_embeddings_batch(chunk, task_type=task_type)
+                except Exception as e:
+                    logger.error(f"Batch embedding request failed, retrying texts individually: {e}")
+                    vectors = []
+                    for text in chunk:
+                        try:
+                            vectors.append(await self.provider.generate_embedding(text, task_type=task_type))
+                        except Exception as e:
+                            logger.error(f"Failed to generate embedding for text {positions[text][0]}: {e}")
+                            vectors.append(None)
+            
+            for text, vector in zip(chunk, vectors):
+                if vector is None:
+                    # Use zero vector as fallback
+                    for i in positions[text]:
+                        logger.warning(f"Using zero vector as fallback for text {i}")
+                        embeddings[i] = [0.0] * self.dimension
+                    continue
+                self.cache.set(text, model, vector)
+                for i in positions[text]:
+                    embeddings[i] = vector
+        
+        await asyncio.gather(*(
+            embed_chunk(missing[start:start + batch_size])
+            for start in range(0, len(missing), batch_size)
+        ))
+        if missing:
+            # One commit for the whole batch's persisted entries
+            self.cache.flush()
         
         logger.info(f"Successfully generated {len(embeddings)} embeddings")
         return embeddings
@@ -5,8 +5,6 @@ Provides statistics, analytics, and intelligent insights about memory usage and
 """
 
 # TODO: Implement advanced analytics functions:
-# - find_knowledge_gaps
-# - suggest_contexts
 # - analyze_fragment_distribution
 # - get_usage_patterns
 # - find_orphaned_fragments
@@ -14,14 +12,69 @@ Provides statistics, analytics, and intelligent insights about memory usage and
 # - analyze_semantic_clusters
 # - get_memory_health_score
 
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, Iterator, List, Tuple
+
+import numpy as np
 
 from src.logging_config import get_logger
 from ..storage import StorageManager
 from ..embedding import EmbeddingService
+from ...config import config
 
 logger = get_logger('memoire.mcp.memory')
 
+# Rows scored per matrix product; bounds the similarity block to this many rows x N
+_SIMILARITY_BLOCK_ROWS = 1024
+_MIN_SUGGESTED_CONTEXT_SIZE = 3
+
+
+def _nearest_neighbour_similarity(unit: np.ndarray) -> np.ndarray:
+    """Highest cosine similarity of each row to any other row.
+    
+    Rows must be unit length, as stored vectors are, so a dot product is
+    the cosine similarity. Each block is a single BLAS matrix product, which numpy spreads over
+    all cores; memory stays at one block of rows against the full matrix.
+    """
+    best = np.empty(len(unit), dtype=np.float32)
+    for start in range(0, len(unit), _SIMILARITY_BLOCK_ROWS):
+        block = unit[start:start + _SIMILARITY_BLOCK_ROWS] @ unit.T
+        rows = np.arange(len(block))
+        block[rows, rows + start] = -np.inf  # Ignore self-similarity
+        best[start:start + len(block)] = block.max(axis=1)
+    return best
+
+
+def _similar_pairs(unit: np.ndarray, threshold: float) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Index pairs ``(i, j)``, ``i < j``, of unit rows with cosine similarity >= ``threshold``, block by block."""
+    for start in range(0, len(unit), _SIMILARITY_BLOCK_ROWS):
+        # Columns from ``start`` on cover every pair not already emitted
+        block = unit[start:start + _SIMILARITY_BLOCK_ROWS] @ unit[start:].T
+        rows, cols = np.nonzero(np.triu(block >= threshold, k=1))
+        yield rows + start, cols + start
+
+
+def _cluster(unit: np.ndarray, threshold: float) -> List[List[int]]:
+    """Group rows connected by similarity >= ``threshold`` (single linkage)."""
+    parent = list(range(len(unit)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for rows, cols in _similar_pairs(unit, threshold):
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_j] = root_i
+    
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(unit)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
 
 def get_project_stats(storage: StorageManager, embedding_service: EmbeddingService,
                      project_id: str) -> Dict[str, Any]:
@@ -43,7 +96,82 @@ def get_project_stats(storage: StorageManager, embedding_service: EmbeddingServi
     return stats
 
 
+async def find_knowledge_gaps(storage: StorageManager, project_id: str, threshold: float) -> List[str]:
+    """Find fragments that nothing else in the project is close to.
+    
+    Args:
+        storage: Storage manager instance
+        project_id: ID of the project to analyze
+        threshold: Cosine similarity a fragment's nearest neighbour must reach
+            for it not to count as a gap
+        
+    Returns:
+        IDs of isolated fragments, i.e. topics the project covers only once
+    """
+    try:
+        ids, vectors, _ = await asyncio.to_thread(storage.get_project_matrix, project_id)
+        if len(ids) < 2:
+            return []
+        
+        nearest = await asyncio.to_thread(_nearest_neighbour_similarity, vectors.astype(np.float32))
+        gaps = [fragment_id for fragment_id, similarity in zip(ids, nearest.tolist()) if similarity < threshold]
+        logger.info(f"Found {len(gaps)} knowledge gaps among {len(ids)} fragments in project {project_id}")
+        return gaps
+    except Exception as e:
+        logger.error(f"Failed to find knowledge gaps for project {project_id}: {e}", exc_info=True)
+        return []
+
+
+async def suggest_contexts(storage: StorageManager, project_id: str,
+                           threshold: float = None) -> List[Dict[str, Any]]:
+    """Suggest contexts by clustering fragments that are not in any context yet.
+    
+    Args:
+        storage: Storage manager instance
+        project_id: ID of the project to analyze
+        threshold: Cosine similarity linking two fragments into one cluster;
+            defaults to the search similarity threshold
+        
+    Returns:
+        One dictionary per suggested context, largest first, with
+        ``fragment_ids``, ``size`` and up to three content ``previews``
+    """
+    if threshold is None:
+        threshold = config.get("search.similarity_threshold", 0.6)
+    
+    try:
+        ids, vectors, previews = await asyncio.to_thread(storage.get_project_matrix, project_id)
+        contexts = await asyncio.to_thread(storage.list_contexts_by_project, project_id)
+        assigned = {fragment_id for context in contexts for fragment_id in context.fragment_ids}
+        
+        candidates = [i for i, fragment_id in enumerate(ids) if fragment_id not in assigned]
+        if len(candidates) < _MIN_SUGGESTED_CONTEXT_SIZE:
+            return []
+        
+        clusters = await asyncio.to_thread(_cluster, vectors[candidates].astype(np.float32), threshold)
+        
+        suggestions = []
+        for members in clusters:
+            if len(members) < _MIN_SUGGESTED_CONTEXT_SIZE:
+                continue
+            indices = [candidates[m] for m in members]
+            suggestions.append({
+                "fragment_ids": [ids[i] for i in indices],
+                "size": len(indices),
+                "previews": [previews[i] for i in indices[:3]],
+            })
+        suggestions.sort(key=lambda s: s["size"], reverse=True)
+        
+        logger.info(f"Suggested {len(suggestions)} contexts from {len(candidates)} unassigned fragments in project {project_id}")
+        return suggestions
+    except Exception as e:
+        logger.error(f"Failed to suggest contexts for project {project_id}: {e}", exc_info=True)
+        return []
+
+
 # Export functions
 __all__ = [
-    "get_project_stats"
+    "get_project_stats",
+    "find_knowledge_gaps",
+    "suggest_contexts"
 ]
@@ -50,6 +50,7 @@ def create_anchor(storage: StorageManager, project_id: str, title: str,
     if custom_fields is None: custom_fields = {}
     
     anchor_id = str(uuid.uuid4())
+    now = datetime.now()
     anchor = CognitiveAnchor(
         id=anchor_id,
         project_id=project_id,
@@ -60,9 +61,9 @@ def create_anchor(storage: StorageManager, project_id: str, title: str,
         context_ids=context_ids,
         tags=tags,
         custom_fields=custom_fields,
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-        last_accessed=datetime.now()
+        created_at=now,
+        updated_at=now,
+        last_accessed=now
     )
 
     stored_id = storage.create_anchor(anchor)
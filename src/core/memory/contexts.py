@@ -44,6 +44,7 @@ def create_context(storage: StorageManager, project_id: str, name: str,
     if custom_fields is None: custom_fields = {}
     
     context_id = str(uuid.uuid4())
+    now = datetime.now()
     context = MemoryContext(
         id=context_id,
         project_id=project_id,
@@ -53,8 +54,8 @@ def create_context(storage: StorageManager, project_id: str, name: str,
         parent_context_id=parent_context_id,
         custom_fields=custom_fields,
         fragment_count=len(fragment_ids),
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        created_at=now,
+        updated_at=now
     )
 
     stored_id = storage.create_context(context)
@@ -3,7 +3,8 @@
 Handles CRUD operations for cognitive fragments - the basic units of semantic memory.
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import uuid
 
@@ -11,6 +12,7 @@ from src.logging_config import get_logger
 from ...models import MemoryFragment
 from ..storage import StorageManager
 from ..embedding import EmbeddingService
+from ..storage.utils import content_fingerprint
 from ...config import config
 
 logger = get_logger('memoire.mcp.memory')
@@ -36,51 +38,170 @@ async def store_fragment(storage: StorageManager, embedding_service: EmbeddingSe
         anchor_ids: List of anchor IDs that reference this fragment
         
     Returns:
-        Fragment ID of the stored fragment
+        Fragment ID of the stored fragment, or of the existing fragment if the
+        project already holds identical content. The existing fragment gains
+        the given context and anchor IDs; its other metadata is kept.
         
     Raises:
         ValueError: If content is empty or invalid
     """
-    if tags is None: tags = []
-    if custom_fields is None: custom_fields = {}
-    if context_ids is None: context_ids = []
-    if anchor_ids is None: anchor_ids = []
+    content = _checked_content(content)
     
-    # Validate inputs
-    if not content or not content.strip():
+    # Skip embedding and storage entirely for content the project already has
+    content_hash = content_fingerprint(content)
+    existing_id = await asyncio.to_thread(storage.get_fragment_id_by_content_hash, project_id, content_hash)
+    if existing_id:
+        logger.info(f"Fragment content already stored as {existing_id} in project {project_id}, skipping")
+        if context_ids or anchor_ids:
+            await asyncio.to_thread(storage.add_fragment_links,
+                                    {existing_id: (context_ids or [], anchor_ids or [])})
+        return existing_id
+    
+    # Generate embedding (content was validated above)
+    embedding = await embedding_service.generate_embedding(
+        content, task_type='RETRIEVAL_DOCUMENT', _skip_validation=True
+    )
+
+    # Create fragment object
+    fragment = _new_fragment(project_id, content, content_hash, category, tags, source,
+                             custom_fields, context_ids, anchor_ids)
+
+    # Store in database
+    stored_id = await asyncio.to_thread(storage.store_fragment, fragment, embedding)
+    
+    logger.info(f"Stored fragment: {stored_id} in project {project_id}")
+    return stored_id
+
+
+async def store_fragments(storage: StorageManager, embedding_service: EmbeddingService,
+                          project_id: str, items: List[Dict[str, Any]]) -> List[Tuple[Optional[str], bool]]:
+    """Store several fragments with one embedding batch and one storage write.
+    
+    Args:
+        storage: Storage manager instance
+        embedding_service: Embedding service instance
+        project_id: ID of the project the fragments belong to
+        items: One dictionary per fragment with a ``content`` key and,
+            optionally, any other keyword argument of ``store_fragment``
+        
+    Returns:
+        One ``(fragment_id, created)`` pair per item, in order. The ID is the
+        new ID, the ID of existing identical content (in the project or
+        earlier in ``items``), or None if the item's embedding could not be
+        generated; ``created`` is True only for the first item that stored a
+        new fragment. Items sharing content are stored once, with the context
+        and anchor IDs of all of them; existing fragments gain those IDs but
+        keep their other metadata.
+        
+    Raises:
+        ValueError: If any item's content is empty or invalid
+    """
+    contents = [_checked_content(item.get("content")) for item in items]
+    hashes = [content_fingerprint(content) for content in contents]
+    
+    # Content hash -> indices of the items carrying it, in order
+    groups: Dict[str, List[int]] = {}
+    for i, content_hash in enumerate(hashes):
+        groups.setdefault(content_hash, []).append(i)
+    existing = await asyncio.to_thread(storage.get_fragment_ids_by_content_hashes, project_id, list(groups))
+    
+    result: List[Tuple[Optional[str], bool]] = [(None, False)] * len(items)
+    links: Dict[str, Tuple[List[str], List[str]]] = {}
+    to_store: List[Tuple[List[int], List[str], List[str]]] = []
+    for content_hash, indices in groups.items():
+        context_ids, anchor_ids = _merged_links(items[i] for i in indices)
+        existing_id = existing.get(content_hash)
+        if existing_id:
+            logger.info(f"Fragment content already stored as {existing_id} in project {project_id}, skipping")
+            for i in indices:
+                result[i] = (existing_id, False)
+            if context_ids or anchor_ids:
+                links[existing_id] = (context_ids, anchor_ids)
+        else:
+            to_store.append((indices, context_ids, anchor_ids))
+    
+    if links:
+        await asyncio.to_thread(storage.add_fragment_links, links)
+    
+    if to_store:
+        embeddings = await embedding_service.batch_embeddings(
+            [contents[indices[0]] for indices, _, _ in to_store], task_type='RETRIEVAL_DOCUMENT'
+        )
+        
+        new_fragments = []
+        new_embeddings = []
+        for (indices, context_ids, anchor_ids), embedding in zip(to_store, embeddings):
+            first = indices[0]
+            # batch_embeddings falls back to a zero vector when a text fails
+            if not any(embedding):
+                logger.error(f"No embedding for fragment {first} of batch in project {project_id}, not storing it")
+                continue
+            item = items[first]
+            new_fragments.append(_new_fragment(
+                project_id, contents[first], hashes[first], item.get("category", "general"), item.get("tags"),
+                item.get("source", "user"), item.get("custom_fields"), context_ids, anchor_ids
+            ))
+            new_embeddings.append(embedding)
+            for i in indices:
+                result[i] = (new_fragments[-1].id, i == first)
+        
+        if new_fragments:
+            await asyncio.to_thread(storage.store_fragments, new_fragments, new_embeddings)
+            logger.info(f"Stored {len(new_fragments)} fragments in project {project_id}")
+    
+    return result
+
+
+def _merged_links(items: Iterable[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Union of the items' context and anchor IDs, in first-seen order."""
+    context_ids: Dict[str, None] = {}
+    anchor_ids: Dict[str, None] = {}
+    for item in items:
+        context_ids.update(dict.fromkeys(item.get("context_ids") or []))
+        anchor_ids.update(dict.fromkeys(item.get("anchor_ids") or []))
+    return list(context_ids), list(anchor_ids)
+
+
+def _checked_content(content: str) -> str:
+    """Validate fragment content and truncate it to the configured length.
+    
+    Raises:
+        ValueError: If content is empty
+    """
+    if not content or content.isspace():
         logger.error("store_fragment called with empty content")
         raise ValueError("Fragment content cannot be empty")
     
+    # Read on every call; config.get is a lock-free dict lookup and always current
     max_content_length = config.get("fragment_limits.max_content_length", 10000)
-    if len(content) > max_content_length:
-        logger.warning(f"Fragment content is very long ({len(content)} chars), truncating to {max_content_length}")
+    content_length = len(content)
+    if content_length > max_content_length:
+        logger.warning(f"Fragment content is very long ({content_length} chars), truncating to {max_content_length}")
         content = content[:max_content_length] # Truncate content
-    
-    # Generate embedding
-    embedding = await embedding_service.generate_embedding(content, task_type='RETRIEVAL_DOCUMENT')
+    return content
 
-    # Create fragment object
-    fragment_id = str(uuid.uuid4())
-    fragment = MemoryFragment(
-        id=fragment_id,
+
+def _new_fragment(project_id: str, content: str, content_hash: str,
+                  category: str = "general", tags: List[str] = None,
+                  source: str = "user", custom_fields: Dict[str, Any] = None,
+                  context_ids: List[str] = None, anchor_ids: List[str] = None) -> MemoryFragment:
+    """Build a new fragment with a fresh ID and timestamps."""
+    now = datetime.now()
+    return MemoryFragment(
+        id=str(uuid.uuid4()),
         project_id=project_id,
         content=content,
         category=category,
-        tags=tags,
+        tags=tags if tags is not None else [],
         source=source,
-        context_ids=context_ids,
-        anchor_ids=anchor_ids,
-        custom_fields=custom_fields,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        context_ids=context_ids if context_ids is not None else [],
+        anchor_ids=anchor_ids if anchor_ids is not None else [],
+        custom_fields=custom_fields if custom_fields is not None else {},
+        created_at=now,
+        updated_at=now,
+        content_hash=content_hash
     )
 
-    # Store in database
-    stored_id = storage.store_fragment(fragment, embedding)
-    
-    logger.info(f"Stored fragment: {stored_id} in project {project_id}")
-    return stored_id
-
 
 def get_fragment(storage: StorageManager, fragment_id: str) -> Optional[MemoryFragment]:
     """Get fragment by ID.
@@ -96,14 +217,31 @@ def get_fragment(storage: StorageManager, fragment_id: str) -> Optional[MemoryFr
 
 
 async def delete_fragments(storage: StorageManager, fragment_ids: List[str], project_id: str) -> bool:
-    """Delete multiple fragments by their IDs."""
-    try:
-        success = storage.delete_fragments(fragment_ids, project_id)
-        logger.info(f"Deleted {len(fragment_ids)} fragments from project {project_id}")
-        return success
-    except Exception as e:
-        logger.error(f"Error deleting fragments: {e}", exc_info=True)
+    """Delete multiple fragments by their IDs.
+    
+    The SQLite transaction and the batched Qdrant delete run concurrently
+    in worker threads.
+    
+    Returns:
+        True if fragments were deleted from both stores
+    """
+    if not fragment_ids:
+        return True
+    
+    rows_result, points_result = await asyncio.gather(
+        asyncio.to_thread(storage.delete_fragment_rows, fragment_ids),
+        asyncio.to_thread(storage.delete_fragment_points, fragment_ids, project_id),
+        return_exceptions=True,
+    )
+    if isinstance(rows_result, Exception):
+        logger.error(f"Error deleting fragments: {rows_result}", exc_info=rows_result)
+        return False
+    if isinstance(points_result, Exception):
+        logger.error(f"Error deleting vectors of fragments in project {project_id}: {points_result}", exc_info=points_result)
         return False
+    
+    logger.info(f"Deleted {len(fragment_ids)} fragments from project {project_id}")
+    return rows_result
 
 
 # Fragment update functionality removed - use deletion + creation instead
@@ -124,13 +262,14 @@ def validate_fragment_content(content: str, max_length: int = 10000) -> bool:
     Raises:
         ValueError: If content is invalid
     """
-    if not content or not content.strip():
+    if not content or content.isspace():
         logger.error("Validation failed: content is empty")
         raise ValueError("Fragment content cannot be empty")
     
-    if len(content) > max_length:
-        logger.error(f"Validation failed: content length {len(content)} exceeds max_length {max_length}")
-        raise ValueError(f"Fragment content too long: {len(content)} > {max_length}")
+    length = len(content)
+    if length > max_length:
+        logger.error(f"Validation failed: content length {length} exceeds max_length {max_length}")
+        raise ValueError(f"Fragment content too long: {length} > {max_length}")
     
     return True
 
@@ -138,6 +277,7 @@ def validate_fragment_content(content: str, max_length: int = 10000) -> bool:
 # Export functions
 __all__ = [
     "store_fragment",
+    "store_fragments",
     "get_fragment", 
     "validate_fragment_content"
 ]
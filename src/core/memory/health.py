@@ -5,16 +5,17 @@ Provides health checks, maintenance operations, and system monitoring.
 """
 
 # TODO: Implement advanced maintenance functions:
-# - optimize_storage (SQLite VACUUM, Qdrant optimization)
 # - backup_project
 # - restore_project
 # - validate_data_integrity
 
+import asyncio
 from typing import Dict, Any
 
 from src.logging_config import get_logger
 from ..storage import StorageManager
 from ..embedding import EmbeddingService
+from ...config import config
 
 logger = get_logger('memoire.mcp.memory')
 
@@ -31,14 +32,19 @@ def health_check(storage: StorageManager, embedding_service: EmbeddingService,
     Returns:
         Dictionary with health status of all components
     """
-    health = {
+    return _build_health(storage.health_check(), embedding_service.get_cache_stats(), default_project_id)
+
+
+def _build_health(storage_health: Dict[str, Any], cache_stats: Dict[str, Any],
+                  default_project_id: str = None) -> Dict[str, Any]:
+    """Assemble the health_check result from already-collected stats."""
+    return {
         "memory_service": True,
         "embedding_service": True,
-        "storage": storage.health_check(),
+        "storage": storage_health,
         "default_project": default_project_id,
-        "cache_stats": embedding_service.get_cache_stats()
+        "cache_stats": cache_stats
     }
-    return health
 
 
 def cleanup_old_cache(embedding_service: EmbeddingService) -> Dict[str, Any]:
@@ -106,14 +112,21 @@ def get_system_metrics(storage: StorageManager, embedding_service: EmbeddingServ
     Returns:
         Dictionary with system metrics
     """
-    metrics = {
-        "storage_health": storage.health_check(),
-        "cache_stats": embedding_service.get_cache_stats(),
+    return _build_metrics(storage.health_check(), embedding_service.get_cache_stats(), embedding_service)
+
+
+def _build_metrics(storage_health: Dict[str, Any], cache_stats: Dict[str, Any],
+                   embedding_service: EmbeddingService) -> Dict[str, Any]:
+    """Assemble the get_system_metrics result from already-collected stats."""
+    return {
+        "storage_health": storage_health,
+        "cache_stats": cache_stats,
         "embedding_provider": embedding_service.provider.__class__.__name__,
         "embedding_model": embedding_service.model,
-        "embedding_dimension": embedding_service.dimension
+        "embedding_dimension": embedding_service.dimension,
+        "cache_policy": cache_stats.get("eviction_policy"),
+        "cache_size": cache_stats.get("total_entries", 0)
     }
-    return metrics
 
 
 def maintenance_report(storage: StorageManager, embedding_service: EmbeddingService,
@@ -128,9 +141,13 @@ def maintenance_report(storage: StorageManager, embedding_service: EmbeddingServ
     Returns:
         Dictionary with maintenance report
     """
+    # Collect each underlying metric once and share it between sections
+    storage_health = storage.health_check()
+    cache_stats = embedding_service.get_cache_stats()
+    
     report = {
-        "system_health": health_check(storage, embedding_service),
-        "system_metrics": get_system_metrics(storage, embedding_service),
+        "system_health": _build_health(storage_health, cache_stats),
+        "system_metrics": _build_metrics(storage_health, cache_stats, embedding_service),
         "recommendations": []
     }
     
@@ -143,19 +160,67 @@ def maintenance_report(storage: StorageManager, embedding_service: EmbeddingServ
             report["project_stats"] = {"error": str(e)}
     
     # Generate basic recommendations
-    cache_stats = embedding_service.get_cache_stats()
     if cache_stats.get("hit_rate", 0) < 0.5:
-        recommendation = "Cache hit rate is low - consider reviewing usage patterns"
+        if cache_stats.get("evictions", 0) > cache_stats.get("hits", 0):
+            # Entries are pushed out before they are reused: the working set
+            # is larger than the cache, or scans are flushing it
+            recommendation = (f"Cache hit rate is low and entries are evicted under {cache_stats.get('eviction_policy', 'lru')} "
+                              "before reuse - consider raising embedding.cache_max_size")
+        else:
+            recommendation = "Cache hit rate is low - consider reviewing usage patterns"
+        report["recommendations"].append(recommendation)
+    
+    free_page_ratio = storage_health.get("sqlite", {}).get("free_page_ratio", 0)
+    if free_page_ratio > config.get("storage.vacuum_free_page_ratio", 0.25):
+        recommendation = f"{free_page_ratio:.0%} of SQLite pages are free - run optimize_storage with vacuum"
         report["recommendations"].append(recommendation)
 
     return report
 
 
+def optimize_storage(storage: StorageManager, vacuum: bool = False) -> Dict[str, Any]:
+    """Optimize SQLite and Qdrant storage.
+    
+    Args:
+        storage: Storage manager instance
+        vacuum: Also rebuild the SQLite database with VACUUM
+        
+    Returns:
+        Dictionary with optimization results
+    """
+    result = storage.optimize_storage(vacuum=vacuum)
+    logger.info(f"Storage optimization finished: {result}")
+    return result
+
+
+async def run_storage_maintenance(storage: StorageManager) -> None:
+    """Optimize storage periodically until cancelled.
+    
+    Every ``storage.optimize_interval_hours`` this runs ``PRAGMA optimize`` and
+    Qdrant optimization, adding VACUUM once the SQLite free-page ratio exceeds
+    ``storage.vacuum_free_page_ratio``.
+    
+    Args:
+        storage: Storage manager instance
+    """
+    while True:
+        await asyncio.sleep(config.get("storage.optimize_interval_hours", 24) * 3600)
+        try:
+            storage_health = await asyncio.to_thread(storage.health_check)
+            free_page_ratio = storage_health.get("sqlite", {}).get("free_page_ratio", 0)
+            vacuum = free_page_ratio > config.get("storage.vacuum_free_page_ratio", 0.25)
+            await asyncio.to_thread(optimize_storage, storage, vacuum)
+        except Exception as e:
+            logger.error(f"Periodic storage maintenance failed: {e}", exc_info=True)
+
+
 # Export functions
 __all__ = [
     "health_check",
     "cleanup_old_cache",
     "clear_all_cache",
     "get_system_metrics",
-    "maintenance_report"
+    "maintenance_report",
+    "optimize_storage",
+    "run_storage_maintenance"
 ]
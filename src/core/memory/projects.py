@@ -6,14 +6,31 @@ Handles creation, configuration, and management of memory projects with flexible
 
 from typing import List, Optional
 from datetime import datetime
-import uuid
 
 from src.logging_config import get_logger
-from ...models import Project
+from ...models import Project, uuid7
 from ..storage import StorageManager
 
 logger = get_logger('memoire.mcp.memory')
 
+_SYSTEM_PROMPT_TEMPLATE = """You are working with a semantic memory system for: {name}
+
+PROJECT DESCRIPTION: {description}
+
+MEMORY STRUCTURE:
+- FRAGMENTS: Store information, insights, notes, and data related to this project
+- CONTEXTS: Organize fragments into thematic groups for coherent navigation  
+- ANCHORS: Mark important reference points and high-value information
+
+USAGE GUIDELINES:
+- Use descriptive categories and tags for fragments
+- Organize related information into contexts
+- Create anchors for critical insights or frequently referenced information
+- Leverage custom fields to capture domain-specific metadata
+- Adapt the organization to the nature of your content
+
+This memory system is completely flexible - organize information in whatever way makes most sense for your specific use case."""
+
 
 async def create_project(storage: StorageManager, name: str, 
                         description: str, system_prompt: str = "") -> str:
@@ -28,7 +45,7 @@ async def create_project(storage: StorageManager, name: str,
     Returns:
         Project ID of the created project
     """
-    project_id = str(uuid.uuid4())
+    project_id = uuid7()  # Time-ordered, for primary-key index locality
     
     project = Project(
         id=project_id,
@@ -57,24 +74,7 @@ async def generate_system_prompt(name: str, description: str) -> str:
     # For now, return a template-based prompt
     # TODO: Use LLM to generate custom system prompt based on description
     
-    prompt = f"""You are working with a semantic memory system for: {name}
-
-PROJECT DESCRIPTION: {description}
-
-MEMORY STRUCTURE:
-- FRAGMENTS: Store information, insights, notes, and data related to this project
-- CONTEXTS: Organize fragments into thematic groups for coherent navigation  
-- ANCHORS: Mark important reference points and high-value information
-
-USAGE GUIDELINES:
-- Use descriptive categories and tags for fragments
-- Organize related information into contexts
-- Create anchors for critical insights or frequently referenced information
-- Leverage custom fields to capture domain-specific metadata
-- Adapt the organization to the nature of your content
-
-This memory system is completely flexible - organize information in whatever way makes most sense for your specific use case."""
-    return prompt
+    return _SYSTEM_PROMPT_TEMPLATE.format_map({"name": name, "description": description})
 
 
 def get_project(storage: StorageManager, project_id: str) -> Optional[Project]:
@@ -4,7 +4,10 @@ Search operations for Memoire memory system.
 Handles semantic search, similarity detection, and intelligent fragment discovery.
 """
 
-from typing import List, Optional, Dict, Any, Union
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import List, Optional, Dict, Any, Union, Tuple
 
 from src.logging_config import get_logger
 from ...models import SearchOptions, SearchResult, MemoryFragment
@@ -13,37 +16,64 @@ from ..embedding import EmbeddingService
 
 logger = get_logger('memoire.mcp.memory')
 
+def _normalize_query(query: str) -> str:
+    """Casefold and collapse whitespace; punctuation is kept, so "C++" and "C" differ."""
+    return " ".join(query.casefold().split())
 
-async def search_memory(storage: StorageManager, embedding_service: EmbeddingService,
-                       query: str, options: SearchOptions = None,
-                       project_ids: Optional[Union[str, List[str]]] = None,
-                       default_project_id: str = None) -> Dict[str, Dict[str, List[SearchResult]]]:
+
+class _SearchResultCache:
+    """Cache of ``search_memory`` results.
+    
+    Keyed by the query with case and spacing normalized, within a
+    namespace (model, target projects, options) and the storage data
+    version it was computed at, so any write makes older entries
+    unreachable. Entries also expire after a short TTL.
     """
-    Search memory using semantic similarity and filters, with mandatory grouping.
     
-    Args:
-        storage: Storage manager instance
-        embedding_service: Embedding service instance
-        query: Search query text
-        options: Search configuration options
-        project_ids: Project(s) to search in (single ID, list of IDs, or None for global search).
-        default_project_id: Default project ID if none specified in options.
-        
-    Returns:
-        A dictionary grouped by project_id, then by context_id, containing lists of SearchResult objects.
-        Example: { "project_id_1": { "context_id_A": [sr1, sr2], "context_id_B": [sr3] }, "project_id_2": { ... } }
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 60):
+        self.max_size = max_size
+        self._ttl_ns = int(ttl_seconds * 1_000_000_000)
+        # (namespace, data version, normalized query) -> (results, expiry deadline), in LRU order
+        self._entries: OrderedDict[Tuple[tuple, int, str], Tuple[List[SearchResult], int]] = OrderedDict()
+    
+    def get(self, namespace: tuple, query: str, version: int) -> Optional[List[SearchResult]]:
+        """Results of the same normalized query at ``version``, if not expired."""
+        key = (namespace, version, _normalize_query(query))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic_ns():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return list(entry[0])
+    
+    def put(self, namespace: tuple, query: str, version: int, results: List[SearchResult]) -> None:
+        key = (namespace, version, _normalize_query(query))
+        self._entries[key] = (list(results), time.monotonic_ns() + self._ttl_ns)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+_result_cache = _SearchResultCache()
+
+# Shared default for calls without options; only ever read or model_copy'd
+_DEFAULT_OPTIONS = SearchOptions()
+
+
+async def _resolve_project_ids(storage: StorageManager,
+                              project_ids: Optional[Union[str, List[str]]],
+                              default_project_id: str = None) -> List[str]:
+    """Turn a ``project_ids`` argument into the list of projects to search.
     
     Raises:
         ValueError: If no project is specified and no default is available.
     """
-    if options is None:
-        options = SearchOptions()
-    
-    # Resolve target project IDs
     target_project_ids: List[str] = []
     if project_ids is None:
         # Global search: get all projects
-        all_projects = storage.list_projects()
+        all_projects = await asyncio.to_thread(storage.list_projects)
         target_project_ids = [p.id for p in all_projects]
     elif isinstance(project_ids, str):
         target_project_ids = [project_ids]
@@ -57,36 +87,189 @@ async def search_memory(storage: StorageManager, embedding_service: EmbeddingSer
             logger.error("Search failed: No project_ids specified and no default_project_id available.")
             raise ValueError("No project specified and no default project available for search.")
     
-    # Generate query embedding
-    query_embedding = await embedding_service.generate_embedding(query)
+    return target_project_ids
 
-    # Perform search and group results
-    grouped_results: Dict[str, Dict[str, List[SearchResult]]] = {}
+
+def _best_per_fragment(results_per_project: List[List[SearchResult]]) -> List[SearchResult]:
+    """Keep one result per fragment (the most similar) in a single pass."""
+    best: Dict[str, SearchResult] = {}
+    for project_search_results in results_per_project:
+        for sr in project_search_results:
+            fragment_id = sr.fragment.id
+            previous = best.get(fragment_id)
+            if previous is None or sr.similarity > previous.similarity:
+                best[fragment_id] = sr
+    return list(best.values())
+
+
+def _group_results(results: List[SearchResult]) -> Dict[str, Dict[str, List[SearchResult]]]:
+    """Group results by project, then by context."""
+    grouped = defaultdict(lambda: defaultdict(list))
+    
+    for sr in results:
+        fragment = sr.fragment
+        # Use the first context ID for grouping; "unassigned" if the fragment has none
+        context_id = fragment.context_ids[0] if fragment.context_ids else "unassigned"
+        grouped[fragment.project_id][context_id].append(sr)
+    
+    return {p_id: dict(project_group) for p_id, project_group in grouped.items()}
+
+
+async def _do_search(storage: StorageManager, embedding_service: EmbeddingService,
+                     query: str, options: SearchOptions,
+                     project_ids: Optional[Union[str, List[str]]] = None,
+                     default_project_id: str = None,
+                     use_result_cache: bool = False) -> List[SearchResult]:
+    """Run a semantic search and return the results as a flat list.
+    
+    Shared by ``search_memory`` (which groups the results) and the search
+    helpers that only need a list. Arguments match ``search_memory``;
+    ``use_result_cache`` serves and stores results through the result cache.
+    
+    Returns:
+        SearchResult objects, project by project in target order, with at
+        most one (the most similar) per fragment
+    
+    Raises:
+        ValueError: If no project is specified and no default is available.
+    """
+    # An explicitly empty selection searches nothing; skip embedding entirely
+    if project_ids is not None and not project_ids:
+        logger.debug("Search called with an empty project selection, returning no results")
+        return []
     
-    for p_id in target_project_ids:
+    target_project_ids = await _resolve_project_ids(storage, project_ids, default_project_id)
+    
+    if use_result_cache:
+        namespace = (embedding_service.model, tuple(target_project_ids), options.model_dump_json())
+        # Read before searching, so results that race a write are stored as stale
+        version = storage.data_version
+        cached = _result_cache.get(namespace, query, version)
+        if cached is not None:
+            logger.debug("Search result cache hit")
+            return cached
+    
+    # Generate query embedding (repeated queries hit the embedding cache)
+    query_embedding = await embedding_service.generate_embedding(query)
+
+    # Search every project concurrently; storage calls are blocking, so each
+    # runs in a worker thread
+    async def search_project(p_id: str) -> List[SearchResult]:
         logger.debug(f"Searching in project_id: {p_id}")
-        # Ensure options are specific to the current project for the search call
-        current_options = options.copy(update={'project_id': p_id})
-        
-        # Perform search for the current project
-        project_search_results = storage.search_fragments(query_embedding, current_options)
+        # Shallow copy without re-validation; only project_id differs per call
+        current_options = options.model_copy(update={'project_id': p_id})
+        project_search_results = await asyncio.to_thread(storage.search_fragments, query_embedding, current_options)
         logger.debug(f"storage.search_fragments returned {len(project_search_results)} results for project {p_id}")
+        return project_search_results
+
+    results_per_project = await asyncio.gather(*(search_project(p_id) for p_id in target_project_ids))
+    
+    logger.info(f"Search returned results for query: {query[:50]}... across {len(target_project_ids)} projects.")
+    
+    results = _best_per_fragment(results_per_project)
+    
+    if use_result_cache:
+        _result_cache.put(namespace, query, version, results)
+    return results
+
+
+async def search_memory(storage: StorageManager, embedding_service: EmbeddingService,
+                       query: str, options: SearchOptions = None,
+                       project_ids: Optional[Union[str, List[str]]] = None,
+                       default_project_id: str = None) -> Dict[str, Dict[str, List[SearchResult]]]:
+    """
+    Search memory using semantic similarity and filters, with mandatory grouping.
+    
+    Args:
+        storage: Storage manager instance
+        embedding_service: Embedding service instance
+        query: Search query text
+        options: Search configuration options
+        project_ids: Project(s) to search in (single ID, list of IDs, or None for global search).
+            An empty list searches nothing and returns an empty dictionary.
+        default_project_id: Default project ID if none specified in options.
+        
+    Returns:
+        A dictionary grouped by project_id, then by context_id, containing lists of SearchResult objects.
+        Example: { "project_id_1": { "context_id_A": [sr1, sr2], "context_id_B": [sr3] }, "project_id_2": { ... } }
+    
+    Raises:
+        ValueError: If no project is specified and no default is available.
+    """
+    if options is None:
+        options = _DEFAULT_OPTIONS
+    
+    results = await _do_search(storage, embedding_service, query, options, project_ids, default_project_id,
+                               use_result_cache=True)
+
+    return _group_results(results)
+
 
-        if project_search_results:
-            grouped_results[p_id] = {}
-            # Group by context within the project
-            for sr in project_search_results:
-                context_id = "unassigned" # Default context if fragment has none
-                if sr.fragment.context_ids:
-                    # Use the first context ID for grouping, or a more sophisticated logic if needed
-                    context_id = sr.fragment.context_ids[0]
-                
-                if context_id not in grouped_results[p_id]:
-                    grouped_results[p_id][context_id] = []
-                grouped_results[p_id][context_id].append(sr)
+async def search_memory_batch(storage: StorageManager, embedding_service: EmbeddingService,
+                              queries: List[str], options: SearchOptions = None,
+                              project_ids: Optional[Union[str, List[str]]] = None,
+                              default_project_id: str = None) -> List[Dict[str, Dict[str, List[SearchResult]]]]:
+    """
+    Run several searches at once, sharing one embedding pass and one Qdrant request per project.
+    
+    All queries are embedded with a single ``batch_embeddings`` call, then
+    each target project answers every query in one ``search_batch`` request.
     
-    logger.info(f"Search returned grouped results for query: {query[:50]}... across {len(target_project_ids)} projects.")
-    return grouped_results
+    Args:
+        storage: Storage manager instance
+        embedding_service: Embedding service instance
+        queries: Search query texts
+        options: Search configuration options, shared by every query
+        project_ids: Project(s) to search in, as for ``search_memory``
+        default_project_id: Default project ID if none specified in options.
+        
+    Returns:
+        One dictionary per query, in order, grouped like the result of ``search_memory``.
+        A query whose embedding could not be generated gets an empty dictionary.
+    
+    Raises:
+        ValueError: If a query is empty, or if no project is specified and no
+            default is available.
+    """
+    if not queries:
+        return []
+    if any(not query or query.isspace() for query in queries):
+        logger.error("search_memory_batch called with an empty query")
+        raise ValueError("Query cannot be empty")
+    if options is None:
+        options = _DEFAULT_OPTIONS
+    
+    # An explicitly empty selection searches nothing; skip embedding entirely
+    if project_ids is not None and not project_ids:
+        logger.debug("Batch search called with an empty project selection, returning no results")
+        return [{} for _ in queries]
+    
+    target_project_ids = await _resolve_project_ids(storage, project_ids, default_project_id)
+    
+    query_embeddings = await embedding_service.batch_embeddings(queries)
+    
+    # batch_embeddings falls back to a zero vector when a text fails; those
+    # queries are not searched and get no results
+    searchable = [i for i, embedding in enumerate(query_embeddings) if any(embedding)]
+    if len(searchable) < len(queries):
+        logger.warning(f"Skipping {len(queries) - len(searchable)} batch queries whose embedding failed")
+    if not searchable:
+        return [{} for _ in queries]
+    searchable_embeddings = [query_embeddings[i] for i in searchable]
+    
+    async def search_project(p_id: str) -> List[List[SearchResult]]:
+        current_options = options.model_copy(update={'project_id': p_id})
+        return await asyncio.to_thread(storage.search_fragments_batch, searchable_embeddings, current_options)
+    
+    results_per_project = await asyncio.gather(*(search_project(p_id) for p_id in target_project_ids))
+    
+    logger.info(f"Batch search ran {len(searchable)} queries across {len(target_project_ids)} projects.")
+    
+    # results_per_project is [project][searched query]; regroup by query
+    grouped: List[Dict[str, Dict[str, List[SearchResult]]]] = [{} for _ in queries]
+    for position, i in enumerate(searchable):
+        grouped[i] = _group_results(_best_per_fragment([project_results[position] for project_results in results_per_project]))
+    return grouped
 
 
 async def search_memory_by_vector(storage: StorageManager, query_vector: List[float], options: SearchOptions) -> List[SearchResult]:
@@ -95,7 +278,7 @@ async def search_memory_by_vector(storage: StorageManager, query_vector: List[fl
         logger.error("Vector search failed: No project_id specified in options.")
         raise ValueError("No project specified for vector search")
 
-    results = storage.search_fragments(query_vector, options)
+    results = await asyncio.to_thread(storage.search_fragments, query_vector, options)
     logger.info(f"Vector search returned {len(results)} results.")
     return results
 
@@ -121,24 +304,21 @@ async def find_similar_fragments(storage: StorageManager, embedding_service: Emb
         logger.error(f"Fragment not found in find_similar_fragments: {fragment_id}")
         raise ValueError(f"Fragment not found: {fragment_id}")
     
-    # Use the fragment's content as the search query
-    options = SearchOptions(
+    # Let Qdrant search with the fragment's stored vector and exclude the
+    # fragment itself; re-embed its content only if that fails
+    try:
+        return await asyncio.to_thread(
+            storage.recommend_fragments, fragment_id, fragment.project_id, limit, 0.3
+        )
+    except Exception as e:
+        logger.warning(f"Stored-vector lookup failed for fragment {fragment_id}, embedding its content: {e}")
+    
+    options = SearchOptions.model_construct(
         project_id=fragment.project_id,
         max_results=limit + 1,  # +1 because we'll filter out the original
         similarity_threshold=0.3  # Lower threshold for similarity search
     )
-
-    # This returns grouped results, so we need to flatten it.
-    grouped_results = await search_memory(
-        storage, embedding_service,
-        fragment.content, options
-    )
-    
-    # Flatten the grouped results into a single list of SearchResult
-    results = []
-    for project_group in grouped_results.values():
-        for context_group in project_group.values():
-            results.extend(context_group)
+    results = await _do_search(storage, embedding_service, fragment.content, options, fragment.project_id)
 
     # Filter out the original fragment
     similar_results = [r for r in results if r.fragment.id != fragment_id]
@@ -162,7 +342,7 @@ async def search_by_category(storage: StorageManager, embedding_service: Embeddi
     Returns:
         List of SearchResult objects in the specified category
     """
-    options = SearchOptions(
+    options = SearchOptions.model_construct(
         project_id=project_id,
         max_results=limit,
         categories=[category],
@@ -172,14 +352,7 @@ async def search_by_category(storage: StorageManager, embedding_service: Embeddi
     # Use query if provided, otherwise use category name for semantic matching
     search_query = query if query else category
 
-    # This returns grouped results, so we need to flatten it.
-    grouped_results = await search_memory(storage, embedding_service, search_query, options)
-    results = []
-    for project_group in grouped_results.values():
-        for context_group in project_group.values():
-            results.extend(context_group)
-
-    return results
+    return await _do_search(storage, embedding_service, search_query, options)
 
 
 async def search_by_tags(storage: StorageManager, embedding_service: EmbeddingService,
@@ -198,7 +371,7 @@ async def search_by_tags(storage: StorageManager, embedding_service: EmbeddingSe
     Returns:
         List of SearchResult objects with the specified tags
     """
-    options = SearchOptions(
+    options = SearchOptions.model_construct(
         project_id=project_id,
         max_results=limit,
         tags=tags,
@@ -208,14 +381,7 @@ async def search_by_tags(storage: StorageManager, embedding_service: EmbeddingSe
     # Use query if provided, otherwise use tags for semantic matching
     search_query = query if query else " ".join(tags)
 
-    # This returns grouped results, so we need to flatten it.
-    grouped_results = await search_memory(storage, embedding_service, search_query, options)
-    results = []
-    for project_group in grouped_results.values():
-        for context_group in project_group.values():
-            results.extend(context_group)
-
-    return results
+    return await _do_search(storage, embedding_service, search_query, options)
 
 
 async def advanced_search(storage: StorageManager, embedding_service: EmbeddingService,
@@ -233,19 +399,13 @@ async def advanced_search(storage: StorageManager, embedding_service: EmbeddingS
     """
     options = SearchOptions(**filters)
     
-    # This returns grouped results, so we need to flatten it.
-    grouped_results = await search_memory(storage, embedding_service, query, options)
-    results = []
-    for project_group in grouped_results.values():
-        for context_group in project_group.values():
-            results.extend(context_group)
-
-    return results
+    return await _do_search(storage, embedding_service, query, options)
 
 
 # Export functions
 __all__ = [
     "search_memory",
+    "search_memory_batch",
     "search_memory_by_vector",
     "find_similar_fragments",
     "search_by_category", 
@@ -5,7 +5,8 @@ Main MemoryService class that coordinates all memory operations while maintainin
 the same API as the original monolithic implementation.
 """
 
-from typing import List, Dict, Any, Optional, Union
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from src.logging_config import get_logger
 
@@ -44,8 +45,32 @@ class MemoryService:
         # Get config instance
         self.config = config
         
+        # Search defaults, resolved once and refreshed on config hot reload
+        self._apply_search_config(config.get_section("search"))
+        config.add_observer(self._on_config_change)
+        
         logger.info("MemoryService initialized (modular architecture)")
 
+    def _apply_search_config(self, search_config: Dict[str, Any]):
+        """Derive the per-call search defaults from the ``search`` config section."""
+        threshold = search_config.get("similarity_threshold", 0.6)
+        max_results = search_config.get("max_results", 50)
+        self._default_max_results = max_results
+        self._gap_threshold = threshold / 2  # Use half of search threshold
+        self._similar_limit = max_results // 10  # Use 1/10th for similar fragments
+        # Shared by every search without explicit options; never mutated
+        self._default_search_options = SearchOptions(
+            similarity_threshold=threshold,
+            max_results=max_results
+        )
+
+    def _on_config_change(self, new_config):
+        """Handle configuration changes for hot reload."""
+        try:
+            self._apply_search_config(new_config.get("search", {}))
+        except Exception as e:
+            logger.error(f"Error during config hot reload in MemoryService: {e}")
+
     # ==================== PROJECT MANAGEMENT ====================
     
     async def create_project(self, name: str, description: str, 
@@ -66,6 +91,10 @@ class MemoryService:
         """Get project by ID."""
         return projects.get_project(self.storage, project_id)
     
+    def project_exists(self, project_id: str) -> bool:
+        """Check whether a project exists without loading it."""
+        return self.storage.project_exists(project_id)
+    
     def list_projects(self) -> List[Project]:
         """List all projects."""
         return projects.list_projects(self.storage)
@@ -79,13 +108,18 @@ class MemoryService:
         self._default_project_id = project_id
         logger.info(f"Set default project: {project_id}")
 
-    def delete_project(self, project_id: str) -> bool:
+    async def delete_project(self, project_id: str) -> bool:
         """Delete a project and all its associated data."""
-        if not self.storage.get_project(project_id):
+        if not await asyncio.to_thread(self.storage.project_exists, project_id):
             logger.error(f"Attempted to delete non-existent project with ID: {project_id}")
             return False
         try:
-            self.storage.delete_project(project_id)
+            # SQLite rows and the Qdrant collection are independent; clear both at once
+            await asyncio.gather(
+                asyncio.to_thread(self.storage.delete_project_rows, project_id),
+                asyncio.to_thread(self.storage.delete_project_collection, project_id),
+            )
+            logger.info(f"Deleted project: {project_id}")
             return True
         except Exception as e:
             logger.error(f"Error deleting project {project_id}: {e}", exc_info=True)
@@ -103,6 +137,10 @@ class MemoryService:
             category, tags, source, custom_fields, context_ids, anchor_ids
         )
     
+    async def store_fragments(self, project_id: str, items: List[Dict[str, Any]]) -> List[Tuple[Optional[str], bool]]:
+        """Store several fragments with one embedding batch; returns ``(fragment_id, created)`` per item."""
+        return await fragments.store_fragments(self.storage, self.embedding, project_id, items)
+    
     def get_fragment(self, fragment_id: str) -> Optional[MemoryFragment]:
         """Get fragment by ID."""
         return fragments.get_fragment(self.storage, fragment_id)
@@ -120,7 +158,7 @@ class MemoryService:
     def list_fragments_by_project(self, project_id: str, limit: int = None) -> List[MemoryFragment]:
         """List fragments for a project."""
         if limit is None:
-            limit = config.get("search.max_results", 50)
+            limit = self._default_max_results
             
         return self.storage.list_fragments_by_project(project_id, limit)
 
@@ -128,40 +166,22 @@ class MemoryService:
 
     def get_project_summary(self, project_id: str) -> Optional[Dict[str, any]]:
         """Get a summary of counts for a project."""
-        if not self.storage.get_project(project_id):
+        summary = self.storage.get_project_counts(project_id)
+        if summary is None:
             logger.error(f"Attempted to get summary for non-existent project with ID: {project_id}")
-            return None
-
-        context_count = self.storage.count_contexts_by_project(project_id)
-        fragment_count = self.storage.count_fragments_by_project(project_id)
-        task_counts = self.storage.count_tasks_by_project(project_id)
-
-        return {
-            "contexts": context_count,
-            "fragments": fragment_count,
-            "tasks": task_counts
-        }
+        return summary
 
     def list_contexts(self, project_id: str) -> List[MemoryContext]:
         """List all contexts for a given project ID."""
-        if not self.storage.get_project(project_id):
+        if not self.storage.project_exists(project_id):
             logger.error(f"Attempted to list contexts for non-existent project with ID: {project_id}")
             return []
         return self.storage.list_contexts_by_project(project_id)
 
     def get_fragments_by_context(self, project_id: str, context_id: str) -> List[MemoryFragment]:
         """Get all fragments belonging to a specific context ID in a project ID."""
-        # Validate project and context exist
-        if not self.storage.get_project(project_id):
-            logger.error(f"Attempted to get fragments for non-existent project with ID: {project_id}")
-            return []
-        context = self.storage.get_context(context_id)
-        if not context or context.project_id != project_id:
-            logger.error(f"Context {context_id} not found or does not belong to project {project_id}")
-            return []
-
-        # Directly query fragments by context_id for a more robust approach
-        return self.storage.get_fragments_by_context(context_id)
+        # Project/context validation happens in the same query as the fetch
+        return self.storage.fetch_fragments_for_context(project_id, context_id)
     
     # ==================== SEARCH OPERATIONS ====================
     
@@ -170,26 +190,23 @@ class MemoryService:
                           options: SearchOptions = None) -> List[SearchResult]:
         """Search memory using semantic similarity and filters."""
         if options is None:
-            # Get default threshold from config
-            threshold = config.get("search.similarity_threshold", 0.6)
-            max_results = config.get("search.max_results", 50)
-            options = SearchOptions(
-                similarity_threshold=threshold,
-                max_results=max_results
-            )
-        
-        # Handle project_ids: convert single string to list, or use None for global search
-        if isinstance(project_ids, str):
-            project_ids_list = [project_ids]
-        elif project_ids is None:
-            project_ids_list = None # Indicates global search
-        else:
-            project_ids_list = project_ids # Already a list
+            options = self._default_search_options
 
         return await search.search_memory(
             self.storage, self.embedding, query, options, project_ids, self._default_project_id
         )
 
+    async def search_memory_batch(self, queries: List[str],
+                                  project_ids: Optional[Union[str, List[str]]] = None,
+                                  options: SearchOptions = None) -> List[Dict[str, Dict[str, List[SearchResult]]]]:
+        """Run several searches with one embedding pass and one Qdrant request per project."""
+        if options is None:
+            options = self._default_search_options
+
+        return await search.search_memory_batch(
+            self.storage, self.embedding, queries, options, project_ids, self._default_project_id
+        )
+
     async def search_memory_by_vector(self, query_vector: List[float], options: SearchOptions) -> List[SearchResult]:
         """Search memory using a pre-computed vector."""
         return await search.search_memory_by_vector(self.storage, query_vector, options)
@@ -198,7 +215,7 @@ class MemoryService:
                                    limit: int = None) -> List[SearchResult]:
         """Find fragments similar to a given fragment."""
         if limit is None:
-            limit = config.get("search.max_results", 50) // 10  # Use 1/10th for similar fragments
+            limit = self._similar_limit
 
         return await search.find_similar_fragments(
             self.storage, self.embedding, fragment_id, limit
@@ -232,14 +249,27 @@ class MemoryService:
         """Add a fragment to a context."""
         return contexts.add_fragment_to_context(self.storage, context_id, fragment_id)
 
-    def delete_context(self, project_id: str, context_id: str) -> bool:
-        """Delete a context by its ID, ensuring it belongs to the correct project."""
-        context = self.storage.get_context(context_id)
+    async def delete_context(self, project_id: str, context_id: str) -> bool:
+        """Delete a context and its fragments, ensuring it belongs to the correct project."""
+        context = await asyncio.to_thread(self.storage.get_context, context_id)
         if not context or context.project_id != project_id:
             logger.warning(f"Context '{context_id}' not found or does not belong to project '{project_id}' for deletion.")
             return False
         
-        return self.storage.delete_context(context.id)
+        # One SQLite transaction for the context and its fragments, overlapped
+        # with a single batched Qdrant delete of their vectors
+        success, points_result = await asyncio.gather(
+            asyncio.to_thread(self.storage.delete_context_rows, context.id, context.fragment_ids),
+            asyncio.to_thread(self.storage.delete_fragment_points, context.fragment_ids, project_id),
+            return_exceptions=True,
+        )
+        if isinstance(points_result, Exception):
+            # Stale vectors only cost search noise; the context itself is gone
+            logger.warning(f"Failed to delete vectors for context {context_id}: {points_result}")
+        if isinstance(success, Exception):
+            logger.error(f"Failed to delete context {context_id}: {success}", exc_info=success)
+            return False
+        return success
     
     # ==================== ANCHOR OPERATIONS ====================
     
@@ -257,6 +287,10 @@ class MemoryService:
         """Get anchor by ID."""
         return anchors.get_anchor(self.storage, anchor_id)
     
+    def list_anchors_by_tag(self, project_id: str, tag: str) -> List[CognitiveAnchor]:
+        """List a project's anchors with a given tag."""
+        return self.storage.list_anchors_by_tag(project_id, tag)
+    
     def access_anchor(self, anchor_id: str):
         """Mark an anchor as accessed (updates access count and timestamp)."""
         return anchors.access_anchor(self.storage, anchor_id)
@@ -270,13 +304,13 @@ class MemoryService:
     async def find_knowledge_gaps(self, project_id: str, threshold: float = None) -> List[str]:
         """Identify potential knowledge gaps in the memory."""
         if threshold is None:
-            threshold = config.get("search.similarity_threshold", 0.6) / 2  # Use half of search threshold
+            threshold = self._gap_threshold
 
-        return await analytics.find_knowledge_gaps(self.storage, self.embedding, project_id, threshold)
+        return await analytics.find_knowledge_gaps(self.storage, project_id, threshold)
     
     async def suggest_contexts(self, project_id: str) -> List[Dict[str, Any]]:
         """Suggest potential contexts based on fragment clustering."""
-        return await analytics.suggest_contexts(self.storage, self.embedding, project_id)
+        return await analytics.suggest_contexts(self.storage, project_id)
     
     # ==================== HEALTH AND MAINTENANCE ====================
     
@@ -290,11 +324,19 @@ class MemoryService:
         result = health.cleanup_old_cache(self.embedding)
         return result
 
+    def optimize_storage(self, vacuum: bool = False) -> Dict[str, Any]:
+        """Optimize SQLite and Qdrant storage, optionally with VACUUM."""
+        return health.optimize_storage(self.storage, vacuum=vacuum)
+    
+    async def run_storage_maintenance(self) -> None:
+        """Optimize storage periodically until cancelled."""
+        await health.run_storage_maintenance(self.storage)
+
     # ==================== TASK MANAGEMENT ====================
 
     def create_task(self, project_id: str, title: str, description: str = "") -> Optional[str]:
         """Create a new task in a project."""
-        if not self.storage.get_project(project_id):
+        if not self.storage.project_exists(project_id):
             logger.error(f"Attempted to create task in non-existent project with ID: {project_id}")
             return None
         task = Task(project_id=project_id, title=title, description=description)
@@ -306,7 +348,7 @@ class MemoryService:
 
     def list_tasks(self, project_id: str, status: Optional[str] = None) -> List[Task]:
         """List tasks for a project, optionally filtering by status."""
-        if not self.storage.get_project(project_id):
+        if not self.storage.project_exists(project_id):
             logger.error(f"Attempted to list tasks for non-existent project with ID: {project_id}")
             return []
         task_status = TaskStatus(status) if status else None
@@ -1,37 +1,45 @@
 """Anchor storage operations."""
 
-import json
-import sqlite3
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from src.logging_config import get_logger
 from ...models import CognitiveAnchor
+from .pool import get_connection
+from .utils import decode_json_column, encode_json_column
 
 logger = get_logger('memoire.mcp.storage')
 
+_SELECT_ANCHOR = "SELECT * FROM anchors WHERE id = ?"
+_SELECT_ANCHORS_BY_TAG = """
+    SELECT a.*
+    FROM anchor_tags t
+    JOIN anchors a ON a.id = t.anchor_id
+    WHERE t.tag = ? AND a.project_id = ?
+"""
+
 def create_anchor(db_path, anchor: CognitiveAnchor) -> str:
     """Create a new cognitive anchor."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO anchors 
-            (id, project_id, title, description, priority, 
-             fragment_ids, context_ids, tags, access_count, custom_fields,
-             created_at, updated_at, last_accessed)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            anchor.id, anchor.project_id, anchor.title,
-            anchor.description, anchor.priority, json.dumps(anchor.fragment_ids),
-            json.dumps(anchor.context_ids), json.dumps(anchor.tags),
-            anchor.access_count, json.dumps(anchor.custom_fields),
-            anchor.created_at, anchor.updated_at, anchor.last_accessed
-        ))
-        
-        conn.commit()
-        conn.close()
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute("""
+                INSERT INTO anchors 
+                (id, project_id, title, description, priority, 
+                 fragment_ids, context_ids, tags, access_count, custom_fields,
+                 created_at, updated_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                anchor.id, anchor.project_id, anchor.title,
+                anchor.description, anchor.priority, encode_json_column(anchor.fragment_ids),
+                encode_json_column(anchor.context_ids), encode_json_column(anchor.tags),
+                anchor.access_count, encode_json_column(anchor.custom_fields),
+                anchor.created_at, anchor.updated_at, anchor.last_accessed
+            ))
+            conn.executemany(
+                "INSERT OR IGNORE INTO anchor_tags (tag, anchor_id) VALUES (?, ?)",
+                [(tag, anchor.id) for tag in anchor.tags]
+            )
         
         logger.info(f"Created anchor: {anchor.title} ({anchor.id})")
         return anchor.id
@@ -42,12 +50,8 @@ def create_anchor(db_path, anchor: CognitiveAnchor) -> str:
 def get_anchor(db_path, anchor_id: str) -> Optional[CognitiveAnchor]:
     """Get anchor by ID."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM anchors WHERE id = ?", (anchor_id,))
-        row = cursor.fetchone()
-        conn.close()
+        conn = get_connection(db_path)
+        row = conn.execute(_SELECT_ANCHOR, (anchor_id,)).fetchone()
         
         if not row:
             return None
@@ -58,21 +62,45 @@ def get_anchor(db_path, anchor_id: str) -> Optional[CognitiveAnchor]:
         logger.error(f"Error getting anchor {anchor_id}: {e}", exc_info=True)
         return None
 
+def get_anchors_by_ids(db_path, anchor_ids: List[str]) -> List[CognitiveAnchor]:
+    """Get several anchors by ID in one query; unknown IDs are skipped."""
+    if not anchor_ids:
+        return []
+    try:
+        conn = get_connection(db_path)
+        placeholders = ",".join("?" for _ in anchor_ids)
+        rows = conn.execute(f"SELECT * FROM anchors WHERE id IN ({placeholders})", anchor_ids).fetchall()
+        return [_row_to_anchor(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting anchors by IDs: {e}", exc_info=True)
+        return []
+
+def list_anchors_by_tag(db_path, project_id: str, tag: str) -> List[CognitiveAnchor]:
+    """List a project's anchors carrying ``tag`` (exact match)."""
+    try:
+        conn = get_connection(db_path)
+        rows = conn.execute(_SELECT_ANCHORS_BY_TAG, (tag, project_id)).fetchall()
+        return [_row_to_anchor(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error listing anchors with tag {tag} in project {project_id}: {e}", exc_info=True)
+        return []
+
 def _row_to_anchor(row) -> CognitiveAnchor:
-    """Convert SQLite row to CognitiveAnchor object."""
+    """Convert an anchors ``sqlite3.Row`` to a CognitiveAnchor object."""
     # No logger here as this is a pure utility function called from logged functions
+    # Timestamps are passed as stored ISO text; the model parses them natively
     return CognitiveAnchor(
-        id=row[0],
-        project_id=row[1],
-        title=row[2],
-        description=row[3] or "",
-        priority=row[4] or "medium",
-        fragment_ids=json.loads(row[5]) if row[5] else [],
-        context_ids=json.loads(row[6]) if row[6] else [],
-        tags=json.loads(row[7]) if row[7] else [],
-        access_count=row[8] or 0,
-        custom_fields=json.loads(row[9]) if row[9] else {},
-        created_at=datetime.fromisoformat(row[10]) if row[10] else datetime.now(),
-        updated_at=datetime.fromisoformat(row[11]) if row[11] else datetime.now(),
-        last_accessed=datetime.fromisoformat(row[12]) if row[12] else datetime.now()
+        id=row["id"],
+        project_id=row["project_id"],
+        title=row["title"],
+        description=row["description"] or "",
+        priority=row["priority"] or "medium",
+        fragment_ids=decode_json_column(row["fragment_ids"], list),
+        context_ids=decode_json_column(row["context_ids"], list),
+        tags=decode_json_column(row["tags"], list),
+        access_count=row["access_count"] or 0,
+        custom_fields=decode_json_column(row["custom_fields"], dict),
+        created_at=row["created_at"] or datetime.now(),
+        updated_at=row["updated_at"] or datetime.now(),
+        last_accessed=row["last_accessed"] or datetime.now()
     )
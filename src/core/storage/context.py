@@ -1,37 +1,53 @@
 """Context storage operations."""
 
-import json
-import sqlite3
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+from pydantic import TypeAdapter
 
 from src.logging_config import get_logger
 from ...models import MemoryContext
+from .pool import get_connection
+from .utils import decode_json_column, encode_json_column
 
 logger = get_logger('memoire.mcp.storage')
 
+# Hot read queries, kept as constants so every call hits the statement cache
+_SELECT_CONTEXT = "SELECT * FROM contexts WHERE id = ?"
+_SELECT_CONTEXTS_BY_PROJECT = "SELECT * FROM contexts WHERE project_id = ? ORDER BY created_at DESC"
+_SELECT_CONTEXTS_BY_FRAGMENT = """
+    SELECT c.*
+    FROM context_fragments cf
+    JOIN contexts c ON c.id = cf.context_id
+    WHERE cf.fragment_id = ?
+"""
+_COUNT_CONTEXTS_BY_PROJECT = "SELECT COUNT(*) FROM contexts WHERE project_id = ?"
+_INSERT_CONTEXT_FRAGMENT = "INSERT OR IGNORE INTO context_fragments (fragment_id, context_id) VALUES (?, ?)"
+_DELETE_CONTEXT_FRAGMENTS = "DELETE FROM context_fragments WHERE context_id = ?"
+# Validates a whole result set in one call instead of one model call per row
+_CONTEXT_LIST = TypeAdapter(List[MemoryContext])
+_UPDATE_CONTEXT_FRAGMENTS = "UPDATE contexts SET fragment_ids = ?, fragment_count = ?, updated_at = ? WHERE id = ?"
+
 def create_context(db_path, context: MemoryContext) -> str:
     """Create a new context."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO contexts 
-            (id, project_id, name, description, fragment_ids, 
-             parent_context_id, child_context_ids, custom_fields, fragment_count, 
-             created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            context.id, context.project_id, context.name,
-            context.description, json.dumps(context.fragment_ids),
-            context.parent_context_id, json.dumps(context.child_context_ids),
-            json.dumps(context.custom_fields), context.fragment_count,
-            context.created_at.isoformat(), context.updated_at.isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute("""
+                INSERT INTO contexts 
+                (id, project_id, name, description, fragment_ids, 
+                 parent_context_id, child_context_ids, custom_fields, fragment_count, 
+                 created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                context.id, context.project_id, context.name,
+                context.description, encode_json_column(context.fragment_ids),
+                context.parent_context_id, encode_json_column(context.child_context_ids),
+                encode_json_column(context.custom_fields), context.fragment_count,
+                context.created_at.isoformat(), context.updated_at.isoformat()
+            ))
+            conn.executemany(_INSERT_CONTEXT_FRAGMENT,
+                             [(fragment_id, context.id) for fragment_id in context.fragment_ids])
         
         logger.info(f"Created context: {context.name} ({context.id})")
         return context.id
@@ -42,12 +58,8 @@ def create_context(db_path, context: MemoryContext) -> str:
 def get_context(db_path, context_id: str) -> Optional[MemoryContext]:
     """Get context by ID."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM contexts WHERE id = ?", (context_id,))
-        row = cursor.fetchone()
-        conn.close()
+        conn = get_connection(db_path)
+        row = conn.execute(_SELECT_CONTEXT, (context_id,)).fetchone()
         
         if not row:
             return None
@@ -61,18 +73,10 @@ def get_context(db_path, context_id: str) -> Optional[MemoryContext]:
 def list_contexts_by_project(db_path, project_id: str) -> List[MemoryContext]:
     """List all contexts for a project."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT * FROM contexts WHERE project_id = ? ORDER BY created_at DESC",
-            (project_id,)
-        )
-        rows = cursor.fetchall()
-        conn.close()
+        conn = get_connection(db_path)
+        rows = conn.execute(_SELECT_CONTEXTS_BY_PROJECT, (project_id,)).fetchall()
         
-        contexts = [_row_to_context(row) for row in rows]
-        return contexts
+        return _rows_to_contexts(rows)
     except Exception as e:
         logger.error(f"Error listing contexts for project {project_id}: {e}", exc_info=True)
         return []
@@ -80,46 +84,45 @@ def list_contexts_by_project(db_path, project_id: str) -> List[MemoryContext]:
 def get_contexts_by_fragment(db_path, fragment_id: str) -> List[MemoryContext]:
     """Get all contexts that contain a specific fragment."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Use json_each to properly search within the JSON array.
-        # This is more robust than INSTR.
-        cursor.execute("""
-            SELECT c.*
-            FROM contexts c, json_each(c.fragment_ids) j
-            WHERE j.value = ?
-        """, (fragment_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        conn = get_connection(db_path)
+        rows = conn.execute(_SELECT_CONTEXTS_BY_FRAGMENT, (fragment_id,)).fetchall()
         
-        contexts = [_row_to_context(row) for row in rows]
-        return contexts
+        return _rows_to_contexts(rows)
     except Exception as e:
         logger.error(f"Error getting contexts for fragment {fragment_id}: {e}", exc_info=True)
         return []
 
+def get_contexts_by_ids(db_path, context_ids: List[str]) -> List[MemoryContext]:
+    """Get several contexts by ID in one query; unknown IDs are skipped."""
+    if not context_ids:
+        return []
+    try:
+        conn = get_connection(db_path)
+        placeholders = ",".join("?" for _ in context_ids)
+        rows = conn.execute(f"SELECT * FROM contexts WHERE id IN ({placeholders})", context_ids).fetchall()
+        
+        return _rows_to_contexts(rows)
+    except Exception as e:
+        logger.error(f"Error getting contexts by IDs: {e}", exc_info=True)
+        return []
+
 def update_context_fragments(db_path, context_id: str, fragment_ids: List[str]) -> bool:
     """Update the fragment list for a context."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE contexts 
-            SET fragment_ids = ?, fragment_count = ?, updated_at = ?
-            WHERE id = ?
-        """, (
-            json.dumps(fragment_ids),
-            len(fragment_ids),
-            datetime.now().isoformat(),
-            context_id
-        ))
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.execute(_UPDATE_CONTEXT_FRAGMENTS, (
+                encode_json_column(fragment_ids),
+                len(fragment_ids),
+                datetime.now().isoformat(),
+                context_id
+            ))
+            if cursor.rowcount > 0:
+                conn.execute(_DELETE_CONTEXT_FRAGMENTS, (context_id,))
+                conn.executemany(_INSERT_CONTEXT_FRAGMENT,
+                                 [(fragment_id, context_id) for fragment_id in fragment_ids])
         
         success = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
         
         if success:
             logger.info(f"Updated context {context_id} with {len(fragment_ids)} fragments")
@@ -131,27 +134,55 @@ def update_context_fragments(db_path, context_id: str, fragment_ids: List[str])
         logger.error(f"Failed to update context fragments for {context_id}: {e}", exc_info=True)
         return False
 
+def update_contexts_fragments_bulk(db_path, updates: Dict[str, List[str]]) -> int:
+    """Replace the fragment lists of several contexts in one transaction.
+    
+    Args:
+        db_path: SQLite database path
+        updates: Context ID -> new fragment ID list
+    
+    Returns:
+        Number of contexts updated; unknown context IDs are skipped
+    """
+    if not updates:
+        return 0
+    try:
+        now = datetime.now().isoformat()
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.executemany(_UPDATE_CONTEXT_FRAGMENTS, [
+                (encode_json_column(fragment_ids), len(fragment_ids), now, context_id)
+                for context_id, fragment_ids in updates.items()
+            ])
+            updated = cursor.rowcount
+            conn.executemany(_DELETE_CONTEXT_FRAGMENTS, [(context_id,) for context_id in updates])
+            # Only contexts that exist get membership rows
+            conn.executemany(
+                "INSERT OR IGNORE INTO context_fragments (fragment_id, context_id) "
+                "SELECT ?, id FROM contexts WHERE id = ?",
+                [(fragment_id, context_id)
+                 for context_id, fragment_ids in updates.items()
+                 for fragment_id in fragment_ids]
+            )
+        
+        logger.info(f"Updated fragment lists of {updated} of {len(updates)} contexts")
+        return updated
+    except Exception as e:
+        logger.error(f"Failed to bulk update fragments of {len(updates)} contexts: {e}", exc_info=True)
+        return 0
+
 def count_contexts_by_project(db_path, project_id: str) -> int:
     """Count contexts for a project."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT COUNT(*) FROM contexts WHERE project_id = ?",
-            (project_id,)
-        )
-        count = cursor.fetchone()[0]
-        conn.close()
-        
-        return count
+        conn = get_connection(db_path)
+        return conn.execute(_COUNT_CONTEXTS_BY_PROJECT, (project_id,)).fetchone()[0]
     except Exception as e:
         logger.error(f"Error counting contexts for project {project_id}: {e}", exc_info=True)
         return 0
 
 def delete_context(db_path, qdrant_client, context_id: str) -> bool:
     """Delete a context and its associated fragments."""
-    from .fragment import delete_fragments
+    from .fragment import delete_fragment_points
     try:
         # Get context to find fragments and project
         context = get_context(db_path, context_id)
@@ -159,18 +190,34 @@ def delete_context(db_path, qdrant_client, context_id: str) -> bool:
             logger.warning(f"Context {context_id} not found for deletion.")
             return False
 
-        # Delete associated fragments if any
+        # Delete associated fragment vectors if any; the rows go regardless
         if context.fragment_ids:
             logger.info(f"Deleting {len(context.fragment_ids)} fragments associated with context {context_id}")
-            delete_fragments(db_path, qdrant_client, context.fragment_ids, context.project_id)
+            try:
+                delete_fragment_points(qdrant_client, context.fragment_ids, context.project_id)
+            except Exception as e:
+                logger.warning(f"Failed to delete vectors for context {context_id}: {e}")
 
-        # Delete the context itself
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM contexts WHERE id = ?", (context_id,))
+        return delete_context_rows(db_path, context_id, context.fragment_ids)
+    except Exception as e:
+        logger.error(f"Failed to delete context {context_id}: {e}", exc_info=True)
+        return False
+
+def delete_context_rows(db_path, context_id: str, fragment_ids: List[str]) -> bool:
+    """Delete a context and the given fragments from SQLite in one transaction.
+    
+    Qdrant is left untouched; pair with ``delete_fragment_points`` so the
+    two stores can be cleared concurrently.
+    """
+    from .fragment import delete_fragments_on
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            if fragment_ids:
+                delete_fragments_on(conn, fragment_ids)
+            cursor = conn.execute("DELETE FROM contexts WHERE id = ?", (context_id,))
+            conn.execute(_DELETE_CONTEXT_FRAGMENTS, (context_id,))
         success = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
 
         if success:
             logger.info(f"Successfully deleted context: {context_id}")
@@ -185,16 +232,25 @@ def delete_context(db_path, qdrant_client, context_id: str) -> bool:
 def _row_to_context(row) -> MemoryContext:
     """Convert SQLite row to MemoryContext object."""
     # No logger here as this is a pure utility function called from logged functions
-    return MemoryContext(
-        id=row[0],
-        project_id=row[1],
-        name=row[2],
-        description=row[3],
-        fragment_ids=json.loads(row[4]) if row[4] else [],
-        parent_context_id=row[5],
-        child_context_ids=json.loads(row[6]) if row[6] else [],
-        custom_fields=json.loads(row[7]) if row[7] else {},
-        fragment_count=row[8],
-        created_at=datetime.fromisoformat(row[9]) if row[9] else datetime.now(),
-        updated_at=datetime.fromisoformat(row[10]) if row[10] else datetime.now()
-    )
+    return MemoryContext.model_validate(_context_fields(row))
+
+def _rows_to_contexts(rows) -> List[MemoryContext]:
+    """Convert SQLite rows to MemoryContext objects in a single validation pass."""
+    return _CONTEXT_LIST.validate_python([_context_fields(row) for row in rows])
+
+def _context_fields(row) -> Dict[str, Any]:
+    """Map a contexts ``sqlite3.Row`` to MemoryContext field values."""
+    # Timestamps are passed as stored ISO text; the model parses them natively
+    return {
+        "id": row["id"],
+        "project_id": row["project_id"],
+        "name": row["name"],
+        "description": row["description"],
+        "fragment_ids": decode_json_column(row["fragment_ids"], list),
+        "parent_context_id": row["parent_context_id"],
+        "child_context_ids": decode_json_column(row["child_context_ids"], list),
+        "custom_fields": decode_json_column(row["custom_fields"], dict),
+        "fragment_count": row["fragment_count"],
+        "created_at": row["created_at"] or datetime.now(),
+        "updated_at": row["updated_at"] or datetime.now(),
+    }
@@ -1,21 +1,36 @@
 """Database initialization and common operations."""
 
 import sqlite3
+import weakref
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Set
 from qdrant_client import QdrantClient, models
 from qdrant_client.http.models import Distance, VectorParams
 
 from src.logging_config import get_logger
 from ...config import config
+from .pool import configure_connection, configure_database
+from .utils import content_fingerprint
 
 logger = get_logger('memoire.mcp.storage')
 
+# Stored in PRAGMA user_version; bumped when existing rows need a one-off rewrite
+_SCHEMA_VERSION = 2
+
+# Collections known to exist, per client, so fragment writes and searches
+# skip the get_collection round-trip once a collection has been seen
+_known_collections: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+
 def init_sqlite(db_path):
     """Create SQLite tables if they don't exist."""
     try:
         conn = sqlite3.connect(db_path)
-        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+        configure_database(conn)
+        configure_connection(conn)  # Also enables foreign key constraints
         cursor = conn.cursor()
+        user_version = cursor.execute("PRAGMA user_version").fetchone()[0]
         
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS projects (
@@ -40,10 +55,22 @@ def init_sqlite(db_path):
                 custom_fields TEXT,  -- JSON object
                 created_at TIMESTAMP,
                 updated_at TIMESTAMP,
+                content_hash TEXT,
                 FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
             )
         """)
         
+        # Databases created before content_hash existed get the column appended
+        fragment_columns = {row[1] for row in cursor.execute("PRAGMA table_info(fragments)")}
+        if "content_hash" not in fragment_columns:
+            cursor.execute("ALTER TABLE fragments ADD COLUMN content_hash TEXT")
+        
+        if user_version < 1:
+            # Hashes used to depend on whether blake3 was installed, and rows
+            # older than the column have none; recompute them all once
+            conn.create_function("content_fingerprint", 1, content_fingerprint, deterministic=True)
+            cursor.execute("UPDATE fragments SET content_hash = content_fingerprint(content)")
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS contexts (
                 id TEXT PRIMARY KEY,
@@ -62,6 +89,51 @@ def init_sqlite(db_path):
             )
         """)
         
+        # Fragment -> context membership, mirroring contexts.fragment_ids so
+        # lookups by fragment are an index seek instead of a JSON scan
+        has_context_fragments = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'context_fragments'"
+        ).fetchone() is not None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS context_fragments (
+                fragment_id TEXT NOT NULL,
+                context_id TEXT NOT NULL,
+                PRIMARY KEY (fragment_id, context_id),
+                FOREIGN KEY (context_id) REFERENCES contexts (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """)
+        if not has_context_fragments:
+            # Databases created before the table existed get it backfilled
+            cursor.execute("""
+                INSERT OR IGNORE INTO context_fragments (fragment_id, context_id)
+                SELECT j.value, c.id
+                FROM contexts c, json_each(c.fragment_ids) j
+                WHERE json_valid(c.fragment_ids)
+            """)
+        
+        # Context -> fragment index, mirroring fragments.context_ids (the
+        # contexts a fragment was stored under, which can differ from
+        # contexts.fragment_ids) so lookups by context are an index seek
+        has_fragment_contexts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fragment_contexts'"
+        ).fetchone() is not None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fragment_contexts (
+                context_id TEXT NOT NULL,
+                fragment_id TEXT NOT NULL,
+                PRIMARY KEY (context_id, fragment_id),
+                FOREIGN KEY (fragment_id) REFERENCES fragments (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """)
+        if not has_fragment_contexts:
+            # Databases created before the table existed get it backfilled
+            cursor.execute("""
+                INSERT OR IGNORE INTO fragment_contexts (context_id, fragment_id)
+                SELECT j.value, f.id
+                FROM fragments f, json_each(f.context_ids) j
+                WHERE json_valid(f.context_ids)
+            """)
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS anchors (
                 id TEXT PRIMARY KEY,
@@ -80,6 +152,28 @@ def init_sqlite(db_path):
                 FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
             )
         """)
+        
+        # Tag -> anchor index, mirroring anchors.tags so tag filters are an
+        # index seek instead of a JSON scan
+        has_anchor_tags = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'anchor_tags'"
+        ).fetchone() is not None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS anchor_tags (
+                tag TEXT NOT NULL,
+                anchor_id TEXT NOT NULL,
+                PRIMARY KEY (tag, anchor_id),
+                FOREIGN KEY (anchor_id) REFERENCES anchors (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """)
+        if not has_anchor_tags:
+            # Databases created before the table existed get it backfilled
+            cursor.execute("""
+                INSERT OR IGNORE INTO anchor_tags (tag, anchor_id)
+                SELECT j.value, a.id
+                FROM anchors a, json_each(a.tags) j
+                WHERE json_valid(a.tags)
+            """)
 
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS tasks (
@@ -94,13 +188,26 @@ def init_sqlite(db_path):
             )
         """)
         
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fragments_project ON fragments (project_id)")
+        # Serves project filters and the newest-first listing without a sort;
+        # supersedes the former single-column project index
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fragments_project_created ON fragments (project_id, created_at DESC)")
+        cursor.execute("DROP INDEX IF EXISTS idx_fragments_project")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_fragments_category ON fragments (category)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fragments_content_hash ON fragments (project_id, content_hash)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_contexts_project ON contexts (project_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_context_fragments_context ON context_fragments (context_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_fragment_contexts_fragment ON fragment_contexts (fragment_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_anchors_project ON anchors (project_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks (project_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
         
+        if user_version < 2:
+            # Foreign keys were not enforced before; clear out rows that
+            # outlived their parent so later writes don't trip the checks
+            _remove_orphaned_rows(cursor)
+        
+        cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        
         conn.commit()
         conn.close()
         
@@ -109,9 +216,50 @@ def init_sqlite(db_path):
         logger.error(f"Error initializing SQLite database at {db_path}: {e}", exc_info=True)
         raise
 
+def _remove_orphaned_rows(cursor: sqlite3.Cursor) -> None:
+    """Resolve every ``PRAGMA foreign_key_check`` violation as its ON DELETE action would.
+    
+    Rows whose parent is missing are deleted (cascading to their own
+    children), or have the reference set to NULL for ON DELETE SET NULL keys.
+    Expects foreign key enforcement to be on for the cursor's connection.
+    """
+    violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if not violations:
+        return
+    
+    counts = Counter((table, parent) for table, _, parent, _ in violations)
+    for (table, parent), count in sorted(counts.items()):
+        logger.warning(f"Cleaning up {count} orphaned {table} rows that reference missing {parent} rows")
+    
+    for table in dict.fromkeys(table for table, _, _, _ in violations):
+        for fk in cursor.execute(f"PRAGMA foreign_key_list({table})").fetchall():
+            parent, column, parent_column, on_delete = fk[2], fk[3], fk[4], fk[6]
+            missing_parent = f"{column} IS NOT NULL AND {column} NOT IN (SELECT {parent_column} FROM {parent})"
+            if on_delete == "SET NULL":
+                cursor.execute(f"UPDATE {table} SET {column} = NULL WHERE {missing_parent}")
+            else:
+                cursor.execute(f"DELETE FROM {table} WHERE {missing_parent}")
+    
+    remaining = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if remaining:
+        logger.error(f"{len(remaining)} foreign key violations remain after removing orphaned rows")
+
+@lru_cache(maxsize=1024)
+def project_collection_name(project_id: str) -> str:
+    """Name of the Qdrant collection holding a project's vectors."""
+    return f"project_{project_id.replace('-', '_')}"
+
+
 def get_or_create_collection(qdrant_client, project_id):
-    """Get or create Qdrant collection for a project."""
-    collection_name = f"project_{project_id.replace('-', '_')}"
+    """Get or create Qdrant collection for a project.
+    
+    Only the first call per collection and client asks Qdrant; later calls
+    are answered from memory until ``forget_collection`` is called.
+    """
+    collection_name = project_collection_name(project_id)
+    known = _known_collections.setdefault(qdrant_client, set())
+    if collection_name in known:
+        return collection_name
 
     # Get Qdrant config values
     hnsw_m = config.get("storage.qdrant.hnsw_m", 16)
@@ -140,7 +288,50 @@ def get_or_create_collection(qdrant_client, project_id):
             optimizers_config=models.OptimizersConfigDiff(
                 default_segment_number=optimizers_default_segment_number,  # Number of segments to optimize
             ),
+            quantization_config=quantization_config(),
         )
+        # Index the payload fields semantic_search filters on, so filtered
+        # HNSW search narrows candidates in the index instead of scanning.
+        # Local (embedded) Qdrant has no payload indexes and only warns.
+        if not _is_local_client(qdrant_client):
+            for field_name in ("category", "tags"):
+                qdrant_client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                )
         logger.info(f"Created new collection: {collection_name}")
     
-    return collection_name
\ No newline at end of file
+    known.add(collection_name)
+    return collection_name
+
+
+def forget_collection(qdrant_client, collection_name: str):
+    """Drop ``collection_name`` from the known collections after deleting it."""
+    known = _known_collections.get(qdrant_client)
+    if known is not None:
+        known.discard(collection_name)
+
+
+def quantization_config():
+    """Int8 scalar quantization for collections, or None when disabled in config.
+    
+    Qdrant keeps the quantized copy in RAM and scores candidates against it
+    (a quarter of the float32 memory traffic), then rescores the top hits
+    with the original vectors.
+    """
+    if not config.get("storage.qdrant.scalar_quantization", True):
+        return None
+    return models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=0.99,  # Clip outliers so the int8 range covers the bulk of values
+            always_ram=True,
+        )
+    )
+
+
+def _is_local_client(qdrant_client) -> bool:
+    """Whether the client runs Qdrant embedded in-process (path or :memory:)."""
+    from qdrant_client.local.qdrant_local import QdrantLocal
+    return isinstance(getattr(qdrant_client, "_client", None), QdrantLocal)
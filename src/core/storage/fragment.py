@@ -1,83 +1,136 @@
 """Fragment storage operations."""
 
-import json
-import sqlite3
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from src.logging_config import get_logger
 
 from qdrant_client.http.models import PointStruct
 from ...models import MemoryFragment
 from ...config import config
+from .context import _UPDATE_CONTEXT_FRAGMENTS
+from .pool import get_connection
+from .utils import decode_json_column, encode_json_column
 
 logger = get_logger('memoire.mcp.storage')
 
+# Columns MemoryFragment is built from, selected by name instead of SELECT *
+_FRAGMENT_COLUMNS = (
+    "id", "project_id", "content", "category", "tags", "source",
+    "context_ids", "anchor_ids", "custom_fields", "created_at", "updated_at", "content_hash"
+)
+_SELECT_COLUMNS = ", ".join(_FRAGMENT_COLUMNS)
+_SELECT_F_COLUMNS = ", ".join(f"f.{column}" for column in _FRAGMENT_COLUMNS)
+
+_SELECT_FRAGMENT = f"SELECT {_SELECT_COLUMNS} FROM fragments WHERE id = ?"
+_SELECT_FRAGMENT_PROJECT = "SELECT project_id FROM fragments WHERE id = ?"
+_SELECT_FRAGMENTS_BY_PROJECT = f"SELECT {_SELECT_COLUMNS} FROM fragments WHERE project_id = ? ORDER BY created_at DESC LIMIT ?"
+_SELECT_FRAGMENTS_BY_CONTEXT = f"""
+    SELECT {_SELECT_F_COLUMNS}
+    FROM fragment_contexts fc
+    JOIN fragments f ON f.id = fc.fragment_id
+    WHERE fc.context_id = ?
+    ORDER BY f.created_at
+"""
+_SELECT_FRAGMENTS_FOR_CONTEXT = f"""
+    SELECT {_SELECT_F_COLUMNS}
+    FROM contexts c
+    JOIN projects p ON p.id = c.project_id
+    JOIN fragment_contexts fc ON fc.context_id = c.id
+    JOIN fragments f ON f.id = fc.fragment_id
+    WHERE c.id = ? AND c.project_id = ?
+    ORDER BY f.created_at
+"""
+# IDs bound per IN (...) list; older SQLite builds allow 999 variables per statement
+_MAX_BOUND_IDS = 999
+_INSERT_FRAGMENT_CONTEXT = "INSERT OR IGNORE INTO fragment_contexts (context_id, fragment_id) VALUES (?, ?)"
+_UPDATE_FRAGMENT_LINKS = "UPDATE fragments SET context_ids = ?, anchor_ids = ?, updated_at = ? WHERE id = ?"
+
+_INSERT_FRAGMENT = """
+    INSERT INTO fragments 
+    (id, project_id, content, category, tags, source, 
+     context_ids, anchor_ids, custom_fields, created_at, updated_at, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 def store_fragment(db_path, qdrant_client, fragment: MemoryFragment, embedding: List[float]) -> str:
     """Store fragment in both SQLite and Qdrant."""
+    return store_fragments(db_path, qdrant_client, [fragment], [embedding])[0]
+
+def store_fragments(db_path, qdrant_client, fragments: List[MemoryFragment],
+                    embeddings: List[List[float]]) -> List[str]:
+    """Store several fragments in both SQLite and Qdrant.
+    
+    All rows are inserted in one transaction, and each project's vectors
+    go to Qdrant in a single upsert.
+    
+    Returns:
+        The fragment IDs, in input order
+    """
     from .db import get_or_create_collection
     
+    if not fragments:
+        return []
+    
     try:
         # Store metadata in SQLite
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO fragments 
-            (id, project_id, content, category, tags, source, 
-             context_ids, anchor_ids, custom_fields, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            fragment.id, fragment.project_id, fragment.content,
-            fragment.category, json.dumps(fragment.tags), fragment.source,
-            json.dumps(fragment.context_ids), json.dumps(fragment.anchor_ids),
-            json.dumps(fragment.custom_fields), fragment.created_at.isoformat(), fragment.updated_at.isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        conn = get_connection(db_path)
+        with conn:
+            conn.executemany(_INSERT_FRAGMENT, [
+                (
+                    fragment.id, fragment.project_id, fragment.content,
+                    fragment.category, encode_json_column(fragment.tags), fragment.source,
+                    encode_json_column(fragment.context_ids), encode_json_column(fragment.anchor_ids),
+                    encode_json_column(fragment.custom_fields), fragment.created_at.isoformat(), fragment.updated_at.isoformat(),
+                    fragment.content_hash
+                )
+                for fragment in fragments
+            ])
+            conn.executemany(_INSERT_FRAGMENT_CONTEXT, [
+                (context_id, fragment.id)
+                for fragment in fragments
+                for context_id in fragment.context_ids
+            ])
 
-        # Store embedding in Qdrant
-        collection_name = get_or_create_collection(qdrant_client, fragment.project_id)
-        
-        # Prepare payload for rich filtering capabilities
-        payload = {
-            "fragment_id": fragment.id,
-            "project_id": fragment.project_id,
-            "category": fragment.category,
-            "tags": fragment.tags,
-            "source": fragment.source,
-            "content_preview": fragment.content[:200],  # For quick reference
-            "created_at": fragment.created_at.isoformat(),
-            **fragment.custom_fields  # Merge custom fields directly
-        }
-
-        point = PointStruct(
-            id=fragment.id,
-            vector=embedding,
-            payload=payload
-        )
+        # Store embeddings in Qdrant, one request per project
+        points_by_project: Dict[str, List[PointStruct]] = {}
+        for fragment, embedding in zip(fragments, embeddings):
+            # Prepare payload for rich filtering capabilities
+            payload = {
+                "fragment_id": fragment.id,
+                "project_id": fragment.project_id,
+                "category": fragment.category,
+                "tags": fragment.tags,
+                "source": fragment.source,
+                "content_preview": fragment.content[:200],  # For quick reference
+                "created_at": fragment.created_at.isoformat(),
+                **fragment.custom_fields  # Merge custom fields directly
+            }
+            points_by_project.setdefault(fragment.project_id, []).append(
+                PointStruct(id=fragment.id, vector=embedding, payload=payload)
+            )
         
-        qdrant_client.upsert(
-            collection_name=collection_name,
-            points=[point]
-        )
+        for project_id, points in points_by_project.items():
+            collection_name = get_or_create_collection(qdrant_client, project_id)
+            qdrant_client.upsert(
+                collection_name=collection_name,
+                points=points
+            )
         
-        logger.info(f"Stored fragment: {fragment.id} in project {fragment.project_id}")
-        return fragment.id
+        if len(fragments) == 1:
+            logger.info(f"Stored fragment: {fragments[0].id} in project {fragments[0].project_id}")
+        else:
+            logger.info(f"Stored {len(fragments)} fragments in {len(points_by_project)} project(s)")
+        return [fragment.id for fragment in fragments]
     except Exception as e:
-        logger.error(f"Error storing fragment {fragment.id}: {e}", exc_info=True)
+        logger.error(f"Error storing {len(fragments)} fragment(s) starting with {fragments[0].id}: {e}", exc_info=True)
         raise
 
 def get_fragment(db_path, fragment_id: str) -> Optional[MemoryFragment]:
     """Get fragment by ID."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM fragments WHERE id = ?", (fragment_id,))
-        row = cursor.fetchone()
-        conn.close()
+        conn = get_connection(db_path)
+        row = conn.execute(_SELECT_FRAGMENT, (fragment_id,)).fetchone()
         
         if not row:
             return None
@@ -88,32 +141,116 @@ def get_fragment(db_path, fragment_id: str) -> Optional[MemoryFragment]:
         logger.error(f"Error getting fragment {fragment_id}: {e}", exc_info=True)
         return None
 
+def get_fragment_id_by_content_hash(db_path, project_id: str, content_hash: str) -> Optional[str]:
+    """Return the ID of a fragment in the project with this content hash, if any."""
+    try:
+        conn = get_connection(db_path)
+        row = conn.execute(
+            "SELECT id FROM fragments WHERE project_id = ? AND content_hash = ? LIMIT 1",
+            (project_id, content_hash)
+        ).fetchone()
+        
+        return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Error looking up fragment by content hash in project {project_id}: {e}", exc_info=True)
+        return None
+
+def get_fragment_ids_by_content_hashes(db_path, project_id: str, content_hashes: List[str]) -> Dict[str, str]:
+    """Map each content hash already stored in the project to a fragment ID holding it.
+    
+    Hashes are looked up in chunks of at most ``_MAX_BOUND_IDS``; hashes
+    with no fragment are left out of the result.
+    """
+    if not content_hashes:
+        return {}
+    try:
+        conn = get_connection(db_path)
+        found: Dict[str, str] = {}
+        for start in range(0, len(content_hashes), _MAX_BOUND_IDS):
+            chunk = content_hashes[start:start + _MAX_BOUND_IDS]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT content_hash, id FROM fragments WHERE project_id = ? AND content_hash IN ({placeholders})",
+                (project_id, *chunk)
+            )
+            for row in rows:
+                found.setdefault(row["content_hash"], row["id"])
+        return found
+    except Exception as e:
+        logger.error(f"Error looking up {len(content_hashes)} content hashes in project {project_id}: {e}", exc_info=True)
+        return {}
+
+def add_fragment_links(db_path, links: Dict[str, Tuple[List[str], List[str]]]) -> int:
+    """Merge context and anchor IDs into existing fragments, in one transaction.
+    
+    New IDs are appended to each fragment's ``context_ids``/``anchor_ids``
+    (existing ones are kept, duplicates skipped) and every context gets its
+    ``fragment_contexts`` row, so context lookups find the fragment.
+    
+    Args:
+        db_path: SQLite database path
+        links: Fragment ID -> (context IDs, anchor IDs) to add
+    
+    Returns:
+        Number of fragments whose links changed; unknown IDs are skipped
+    """
+    if not links:
+        return 0
+    try:
+        now = datetime.now().isoformat()
+        fragment_ids = list(links)
+        updates = []
+        memberships = []
+        conn = get_connection(db_path)
+        with conn:
+            for start in range(0, len(fragment_ids), _MAX_BOUND_IDS):
+                chunk = fragment_ids[start:start + _MAX_BOUND_IDS]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT id, context_ids, anchor_ids FROM fragments WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+                for row in rows:
+                    new_context_ids, new_anchor_ids = links[row["id"]]
+                    old_context_ids = decode_json_column(row["context_ids"], list)
+                    old_anchor_ids = decode_json_column(row["anchor_ids"], list)
+                    context_ids = list(dict.fromkeys(old_context_ids + list(new_context_ids)))
+                    anchor_ids = list(dict.fromkeys(old_anchor_ids + list(new_anchor_ids)))
+                    memberships.extend((context_id, row["id"]) for context_id in new_context_ids)
+                    if context_ids != old_context_ids or anchor_ids != old_anchor_ids:
+                        updates.append((encode_json_column(context_ids), encode_json_column(anchor_ids), now, row["id"]))
+            conn.executemany(_UPDATE_FRAGMENT_LINKS, updates)
+            conn.executemany(_INSERT_FRAGMENT_CONTEXT, memberships)
+        
+        if updates:
+            logger.info(f"Added context/anchor links to {len(updates)} existing fragments")
+        return len(updates)
+    except Exception as e:
+        logger.error(f"Failed to add links to {len(links)} fragments: {e}", exc_info=True)
+        return 0
+
 def delete_fragment(db_path, qdrant_client, fragment_id: str) -> bool:
     """Delete fragment from both SQLite and Qdrant."""
     from .db import get_or_create_collection
     
     try:
-        # First get the fragment to know which project/collection it belongs to
-        fragment = get_fragment(db_path, fragment_id)
-        if not fragment:
+        conn = get_connection(db_path)
+        
+        # Only the project is needed, to know which collection holds the vector
+        row = conn.execute(_SELECT_FRAGMENT_PROJECT, (fragment_id,)).fetchone()
+        if not row:
             logger.warning(f"Fragment {fragment_id} not found for deletion, cannot determine project for Qdrant deletion.")
             return False
+        project_id = row["project_id"]
         
         # Delete from SQLite
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM fragments WHERE id = ?", (fragment_id,))
-        sqlite_success = cursor.rowcount > 0
-        
-        conn.commit()
-        conn.close()
+        with conn:
+            sqlite_success = delete_fragments_on(conn, [fragment_id]) > 0
 
         # Delete from Qdrant
-        collection_name = get_or_create_collection(qdrant_client, fragment.project_id)
+        collection_name = get_or_create_collection(qdrant_client, project_id)
         qdrant_client.delete(
             collection_name=collection_name,
-            points_selector=[fragment.id]
+            points_selector=[fragment_id]
         )
         
         if sqlite_success:
@@ -131,23 +268,12 @@ def delete_fragments(db_path, qdrant_client, fragment_ids: List[str], project_id
     """Delete multiple fragments from both SQLite and Qdrant."""
     if not fragment_ids:
         return True
-    from .db import get_or_create_collection
     try:
         # Delete from SQLite
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        placeholders = ",".join("?" for _ in fragment_ids)
-        cursor.execute(f"DELETE FROM fragments WHERE id IN ({placeholders})", fragment_ids)
-        sqlite_success = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        sqlite_success = delete_fragment_rows(db_path, fragment_ids)
 
         # Delete from Qdrant
-        collection_name = get_or_create_collection(qdrant_client, project_id)
-        qdrant_client.delete(
-            collection_name=collection_name,
-            points_selector=fragment_ids
-        )
+        delete_fragment_points(qdrant_client, fragment_ids, project_id)
         
         logger.info(f"Attempted to delete {len(fragment_ids)} fragments from project {project_id}")
         return sqlite_success
@@ -155,21 +281,88 @@ def delete_fragments(db_path, qdrant_client, fragment_ids: List[str], project_id
         logger.error(f"Failed to delete fragments: {e}", exc_info=True)
         return False
 
+def delete_fragment_rows(db_path, fragment_ids: List[str]) -> bool:
+    """Delete fragments from SQLite only, in one transaction.
+    
+    Qdrant is left untouched; pair with ``delete_fragment_points`` so the
+    two stores can be cleared concurrently. IDs are bound in chunks that
+    stay under SQLite's limit on variables per statement.
+    
+    Returns:
+        True if at least one fragment was deleted
+    
+    Raises:
+        sqlite3.Error: If the transaction fails; nothing is deleted then
+    """
+    conn = get_connection(db_path)
+    with conn:
+        deleted = delete_fragments_on(conn, fragment_ids)
+    return deleted > 0
+
+def delete_fragments_on(conn, fragment_ids: List[str]) -> int:
+    """Delete fragments and every reference to them on ``conn``.
+    
+    Besides the rows themselves this removes their ``fragment_contexts``
+    and ``context_fragments`` memberships and drops them from the
+    ``fragment_ids`` lists of the contexts that held them. IDs are bound in
+    chunks of at most ``_MAX_BOUND_IDS``. Runs inside the caller's
+    transaction.
+    
+    Returns:
+        Number of fragment rows deleted
+    """
+    deleted = 0
+    context_ids = set()
+    for start in range(0, len(fragment_ids), _MAX_BOUND_IDS):
+        chunk = fragment_ids[start:start + _MAX_BOUND_IDS]
+        placeholders = ",".join("?" for _ in chunk)
+        context_ids.update(row[0] for row in conn.execute(
+            f"SELECT DISTINCT context_id FROM context_fragments WHERE fragment_id IN ({placeholders})", chunk
+        ))
+        deleted += conn.execute(f"DELETE FROM fragments WHERE id IN ({placeholders})", chunk).rowcount
+        conn.execute(f"DELETE FROM fragment_contexts WHERE fragment_id IN ({placeholders})", chunk)
+        conn.execute(f"DELETE FROM context_fragments WHERE fragment_id IN ({placeholders})", chunk)
+    
+    if context_ids:
+        removed = set(fragment_ids)
+        now = datetime.now().isoformat()
+        context_ids = list(context_ids)
+        updates = []
+        for start in range(0, len(context_ids), _MAX_BOUND_IDS):
+            chunk = context_ids[start:start + _MAX_BOUND_IDS]
+            placeholders = ",".join("?" for _ in chunk)
+            for row in conn.execute(f"SELECT id, fragment_ids FROM contexts WHERE id IN ({placeholders})", chunk):
+                remaining = [fid for fid in decode_json_column(row["fragment_ids"], list) if fid not in removed]
+                updates.append((encode_json_column(remaining), len(remaining), now, row["id"]))
+        conn.executemany(_UPDATE_CONTEXT_FRAGMENTS, updates)
+    return deleted
+
+def delete_fragment_points(qdrant_client, fragment_ids: List[str], project_id: str):
+    """Delete fragment vectors from the project's Qdrant collection in one request."""
+    from .db import get_or_create_collection
+    if not fragment_ids:
+        return
+    collection_name = get_or_create_collection(qdrant_client, project_id)
+    qdrant_client.delete(
+        collection_name=collection_name,
+        points_selector=fragment_ids
+    )
+
+def iter_fragments_by_project(db_path, project_id: str, limit: int = 100) -> Iterator[MemoryFragment]:
+    """Yield a project's fragments one at a time, newest first.
+
+    Rows are decoded as the cursor advances, so only one fragment is held in
+    memory at a time. Errors propagate to the caller.
+    """
+    conn = get_connection(db_path)
+    for row in conn.execute(_SELECT_FRAGMENTS_BY_PROJECT, (project_id, limit)):
+        yield _row_to_fragment(row)
+
 def list_fragments_by_project(db_path, project_id: str, limit: int = 100) -> List[MemoryFragment]:
     """List fragments for a project."""
     logger.debug(f"Entering list_fragments_by_project for project_id: {project_id}, limit: {limit}")
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT * FROM fragments WHERE project_id = ? ORDER BY created_at DESC LIMIT ?",
-            (project_id, limit)
-        )
-        rows = cursor.fetchall()
-        conn.close()
-        
-        fragments = [_row_to_fragment(row) for row in rows]
+        fragments = list(iter_fragments_by_project(db_path, project_id, limit))
         logger.debug(f"Found {len(fragments)} fragments for project {project_id}")
         return fragments
     except Exception as e:
@@ -181,38 +374,38 @@ def list_fragments_by_project(db_path, project_id: str, limit: int = 100) -> Lis
 def count_fragments_by_project(db_path, project_id: str) -> int:
     """Count fragments for a project."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
+        conn = get_connection(db_path)
+        count = conn.execute(
             "SELECT COUNT(*) FROM fragments WHERE project_id = ?",
             (project_id,)
-        )
-        count = cursor.fetchone()[0]
-        conn.close()
+        ).fetchone()[0]
         
         return count
     except Exception as e:
         logger.error(f"Error counting fragments for project {project_id}: {e}", exc_info=True)
         return 0
 
+def iter_fragments_by_ids(db_path, fragment_ids: List[str]) -> Iterator[MemoryFragment]:
+    """Yield the fragments with the given IDs one at a time.
+
+    IDs are looked up in chunks of at most ``_MAX_BOUND_IDS``; result order
+    is unspecified. Errors propagate to the caller.
+    """
+    conn = get_connection(db_path)
+    for start in range(0, len(fragment_ids), _MAX_BOUND_IDS):
+        chunk = fragment_ids[start:start + _MAX_BOUND_IDS]
+        placeholders = ','.join('?' for _ in chunk)
+        query = f"SELECT {_SELECT_COLUMNS} FROM fragments WHERE id IN ({placeholders})"
+        for row in conn.execute(query, chunk):
+            yield _row_to_fragment(row)
+
 def get_fragments_by_ids(db_path, fragment_ids: List[str]) -> List[MemoryFragment]:
     """Get multiple fragments by their IDs."""
     if not fragment_ids:
         return []
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        placeholders = ','.join('?' for _ in fragment_ids)
-        query = f"SELECT * FROM fragments WHERE id IN ({placeholders})"
-        
-        cursor.execute(query, fragment_ids)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        fragments = [_row_to_fragment(row) for row in rows]
-        return fragments
+        # Dedupe so an ID repeated across chunks is only returned once
+        return list(iter_fragments_by_ids(db_path, list(dict.fromkeys(fragment_ids))))
     except Exception as e:
         logger.error(f"Error getting fragments by IDs: {e}", exc_info=True)
         return []
@@ -220,18 +413,9 @@ def get_fragments_by_ids(db_path, fragment_ids: List[str]) -> List[MemoryFragmen
 def get_fragments_by_context(db_path, context_id: str) -> List[MemoryFragment]:
     """Get all fragments that are part of a specific context."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Use json_each to properly search within the JSON array of context_ids
-        cursor.execute("""
-            SELECT f.*
-            FROM fragments f, json_each(f.context_ids) j
-            WHERE j.value = ?
-        """, (context_id,))
+        conn = get_connection(db_path)
 
-        rows = cursor.fetchall()
-        conn.close()
+        rows = conn.execute(_SELECT_FRAGMENTS_BY_CONTEXT, (context_id,)).fetchall()
 
         fragments = [_row_to_fragment(row) for row in rows]
         return fragments
@@ -239,19 +423,37 @@ def get_fragments_by_context(db_path, context_id: str) -> List[MemoryFragment]:
         logger.error(f"Error getting fragments for context {context_id}: {e}", exc_info=True)
         return []
 
+def fetch_fragments_for_context(db_path, project_id: str, context_id: str) -> List[MemoryFragment]:
+    """Get the fragments of a context, provided the context belongs to ``project_id``.
+
+    The project/context check and the fragment fetch run as one statement;
+    an unknown project, unknown context or mismatched pair yields no rows.
+    """
+    try:
+        conn = get_connection(db_path)
+
+        rows = conn.execute(_SELECT_FRAGMENTS_FOR_CONTEXT, (context_id, project_id)).fetchall()
+
+        return [_row_to_fragment(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting fragments for context {context_id} in project {project_id}: {e}", exc_info=True)
+        return []
+
 def _row_to_fragment(row) -> MemoryFragment:
-    """Convert SQLite row to MemoryFragment object."""
+    """Convert a fragments ``sqlite3.Row`` to a MemoryFragment object."""
     # No logger here as this is a pure utility function called from logged functions
+    # Timestamps are passed as stored ISO text; the model parses them natively
     return MemoryFragment(
-        id=row[0],
-        project_id=row[1],
-        content=row[2],
-        category=row[3] or "general",
-        tags=json.loads(row[4]) if row[4] else [],
-        source=row[5] or "user",
-        context_ids=json.loads(row[6]) if row[6] else [],
-        anchor_ids=json.loads(row[7]) if row[7] else [],
-        custom_fields=json.loads(row[8]) if row[8] else {},
-        created_at=datetime.fromisoformat(row[9]) if row[9] else datetime.now(),
-        updated_at=datetime.fromisoformat(row[10]) if row[10] else datetime.now()
+        id=row["id"],
+        project_id=row["project_id"],
+        content=row["content"],
+        category=row["category"] or "general",
+        tags=decode_json_column(row["tags"], list),
+        source=row["source"] or "user",
+        context_ids=decode_json_column(row["context_ids"], list),
+        anchor_ids=decode_json_column(row["anchor_ids"], list),
+        custom_fields=decode_json_column(row["custom_fields"], dict),
+        created_at=row["created_at"] or datetime.now(),
+        updated_at=row["updated_at"] or datetime.now(),
+        content_hash=row["content_hash"]
     )
\ No newline at end of file
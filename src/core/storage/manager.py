@@ -1,12 +1,15 @@
 """Main storage manager class that integrates all storage operations."""
 
-import json
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from src.logging_config import get_logger
 
+import numpy as np
 from qdrant_client import QdrantClient
 
 from ...models import (
@@ -15,16 +18,19 @@ from ...models import (
 )
 
 from .db import init_sqlite, get_or_create_collection
-from .project import create_project, get_project, list_projects, delete_project, update_project
-from .fragment import store_fragment, get_fragment, delete_fragment, delete_fragments, list_fragments_by_project, count_fragments_by_project, get_fragments_by_context
-from .context import create_context, get_context, list_contexts_by_project, get_contexts_by_fragment, update_context_fragments, count_contexts_by_project
-from .anchor import create_anchor, get_anchor
+from .project import create_project, get_project, project_exists, list_projects, delete_project, delete_project_rows, delete_project_collection, update_project
+from .fragment import store_fragment, store_fragments, get_fragment, get_fragment_id_by_content_hash, get_fragment_ids_by_content_hashes, add_fragment_links, delete_fragment, delete_fragments, delete_fragment_rows, delete_fragment_points, iter_fragments_by_project, list_fragments_by_project, count_fragments_by_project, get_fragments_by_ids, get_fragments_by_context, fetch_fragments_for_context
+from .context import create_context, get_context, get_contexts_by_ids, list_contexts_by_project, get_contexts_by_fragment, update_context_fragments, update_contexts_fragments_bulk, count_contexts_by_project, delete_context_rows
+from .anchor import create_anchor, get_anchor, get_anchors_by_ids, list_anchors_by_tag
 from .task import create_task, get_task, list_tasks_by_project, update_task, delete_task
-from .search import semantic_search
-from .utils import get_stats, health_check
+from .search import semantic_search, semantic_search_batch, recommend_similar, fetch_project_vectors
+from .utils import get_stats, get_project_counts, health_check, optimize_storage
 
 logger = get_logger('memoire.mcp.storage')
 
+_PROJECTS_CACHE_TTL = 30.0  # Seconds a cached project list stays valid
+_PROJECT_MATRIX_CACHE_SIZE = 4  # Projects whose vector matrix is kept in memory
+
 class StorageManager:
     """Unified storage manager powered by Qdrant vector database."""
     
@@ -73,6 +79,26 @@ class StorageManager:
         # Initialize databases
         init_sqlite(self.db_path)
         
+        # Project list cache for global searches: (fetched_at, projects).
+        # Project writes bump the version so an in-flight refresh that started
+        # before the write is not stored.
+        self._projects_cache: Optional[Tuple[float, List[Project]]] = None
+        self._projects_version = 0
+        self._projects_lock = threading.Lock()
+        
+        # Bumped by every write that can change search results, so result
+        # caches can tell a stale entry from a current one. Writes run in
+        # worker threads, so the increment is locked to never lose a bump.
+        self.data_version = 0
+        self._data_version_lock = threading.Lock()
+        
+        # Per-project (ids, float16 vector matrix, previews) for analytics, in
+        # LRU order. Vector writes drop the project's entry and bump the
+        # version, so a matrix read before the write is not stored.
+        self._project_matrices: OrderedDict[str, Tuple[List[str], np.ndarray, List[str]]] = OrderedDict()
+        self._vectors_version = 0
+        self._matrices_lock = threading.Lock()
+        
         logger.info(f"StorageManager initialized with data_dir: {self.data_dir}, similarity_threshold: {self.similarity_threshold}")
 
     def _on_config_change(self, new_config):
@@ -91,43 +117,154 @@ class StorageManager:
     
     def create_project(self, project: Project) -> str:
         """Create a new project."""
-        return create_project(self.db_path, self.qdrant_client, project)
+        try:
+            return create_project(self.db_path, self.qdrant_client, project)
+        finally:
+            self._vectors_changed(project.id)
+            self._invalidate_projects_cache()
     
     def get_project(self, project_id: str) -> Optional[Project]:
         """Get project by ID."""
         return get_project(self.db_path, project_id)
     
+    def project_exists(self, project_id: str) -> bool:
+        """Check whether a project exists (an index probe, no row fetch)."""
+        return project_exists(self.db_path, project_id)
+    
     def list_projects(self) -> List[Project]:
-        """List all projects."""
-        return list_projects(self.db_path)
+        """List all projects, served from a short-lived cache."""
+        with self._projects_lock:
+            cached = self._projects_cache
+            version = self._projects_version
+        if cached is not None and time.monotonic() - cached[0] < _PROJECTS_CACHE_TTL:
+            return list(cached[1])
+        
+        projects = list_projects(self.db_path)
+        with self._projects_lock:
+            if version == self._projects_version:
+                self._projects_cache = (time.monotonic(), projects)
+        return list(projects)
+    
+    def _invalidate_projects_cache(self):
+        """Drop the cached project list after a project write."""
+        with self._projects_lock:
+            self._projects_cache = None
+            self._projects_version += 1
+        self._data_changed()
+    
+    def _data_changed(self):
+        """Mark cached search results as stale after a write."""
+        with self._data_version_lock:
+            self.data_version += 1
+    
+    def _vectors_changed(self, project_id: str = None):
+        """Drop the cached vector matrix of ``project_id`` (all projects if None)."""
+        with self._matrices_lock:
+            if project_id is None:
+                self._project_matrices.clear()
+            else:
+                self._project_matrices.pop(project_id, None)
+            self._vectors_version += 1
     
     def delete_project(self, project_id: str):
         """Delete a project and all its data."""
-        return delete_project(self.db_path, self.qdrant_client, project_id)
+        try:
+            return delete_project(self.db_path, self.qdrant_client, project_id)
+        finally:
+            self._vectors_changed(project_id)
+            self._invalidate_projects_cache()
+    
+    def delete_project_rows(self, project_id: str):
+        """Delete a project's SQLite data only; see ``delete_project_collection``."""
+        try:
+            return delete_project_rows(self.db_path, project_id)
+        finally:
+            self._invalidate_projects_cache()
+    
+    def delete_project_collection(self, project_id: str):
+        """Drop a project's Qdrant collection only."""
+        try:
+            return delete_project_collection(self.qdrant_client, project_id)
+        finally:
+            self._vectors_changed(project_id)
     
     def update_project(self, project: Project) -> bool:
         """Update an existing project."""
-        return update_project(self.db_path, project)
+        try:
+            return update_project(self.db_path, project)
+        finally:
+            self._invalidate_projects_cache()
     
     # ==================== FRAGMENT OPERATIONS ====================
     
     def store_fragment(self, fragment: MemoryFragment, embedding: List[float]) -> str:
         """Store fragment in both SQLite and Qdrant."""
         logger.debug(f"Calling sub-module store_fragment for fragment_id: {fragment.id}")
-        return store_fragment(self.db_path, self.qdrant_client, fragment, embedding)
+        try:
+            return store_fragment(self.db_path, self.qdrant_client, fragment, embedding)
+        finally:
+            self._vectors_changed(fragment.project_id)
+            self._data_changed()
+    
+    def store_fragments(self, fragments: List[MemoryFragment], embeddings: List[List[float]]) -> List[str]:
+        """Store several fragments with one SQLite transaction and one Qdrant upsert per project."""
+        try:
+            return store_fragments(self.db_path, self.qdrant_client, fragments, embeddings)
+        finally:
+            for project_id in {fragment.project_id for fragment in fragments}:
+                self._vectors_changed(project_id)
+            self._data_changed()
     
     def get_fragment(self, fragment_id: str) -> Optional[MemoryFragment]:
         """Get fragment by ID."""
         logger.debug(f"Calling sub-module get_fragment for fragment_id: {fragment_id}")
         return get_fragment(self.db_path, fragment_id)
     
+    def get_fragment_id_by_content_hash(self, project_id: str, content_hash: str) -> Optional[str]:
+        """Get the ID of an existing fragment with identical content in the project."""
+        return get_fragment_id_by_content_hash(self.db_path, project_id, content_hash)
+    
+    def get_fragment_ids_by_content_hashes(self, project_id: str, content_hashes: List[str]) -> Dict[str, str]:
+        """Map content hashes already stored in the project to the IDs of fragments holding them."""
+        return get_fragment_ids_by_content_hashes(self.db_path, project_id, content_hashes)
+    
+    def add_fragment_links(self, links: Dict[str, Tuple[List[str], List[str]]]) -> int:
+        """Merge context and anchor IDs into existing fragments."""
+        try:
+            return add_fragment_links(self.db_path, links)
+        finally:
+            self._data_changed()
+    
     def delete_fragment(self, fragment_id: str) -> bool:
         """Delete fragment from both SQLite and Qdrant."""
-        return delete_fragment(self.db_path, self.qdrant_client, fragment_id)
+        try:
+            return delete_fragment(self.db_path, self.qdrant_client, fragment_id)
+        finally:
+            self._vectors_changed()
+            self._data_changed()
     
     def delete_fragments(self, fragment_ids: List[str], project_id: str) -> bool:
         """Delete multiple fragments from both SQLite and Qdrant."""
-        return delete_fragments(self.db_path, self.qdrant_client, fragment_ids, project_id)
+        try:
+            return delete_fragments(self.db_path, self.qdrant_client, fragment_ids, project_id)
+        finally:
+            self._vectors_changed(project_id)
+            self._data_changed()
+    
+    def delete_fragment_rows(self, fragment_ids: List[str]) -> bool:
+        """Delete fragments from SQLite only; see ``delete_fragment_points``."""
+        try:
+            return delete_fragment_rows(self.db_path, fragment_ids)
+        finally:
+            self._data_changed()
+    
+    def delete_fragment_points(self, fragment_ids: List[str], project_id: str):
+        """Delete fragment vectors from Qdrant only; see ``delete_context_rows``."""
+        try:
+            return delete_fragment_points(self.qdrant_client, fragment_ids, project_id)
+        finally:
+            self._vectors_changed(project_id)
+            self._data_changed()
     
     def list_fragments_by_project(self, project_id: str, limit: int = None) -> List[MemoryFragment]:
         """List fragments for a project."""
@@ -138,6 +275,10 @@ class StorageManager:
             logger.debug(f"Limit not provided, using config value: {limit}")
         return list_fragments_by_project(self.db_path, project_id, limit)
 
+    def iter_fragments_by_project(self, project_id: str, limit: int) -> Iterator[MemoryFragment]:
+        """Yield a project's fragments one at a time without building a list."""
+        return iter_fragments_by_project(self.db_path, project_id, limit)
+
     def count_fragments_by_project(self, project_id: str) -> int:
         """Count fragments for a project."""
         return count_fragments_by_project(self.db_path, project_id)
@@ -146,6 +287,10 @@ class StorageManager:
         """Get all fragments for a given context ID."""
         return get_fragments_by_context(self.db_path, context_id)
 
+    def fetch_fragments_for_context(self, project_id: str, context_id: str) -> List[MemoryFragment]:
+        """Get a context's fragments in one query, or [] if the context is not in the project."""
+        return fetch_fragments_for_context(self.db_path, project_id, context_id)
+
     # ==================== SEARCH OPERATIONS ====================
     
     def semantic_search(self, query_embedding: List[float], options: SearchOptions) -> List[Tuple[str, float]]:
@@ -158,22 +303,71 @@ class StorageManager:
         """Complete search with fragment objects and context."""
         # Get semantic search results
         search_results = self.semantic_search(query_embedding, options)
-
-        # Fetch full fragment objects
+        return self._build_search_results(search_results)
+    
+    def search_fragments_batch(self, query_embeddings: List[List[float]],
+                               options: SearchOptions) -> List[List[SearchResult]]:
+        """Search one project for several query embeddings with a single Qdrant request."""
+        batch_results = semantic_search_batch(self.qdrant_client, query_embeddings, options)
+        return [self._build_search_results(search_results) for search_results in batch_results]
+    
+    def recommend_fragments(self, fragment_id: str, project_id: str, limit: int,
+                            similarity_threshold: float = None) -> List[SearchResult]:
+        """Fragments most similar to a stored fragment, excluding the fragment itself."""
+        search_results = recommend_similar(self.qdrant_client, project_id, fragment_id, limit, similarity_threshold)
+        return self._build_search_results(search_results)
+    
+    def get_project_matrix(self, project_id: str) -> Tuple[List[str], np.ndarray, List[str]]:
+        """All fragment IDs of a project with their vectors and content previews.
+        
+        The vectors are one contiguous, read-only float16 ``[N, D]`` matrix
+        whose rows line up with the IDs. It is cached until the project's
+        vectors change; callers must not modify the returned lists.
+        """
+        with self._matrices_lock:
+            cached = self._project_matrices.get(project_id)
+            if cached is not None:
+                self._project_matrices.move_to_end(project_id)
+                return cached
+            version = self._vectors_version
+        
+        ids, matrix, previews = fetch_project_vectors(self.qdrant_client, project_id, dtype=np.float16)
+        matrix.flags.writeable = False
+        entry = (ids, matrix, previews)
+        with self._matrices_lock:
+            if version == self._vectors_version:
+                self._project_matrices[project_id] = entry
+                while len(self._project_matrices) > _PROJECT_MATRIX_CACHE_SIZE:
+                    self._project_matrices.popitem(last=False)
+        return entry
+    
+    def _build_search_results(self, search_results: List[Tuple[str, float]]) -> List[SearchResult]:
+        """Fetch fragments, contexts and anchors for (fragment_id, similarity) hits.
+        
+        Each of the three is loaded with a single IN query; results keep the
+        order of ``search_results``.
+        """
+        if not search_results:
+            return []
+        
+        fragments = {
+            fragment.id: fragment
+            for fragment in get_fragments_by_ids(self.db_path, list({str(fid) for fid, _ in search_results}))
+        }
+        context_ids = {f.context_ids[0] for f in fragments.values() if f.context_ids}
+        contexts = {context.id: context for context in get_contexts_by_ids(self.db_path, list(context_ids))}
+        anchor_ids = {aid for f in fragments.values() for aid in f.anchor_ids}
+        anchors_by_id = {anchor.id: anchor for anchor in get_anchors_by_ids(self.db_path, list(anchor_ids))}
+        
         results = []
         for fragment_id, similarity in search_results:
-            fragment = self.get_fragment(fragment_id)
+            fragment = fragments.get(str(fragment_id))
             if fragment:
-                # Get context if fragment belongs to one
-                context = None
-                if fragment.context_ids:
-                    context = self.get_context(fragment.context_ids[0])
+                # Context of the fragment's first context ID, if any
+                context = contexts.get(fragment.context_ids[0]) if fragment.context_ids else None
                 
-                # Get anchors
-                anchors = []
-                if fragment.anchor_ids:
-                    anchors = [self.get_anchor(aid) for aid in fragment.anchor_ids]
-                    anchors = [a for a in anchors if a]  # Filter None
+                # Anchors that still exist
+                anchors = [anchors_by_id[aid] for aid in fragment.anchor_ids if aid in anchors_by_id]
                 
                 results.append(SearchResult(
                     fragment=fragment,
@@ -190,7 +384,10 @@ class StorageManager:
     
     def create_context(self, context: MemoryContext) -> str:
         """Create a new context."""
-        return create_context(self.db_path, context)
+        try:
+            return create_context(self.db_path, context)
+        finally:
+            self._data_changed()
     
     def get_context(self, context_id: str) -> Optional[MemoryContext]:
         """Get context by ID."""
@@ -208,7 +405,17 @@ class StorageManager:
     
     def update_context_fragments(self, context_id: str, fragment_ids: List[str]) -> bool:
         """Update fragment list for a context."""
-        return update_context_fragments(self.db_path, context_id, fragment_ids)
+        try:
+            return update_context_fragments(self.db_path, context_id, fragment_ids)
+        finally:
+            self._data_changed()
+    
+    def update_contexts_fragments_bulk(self, updates: Dict[str, List[str]]) -> int:
+        """Update fragment lists for several contexts in one transaction."""
+        try:
+            return update_contexts_fragments_bulk(self.db_path, updates)
+        finally:
+            self._data_changed()
 
     def count_contexts_by_project(self, project_id: str) -> int:
         """Count contexts for a project."""
@@ -217,17 +424,35 @@ class StorageManager:
     def delete_context(self, context_id: str) -> bool:
         """Delete a context and its associated fragments."""
         from .context import delete_context as delete_context_func
-        return delete_context_func(self.db_path, self.qdrant_client, context_id)
+        try:
+            return delete_context_func(self.db_path, self.qdrant_client, context_id)
+        finally:
+            self._vectors_changed()
+            self._data_changed()
+    
+    def delete_context_rows(self, context_id: str, fragment_ids: List[str]) -> bool:
+        """Delete a context and its fragments from SQLite in one transaction."""
+        try:
+            return delete_context_rows(self.db_path, context_id, fragment_ids)
+        finally:
+            self._data_changed()
     
     # ==================== ANCHOR OPERATIONS ====================
     
     def create_anchor(self, anchor: CognitiveAnchor) -> str:
         """Create a new cognitive anchor."""
-        return create_anchor(self.db_path, anchor)
+        try:
+            return create_anchor(self.db_path, anchor)
+        finally:
+            self._data_changed()
     
     def get_anchor(self, anchor_id: str) -> Optional[CognitiveAnchor]:
         """Get anchor by ID."""
         return get_anchor(self.db_path, anchor_id)
+    
+    def list_anchors_by_tag(self, project_id: str, tag: str) -> List[CognitiveAnchor]:
+        """List a project's anchors with a given tag."""
+        return list_anchors_by_tag(self.db_path, project_id, tag)
 
     # ==================== TASK OPERATIONS ====================
 
@@ -262,6 +487,14 @@ class StorageManager:
         """Get statistics for a project."""
         return get_stats(self.db_path, self.qdrant_client, project_id)
     
+    def get_project_counts(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Count contexts, fragments and tasks for a project in one query; None if it doesn't exist."""
+        return get_project_counts(self.db_path, project_id)
+    
     def health_check(self) -> Dict[str, Any]:
         """Check health of both storage systems."""
-        return health_check(self.db_path, self.qdrant_client)
\ No newline at end of file
+        return health_check(self.db_path, self.qdrant_client)
+    
+    def optimize_storage(self, vacuum: bool = False) -> Dict[str, Any]:
+        """Run SQLite PRAGMA optimize (and optionally VACUUM) and Qdrant optimization."""
+        return optimize_storage(self.db_path, self.qdrant_client, vacuum)
\ No newline at end of file
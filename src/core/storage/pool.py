@@ -0,0 +1,74 @@
+"""Per-thread SQLite connection pool."""
+
+import sqlite3
+import threading
+
+from src.logging_config import get_logger
+
+logger = get_logger('memoire.mcp.storage')
+
+# Stored in the database file itself, so applied once when the schema is set up
+_DATABASE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # Readers don't block the writer
+)
+
+# Per-connection settings, applied to every new connection
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "PRAGMA cache_size=-64000",  # 64 MB page cache
+    "PRAGMA mmap_size=268435456",  # Map up to 256 MB of the database file
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",  # Wait up to 5 s for another writer instead of failing
+    "PRAGMA foreign_keys=ON",  # Enforce the schema's ON DELETE CASCADE / SET NULL rules
+)
+
+# Compiled statements kept per connection; sqlite3 reuses them when the
+# same SQL text is executed again, so hot queries skip re-parsing
+_CACHED_STATEMENTS = 256
+
+_local = threading.local()
+
+
+def configure_database(conn: sqlite3.Connection):
+    """Apply the settings that persist in the database file (WAL journaling)."""
+    for pragma in _DATABASE_PRAGMAS:
+        conn.execute(pragma)
+
+
+def configure_connection(conn: sqlite3.Connection):
+    """Apply the per-connection performance settings to ``conn``."""
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def get_connection(db_path) -> sqlite3.Connection:
+    """Return this thread's connection to ``db_path``, opening it on first use.
+
+    Connections stay open for the life of the thread, so callers must not
+    close them. Rows come back as ``sqlite3.Row``, readable by column name.
+    Use ``with conn:`` around writes so a failed statement rolls back
+    instead of leaving a transaction open on the shared connection.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    key = str(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(db_path, cached_statements=_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        configure_connection(conn)
+        connections[key] = conn
+        logger.debug(f"Opened SQLite connection to {key} for thread {threading.current_thread().name}")
+    return conn
+
+
+def close_connections():
+    """Close the calling thread's pooled connections."""
+    connections = getattr(_local, "connections", None)
+    if not connections:
+        return
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
@@ -1,34 +1,32 @@
 """Project storage operations."""
 
 import json
-import sqlite3
 from datetime import datetime
 from typing import List, Optional
 
 from src.logging_config import get_logger
 from ...models import Project
+from .pool import get_connection
 
 logger = get_logger('memoire.mcp.storage')
 
+_PROJECT_EXISTS = "SELECT 1 FROM projects WHERE id = ? LIMIT 1"
+
 def create_project(db_path, qdrant_client, project: Project) -> str:
     """Create a new project."""
     from .db import get_or_create_collection
     
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO projects 
-            (id, name, description, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            project.id, project.name, project.description,
-            project.created_at.isoformat(), project.updated_at.isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute("""
+                INSERT INTO projects 
+                (id, name, description, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                project.id, project.name, project.description,
+                project.created_at.isoformat(), project.updated_at.isoformat()
+            ))
 
         # Create Qdrant collection
         get_or_create_collection(qdrant_client, project.id)
@@ -41,12 +39,8 @@ def create_project(db_path, qdrant_client, project: Project) -> str:
 def get_project(db_path, project_id: str) -> Optional[Project]:
     """Get project by ID."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
-        row = cursor.fetchone()
-        conn.close()
+        conn = get_connection(db_path)
+        row = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
         
         if not row:
             return None
@@ -57,15 +51,20 @@ def get_project(db_path, project_id: str) -> Optional[Project]:
         logger.error(f"Error getting project {project_id}: {e}", exc_info=True)
         return None
 
+def project_exists(db_path, project_id: str) -> bool:
+    """Check whether a project exists without fetching its row."""
+    try:
+        conn = get_connection(db_path)
+        return conn.execute(_PROJECT_EXISTS, (project_id,)).fetchone() is not None
+    except Exception as e:
+        logger.error(f"Error checking project {project_id}: {e}", exc_info=True)
+        return False
+
 def list_projects(db_path) -> List[Project]:
     """List all projects."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM projects ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        conn.close()
+        conn = get_connection(db_path)
+        rows = conn.execute("SELECT * FROM projects ORDER BY created_at DESC").fetchall()
         
         projects = [_row_to_project(row) for row in rows]
         return projects
@@ -76,12 +75,8 @@ def list_projects(db_path) -> List[Project]:
 def count_projects(db_path) -> int:
     """Count all projects."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM projects")
-        count = cursor.fetchone()[0]
-        conn.close()
+        conn = get_connection(db_path)
+        count = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
         
         return count
     except Exception as e:
@@ -90,46 +85,49 @@ def count_projects(db_path) -> int:
 
 def delete_project(db_path, qdrant_client, project_id: str):
     """Delete a project and all its data."""
-    # Delete from SQLite (cascade will handle related data)
+    delete_project_rows(db_path, project_id)
+    delete_project_collection(qdrant_client, project_id)
+    logger.info(f"Deleted project: {project_id}")
+
+def delete_project_rows(db_path, project_id: str):
+    """Delete a project from SQLite (cascade will handle related data)."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-        conn.commit()
-        conn.close()
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
     except Exception as e:
         logger.error(f"Error deleting project from SQLite {project_id}: {e}", exc_info=True)
 
-    # Delete Qdrant collection
+def delete_project_collection(qdrant_client, project_id: str):
+    """Drop a project's Qdrant collection."""
+    from .db import forget_collection, project_collection_name
+    
+    collection_name = project_collection_name(project_id)
+    # Forget it first, so a failed delete is re-checked on next use
+    forget_collection(qdrant_client, collection_name)
     try:
-        collection_name = f"project_{project_id.replace('-', '_')}"
         qdrant_client.delete_collection(collection_name)
     except Exception as e:
         logger.warning(f"Failed to delete Qdrant collection {collection_name}: {e}")
-    
-    logger.info(f"Deleted project: {project_id}")
 
 def update_project(db_path, project: Project) -> bool:
     """Update an existing project."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Update project with new data
-        cursor.execute("""
-            UPDATE projects 
-            SET name = ?, description = ?, updated_at = ?
-            WHERE id = ?
-        """, (
-            project.name,
-            project.description,
-            datetime.now().isoformat(),
-            project.id
-        ))
+        conn = get_connection(db_path)
+        with conn:
+            # Update project with new data
+            cursor = conn.execute("""
+                UPDATE projects 
+                SET name = ?, description = ?, updated_at = ?
+                WHERE id = ?
+            """, (
+                project.name,
+                project.description,
+                datetime.now().isoformat(),
+                project.id
+            ))
         
         affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
         
         if affected_rows > 0:
             logger.info(f"Updated project: {project.id}")
@@ -1,6 +1,8 @@
 """Search operations for vector database."""
 
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
 from qdrant_client import models
 
 from src.logging_config import get_logger
@@ -9,16 +11,8 @@ from ...config import config
 
 logger = get_logger('memoire.mcp.storage')
 
-def semantic_search(qdrant_client, query_embedding: List[float], options: SearchOptions) -> List[Tuple[str, float]]:
-    """Perform semantic search using Qdrant."""
-    from .db import get_or_create_collection
-    
-    if not options.project_id:
-        logger.error("semantic_search failed: Project ID is required.")
-        raise ValueError("Project ID required for search")
-    
-    collection_name = get_or_create_collection(qdrant_client, options.project_id)
-    
+def _build_filter(options: SearchOptions) -> Optional[models.Filter]:
+    """Qdrant filter for the category, tag and custom field filters of ``options``."""
     # Build filter conditions using Qdrant's powerful filtering
     filter_conditions = []
 
@@ -51,9 +45,20 @@ def semantic_search(qdrant_client, query_embedding: List[float], options: Search
             )
     
     # Combine all conditions with AND
-    query_filter = models.Filter(
-        must=filter_conditions
-    ) if filter_conditions else None
+    return models.Filter(must=filter_conditions) if filter_conditions else None
+
+
+def semantic_search(qdrant_client, query_embedding: List[float], options: SearchOptions) -> List[Tuple[str, float]]:
+    """Perform semantic search using Qdrant."""
+    from .db import get_or_create_collection
+    
+    if not options.project_id:
+        logger.error("semantic_search failed: Project ID is required.")
+        raise ValueError("Project ID required for search")
+    
+    collection_name = get_or_create_collection(qdrant_client, options.project_id)
+    
+    query_filter = _build_filter(options)
 
     # Perform the search
     try:
@@ -75,4 +80,117 @@ def semantic_search(qdrant_client, query_embedding: List[float], options: Search
         return results
     except Exception as e:
         logger.error(f"Qdrant search failed on collection {collection_name}: {e}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+
+def semantic_search_batch(qdrant_client, query_embeddings: List[List[float]],
+                          options: SearchOptions) -> List[List[Tuple[str, float]]]:
+    """Run several semantic searches against one project in a single Qdrant request.
+    
+    Every query shares the filters, limit and threshold of ``options``.
+    
+    Returns:
+        One list of (fragment_id, similarity) hits per query embedding, in order
+    """
+    from .db import get_or_create_collection
+    
+    if not options.project_id:
+        logger.error("semantic_search_batch failed: Project ID is required.")
+        raise ValueError("Project ID required for search")
+    
+    if not query_embeddings:
+        return []
+    
+    collection_name = get_or_create_collection(qdrant_client, options.project_id)
+    
+    query_filter = _build_filter(options)
+    requests = [
+        models.SearchRequest(
+            vector=query_embedding,
+            filter=query_filter,
+            limit=options.max_results,
+            score_threshold=options.similarity_threshold,
+            with_payload=False,
+            with_vector=False
+        )
+        for query_embedding in query_embeddings
+    ]
+    
+    try:
+        batch_results = qdrant_client.search_batch(
+            collection_name=collection_name,
+            requests=requests
+        )
+        return [[(hit.id, hit.score) for hit in hits] for hits in batch_results]
+    except Exception as e:
+        logger.error(f"Qdrant batch search failed on collection {collection_name}: {e}", exc_info=True)
+        raise
+
+def recommend_similar(qdrant_client, project_id: str, fragment_id: str, limit: int,
+                      score_threshold: float = None) -> List[Tuple[str, float]]:
+    """Find fragments similar to a stored fragment using its own vector in Qdrant.
+    
+    The source fragment is excluded server-side, so exactly ``limit`` other
+    fragments can come back without over-fetching.
+    """
+    from .db import get_or_create_collection
+    
+    collection_name = get_or_create_collection(qdrant_client, project_id)
+    
+    try:
+        recommendations = qdrant_client.recommend(
+            collection_name=collection_name,
+            positive=[fragment_id],
+            query_filter=models.Filter(
+                must_not=[models.HasIdCondition(has_id=[fragment_id])]
+            ),
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=False,
+            with_vectors=False
+        )
+        return [(hit.id, hit.score) for hit in recommendations]
+    except Exception as e:
+        logger.error(f"Qdrant recommend failed on collection {collection_name}: {e}", exc_info=True)
+        raise
+
+
+def fetch_project_vectors(qdrant_client, project_id: str, page_size: int = 256,
+                          dtype=np.float32) -> Tuple[List[str], np.ndarray, List[str]]:
+    """Read every fragment vector of a project from Qdrant.
+    
+    Returns:
+        Fragment IDs, a contiguous ``[N, D]`` matrix of ``dtype`` with one row per
+        ID, and the content preview stored with each point. Collections use
+        cosine distance, for which Qdrant normalizes vectors on write, so
+        every row is unit length and dot products are cosine similarities.
+    """
+    from .db import get_or_create_collection
+    
+    collection_name = get_or_create_collection(qdrant_client, project_id)
+    
+    ids: List[str] = []
+    vectors: List[List[float]] = []
+    previews: List[str] = []
+    offset = None
+    try:
+        while True:
+            points, offset = qdrant_client.scroll(
+                collection_name=collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=["content_preview"],
+                with_vectors=True
+            )
+            for point in points:
+                ids.append(str(point.id))
+                vectors.append(point.vector)
+                previews.append((point.payload or {}).get("content_preview", ""))
+            if offset is None:
+                break
+    except Exception as e:
+        logger.error(f"Qdrant scroll failed on collection {collection_name}: {e}", exc_info=True)
+        raise
+    
+    matrix = np.asarray(vectors, dtype=dtype) if vectors else np.empty((0, 0), dtype=dtype)
+    return ids, matrix, previews
@@ -1,11 +1,11 @@
 """Task storage operations."""
 
-import sqlite3
 from datetime import datetime
 from typing import List, Optional, Dict
 
 from src.logging_config import get_logger
 from ...models import Task, TaskStatus
+from .pool import get_connection
 
 logger = get_logger('memoire.mcp.storage')
 
@@ -24,14 +24,12 @@ def _row_to_task(row) -> Task:
 def create_task(db_path: str, task: Task) -> str:
     """Create a new task."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO tasks (id, project_id, title, description, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (task.id, task.project_id, task.title, task.description, task.status.value, task.created_at.isoformat(), task.updated_at.isoformat()))
-        conn.commit()
-        conn.close()
+        conn = get_connection(db_path)
+        with conn:
+            conn.execute("""
+                INSERT INTO tasks (id, project_id, title, description, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (task.id, task.project_id, task.title, task.description, task.status.value, task.created_at.isoformat(), task.updated_at.isoformat()))
         logger.info(f"Created task: {task.id}")
         return task.id
     except Exception as e:
@@ -41,11 +39,8 @@ def create_task(db_path: str, task: Task) -> str:
 def get_task(db_path: str, task_id: str) -> Optional[Task]:
     """Get a task by its ID."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cursor.fetchone()
-        conn.close()
+        conn = get_connection(db_path)
+        row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
         return _row_to_task(row) if row else None
     except Exception as e:
         logger.error(f"Error getting task {task_id}: {e}", exc_info=True)
@@ -54,14 +49,12 @@ def get_task(db_path: str, task_id: str) -> Optional[Task]:
 def list_tasks_by_project(db_path: str, project_id: str, status: Optional[TaskStatus] = None) -> List[Task]:
     """List all tasks for a project, optionally filtering by status."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        conn = get_connection(db_path)
         if status:
-            cursor.execute("SELECT * FROM tasks WHERE project_id = ? AND status = ? ORDER BY created_at DESC", (project_id, status.value))
+            cursor = conn.execute("SELECT * FROM tasks WHERE project_id = ? AND status = ? ORDER BY created_at DESC", (project_id, status.value))
         else:
-            cursor.execute("SELECT * FROM tasks WHERE project_id = ? ORDER BY created_at DESC", (project_id,))
+            cursor = conn.execute("SELECT * FROM tasks WHERE project_id = ? ORDER BY created_at DESC", (project_id,))
         rows = cursor.fetchall()
-        conn.close()
         return [_row_to_task(row) for row in rows]
     except Exception as e:
         logger.error(f"Error listing tasks for project {project_id}: {e}", exc_info=True)
@@ -71,16 +64,13 @@ def count_tasks_by_project(db_path: str, project_id: str) -> Dict[str, int]:
     """Count tasks for a project, grouped by status."""
     counts = {status.value: 0 for status in TaskStatus}
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
+        conn = get_connection(db_path)
+        rows = conn.execute("""
             SELECT status, COUNT(*)
             FROM tasks
             WHERE project_id = ?
             GROUP BY status
-        """, (project_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        """, (project_id,)).fetchall()
         for row in rows:
             counts[row[0]] = row[1]
         return counts
@@ -93,9 +83,6 @@ def update_task(db_path: str, task_id: str, title: Optional[str] = None, descrip
     if title is None and description is None and status is None:
         return False
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
         fields = []
         params = []
         if title is not None:
@@ -114,10 +101,10 @@ def update_task(db_path: str, task_id: str, title: Optional[str] = None, descrip
         query = f"UPDATE tasks SET {', '.join(fields)} WHERE id = ?"
         params.append(task_id)
         
-        cursor.execute(query, tuple(params))
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.execute(query, tuple(params))
         success = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
         
         if success:
             logger.info(f"Updated task: {task_id}")
@@ -129,12 +116,10 @@ def update_task(db_path: str, task_id: str, title: Optional[str] = None, descrip
 def delete_task(db_path: str, task_id: str) -> bool:
     """Delete a task."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
         success = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
         if success:
             logger.info(f"Deleted task: {task_id}")
         return success
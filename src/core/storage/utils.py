@@ -1,32 +1,80 @@
 """Utility functions for storage operations."""
 
+import hashlib
+import json
+import shutil
 import sqlite3
-from typing import Dict, Any
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional
 
 from src.logging_config import get_logger
+from ...models import TaskStatus
+from .pool import configure_connection, get_connection
 
 logger = get_logger('memoire.mcp.storage')
 
+# orjson is optional; it encodes and decodes the small JSON columns several
+# times faster than the stdlib
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# Project existence plus every per-project count in one statement
+_PROJECT_COUNTS_SQL = (
+    "SELECT EXISTS (SELECT 1 FROM projects WHERE id = :project_id), "
+    "(SELECT COUNT(*) FROM contexts WHERE project_id = :project_id), "
+    "(SELECT COUNT(*) FROM fragments WHERE project_id = :project_id)"
+    + "".join(
+        f", (SELECT COUNT(*) FROM tasks WHERE project_id = :project_id AND status = :{status.name.lower()})"
+        for status in TaskStatus
+    )
+)
+
+def encode_json_column(value: Any) -> str:
+    """Encode a list or dict for a JSON text column."""
+    return _json_dumps(value)
+
+def decode_json_column(value: Optional[str], empty: Callable[[], Any]) -> Any:
+    """Decode a JSON text column, skipping the parser for NULL, "[]" and "{}".
+    
+    Args:
+        value: Raw column value
+        empty: Factory for the value to return when there is nothing to decode
+    """
+    if not value or value == "[]" or value == "{}":
+        return empty()
+    return _json_loads(value)
+
+def content_fingerprint(text: str) -> str:
+    """Hex fingerprint of ``text``, as stored in ``fragments.content_hash``.
+    
+    Always blake2b, so stored fingerprints stay comparable whichever
+    optional hashing packages are installed.
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
 def get_stats(db_path, qdrant_client, project_id: str) -> Dict[str, int]:
     """Get statistics for a project."""
     stats = {}
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        conn = get_connection(db_path)
         
         # Count fragments
-        cursor.execute("SELECT COUNT(*) FROM fragments WHERE project_id = ?", (project_id,))
-        stats["fragments"] = cursor.fetchone()[0]
+        stats["fragments"] = conn.execute("SELECT COUNT(*) FROM fragments WHERE project_id = ?", (project_id,)).fetchone()[0]
         
         # Count contexts
-        cursor.execute("SELECT COUNT(*) FROM contexts WHERE project_id = ?", (project_id,))
-        stats["contexts"] = cursor.fetchone()[0]
+        stats["contexts"] = conn.execute("SELECT COUNT(*) FROM contexts WHERE project_id = ?", (project_id,)).fetchone()[0]
         
         # Count anchors
-        cursor.execute("SELECT COUNT(*) FROM anchors WHERE project_id = ?", (project_id,))
-        stats["anchors"] = cursor.fetchone()[0]
-        
-        conn.close()
+        stats["anchors"] = conn.execute("SELECT COUNT(*) FROM anchors WHERE project_id = ?", (project_id,)).fetchone()[0]
     except Exception as e:
         logger.error(f"Error getting SQLite stats for project {project_id}: {e}", exc_info=True)
         stats["fragments"] = -1
@@ -35,7 +83,8 @@ def get_stats(db_path, qdrant_client, project_id: str) -> Dict[str, int]:
 
     # Count vectors in Qdrant
     try:
-        collection_name = f"project_{project_id.replace('-', '_')}"
+        from .db import project_collection_name
+        collection_name = project_collection_name(project_id)
         collection_info = qdrant_client.get_collection(collection_name)
         stats["vectors"] = collection_info.points_count
     except Exception as e:
@@ -44,6 +93,29 @@ def get_stats(db_path, qdrant_client, project_id: str) -> Dict[str, int]:
     
     return stats
 
+def get_project_counts(db_path, project_id: str) -> Optional[Dict[str, Any]]:
+    """Count a project's contexts, fragments and tasks (by status) in one query.
+    
+    Returns:
+        Dictionary with "contexts", "fragments" and "tasks" counts, or None
+        if the project does not exist
+    """
+    try:
+        params = {"project_id": project_id}
+        params.update((status.name.lower(), status.value) for status in TaskStatus)
+        row = get_connection(db_path).execute(_PROJECT_COUNTS_SQL, params).fetchone()
+    except Exception as e:
+        logger.error(f"Error counting items for project {project_id}: {e}", exc_info=True)
+        return None
+    
+    if not row[0]:
+        return None
+    return {
+        "contexts": row[1],
+        "fragments": row[2],
+        "tasks": {status.value: count for status, count in zip(TaskStatus, row[3:])}
+    }
+
 def health_check(db_path, qdrant_client) -> Dict[str, Any]:
     """Check health of both storage systems."""
     health = {
@@ -54,12 +126,13 @@ def health_check(db_path, qdrant_client) -> Dict[str, Any]:
     
     # Check SQLite
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM projects")
-        project_count = cursor.fetchone()[0]
-        health["sqlite"] = {"status": "ok", "projects": project_count}
-        conn.close()
+        conn = get_connection(db_path)
+        project_count = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        health["sqlite"] = {
+            "status": "ok",
+            "projects": project_count,
+            "free_page_ratio": _free_page_ratio(conn)
+        }
     except Exception as e:
         logger.error(f"SQLite health check failed: {e}", exc_info=True)
         health["sqlite"]["error"] = str(e)
@@ -86,4 +159,84 @@ def health_check(db_path, qdrant_client) -> Dict[str, Any]:
         health["qdrant"]["error"] = str(e)
         health["status"] = "degraded"
     
-    return health
\ No newline at end of file
+    return health
+
+
+def _free_page_ratio(cursor) -> float:
+    """Fraction of SQLite pages on the freelist (reclaimable by VACUUM)."""
+    page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+    return freelist_count / page_count if page_count else 0.0
+
+
+def optimize_storage(db_path, qdrant_client, vacuum: bool = False) -> Dict[str, Any]:
+    """Optimize both storage systems.
+    
+    Always runs SQLite's ``PRAGMA optimize``. With ``vacuum=True`` the database
+    is also rebuilt with ``VACUUM``, provided the disk has room for the
+    temporary copy it needs. Qdrant collections get their optimizer and
+    quantization config re-applied, which lets the optimizer merge segments
+    left by deletions.
+    
+    Args:
+        db_path: Path to the SQLite database
+        qdrant_client: Qdrant client instance
+        vacuum: Also run VACUUM on the SQLite database
+        
+    Returns:
+        Dictionary with the outcome for each storage system
+    """
+    from qdrant_client import models
+    from ...config import config
+    from .db import quantization_config
+    
+    result = {
+        "sqlite": {"optimized": False, "vacuumed": False},
+        "qdrant": {"collections": 0}
+    }
+    
+    try:
+        # A dedicated connection, so VACUUM never runs on a pooled one
+        conn = sqlite3.connect(db_path)
+        configure_connection(conn)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA optimize")
+        result["sqlite"]["optimized"] = True
+        
+        if vacuum:
+            # VACUUM writes a full copy of the database before swapping it in
+            db_size = Path(db_path).stat().st_size
+            free_space = shutil.disk_usage(Path(db_path).parent).free
+            if free_space >= db_size * 1.2:
+                result["sqlite"]["free_page_ratio_before"] = _free_page_ratio(cursor)
+                cursor.execute("VACUUM")
+                result["sqlite"]["vacuumed"] = True
+                logger.info(f"SQLite VACUUM completed: {db_size} -> {Path(db_path).stat().st_size} bytes")
+            else:
+                logger.warning(f"Skipping SQLite VACUUM: {free_space} bytes free, need {int(db_size * 1.2)}")
+        
+        result["sqlite"]["free_page_ratio"] = _free_page_ratio(cursor)
+        conn.close()
+    except Exception as e:
+        logger.error(f"SQLite optimization failed: {e}", exc_info=True)
+        result["sqlite"]["error"] = str(e)
+    
+    try:
+        optimizers_config = models.OptimizersConfigDiff(
+            default_segment_number=config.get("storage.qdrant.optimizers_default_segment_number", 2)
+        )
+        # Also brings collections created before quantization was enabled up to date
+        quantization = quantization_config()
+        collections = qdrant_client.get_collections().collections
+        for collection in collections:
+            qdrant_client.update_collection(
+                collection_name=collection.name,
+                optimizers_config=optimizers_config,
+                quantization_config=quantization
+            )
+        result["qdrant"]["collections"] = len(collections)
+    except Exception as e:
+        logger.error(f"Qdrant optimization failed: {e}", exc_info=True)
+        result["qdrant"]["error"] = str(e)
+    
+    return result
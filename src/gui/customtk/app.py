@@ -422,7 +422,7 @@ class MemoireGUI:
             try:
                 from src.config import config
                 config._config = config._get_default_config()
-                config.save_config()
+                config.save_config(backup=True)
                 self.load_all_config_values()
                 self.update_status("Configuration reset to defaults")
                 self.toast.show_success("Configuration reset to defaults successfully")
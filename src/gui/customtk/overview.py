@@ -193,10 +193,8 @@ class OverviewTab:
             
             for project in projects:
                 try:
-                    fragments = self.storage.list_fragments_by_project(project.id, limit=10000)
-                    contexts = self.storage.list_contexts_by_project(project.id)
-                    total_fragments += len(fragments)
-                    total_contexts += len(contexts)
+                    total_fragments += self.storage.count_fragments_by_project(project.id)
+                    total_contexts += self.storage.count_contexts_by_project(project.id)
                 except Exception as e:
                     logger.warning(f"Error getting stats for project {project.id}: {e}")
             
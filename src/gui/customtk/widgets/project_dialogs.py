@@ -173,10 +173,8 @@ class DeleteProjectDialog(BaseDialog):
     def load_project_stats(self):
         """Load project statistics for confirmation dialog."""
         try:
-            fragments = self.storage.list_fragments_by_project(self.project.id, limit=10000)
-            contexts = self.storage.list_contexts_by_project(self.project.id)
-            self.fragments_count = len(fragments)
-            self.contexts_count = len(contexts)
+            self.fragments_count = self.storage.count_fragments_by_project(self.project.id)
+            self.contexts_count = self.storage.count_contexts_by_project(self.project.id)
         except Exception as e:
             logger.error(f"Error loading project stats: {e}")
     
@@ -400,13 +398,12 @@ class NewProjectDialog(BaseDialog):
         
         try:
             # Import here to avoid circular imports
-            from src.models import Project
+            from src.models import Project, uuid7
             from datetime import datetime
-            import uuid
             
             # Create new project object
             project = Project(
-                id=str(uuid.uuid4()),
+                id=uuid7(),
                 name=name,
                 description=description if description else None,
                 created_at=datetime.now(),
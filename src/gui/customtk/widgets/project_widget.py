@@ -35,10 +35,8 @@ class ProjectWidget(ctk.CTkFrame):
     def load_project_stats(self):
         """Load project statistics."""
         try:
-            fragments = self.storage.list_fragments_by_project(self.project.id, limit=10000)
-            contexts = self.storage.list_contexts_by_project(self.project.id)
-            self.fragments_count = len(fragments)
-            self.contexts_count = len(contexts)
+            self.fragments_count = self.storage.count_fragments_by_project(self.project.id)
+            self.contexts_count = self.storage.count_contexts_by_project(self.project.id)
         except Exception as e:
             logger.error(f"Error loading project stats: {e}")
     
@@ -201,8 +201,9 @@ class IngestionCurator:
                     except Exception as e:
                         logger.error(f"Failed to create new context '{name}': {e}", exc_info=True)
 
-        # 3. Create new fragments and group them by context
+        # 3. Create new fragments in one batch and group them by context
         fragments_by_context = defaultdict(list)
+        new_fragments = []
         if fragments_to_create:
             for fragment_data in fragments_to_create:
                 if not isinstance(fragment_data, dict):
@@ -223,33 +224,40 @@ class IngestionCurator:
                         context_map['general'] = general_id
                     context_id = context_map['general']
 
-                try:
-                    new_id = await self.memory_service.store_fragment(
-                        project_id=project_id, 
-                        content=content, 
-                        source="curated_ingestion",
-                        context_ids=[context_id]
-                    )
-                    created_fragment_ids.append(new_id)
-                    fragments_by_context[context_id].append(new_id)
-                except Exception as e:
-                    logger.error(f"Failed to store curated fragment: {e}", exc_info=True)
+                new_fragments.append({
+                    "content": content,
+                    "source": "curated_ingestion",
+                    "context_ids": [context_id]
+                })
+        
+        if new_fragments:
+            try:
+                stored = await self.memory_service.store_fragments(project_id, new_fragments)
+                for fragment, (fragment_id, created) in zip(new_fragments, stored):
+                    if fragment_id is None:
+                        continue
+                    # Deduplicated content still joins its context, but was not created here
+                    if created:
+                        created_fragment_ids.append(fragment_id)
+                    fragments_by_context[fragment["context_ids"][0]].append(fragment_id)
+            except Exception as e:
+                logger.error(f"Failed to store {len(new_fragments)} curated fragments: {e}", exc_info=True)
 
-        # 4. Update contexts with their new fragments
+        # 4. Update contexts with their new fragments, merged with the existing
+        # ones, in a single transaction
+        context_updates = {}
         for context_id, new_fragment_ids in fragments_by_context.items():
             if not new_fragment_ids:
                 continue
             try:
-                # It's better to get the existing fragments and append, rather than overwrite.
-                # However, the current logic assumes we are creating from scratch or replacing.
-                # For now, we will overwrite. A more robust solution would be to merge.
                 context = self.memory_service.get_context(context_id)
                 if context:
-                    all_fragment_ids = list(set(context.fragment_ids + new_fragment_ids))
-                    self.memory_service.storage.update_context_fragments(context_id, all_fragment_ids)
-                    logger.info(f"Updated context {context_id} with {len(new_fragment_ids)} new fragments.")
+                    context_updates[context_id] = list(set(context.fragment_ids + new_fragment_ids))
+                    logger.info(f"Updating context {context_id} with {len(new_fragment_ids)} new fragments.")
             except Exception as e:
                 logger.error(f"Failed to update context {context_id} with new fragments: {e}", exc_info=True)
+        if context_updates:
+            self.memory_service.storage.update_contexts_fragments_bulk(context_updates)
 
         result = {
             "created_fragment_ids": created_fragment_ids, 
@@ -3,6 +3,7 @@ Simplified natural language MCP handlers.
 The Cognitive Engine that interprets user intent and manages memory operations.
 """
 
+import asyncio
 import uuid
 from typing import Any, Dict, List, Optional, Union
 
@@ -33,7 +34,7 @@ class CognitiveEngine:
             if not self._is_valid_uuid(project_id):
                 return {"success": False, "error": f"Invalid format for project_id: '{project_id}'. Must be a valid UUID."}
             
-            if not self.server.memory.get_project(project_id):
+            if not await asyncio.to_thread(self.server.memory.project_exists, project_id):
                 return {"success": False, "error": f"Project with ID '{project_id}' not found."}
 
             # --- End Validation ---
@@ -67,7 +68,7 @@ class CognitiveEngine:
             validated_project_ids = None
             if project_ids:
                 ids_to_check = [project_ids] if isinstance(project_ids, str) else project_ids
-                all_projects = self.server.memory.list_projects()
+                all_projects = await asyncio.to_thread(self.server.memory.list_projects)
                 valid_id_set = {p.id for p in all_projects}
                 
                 validated_project_ids = [pid for pid in ids_to_check if pid in valid_id_set]
@@ -96,7 +97,7 @@ class CognitiveEngine:
     async def list_projects(self) -> List[Dict[str, str]]:
         """List all projects via the memory service."""
         try:
-            projects = self.server.memory.list_projects()
+            projects = await asyncio.to_thread(self.server.memory.list_projects)
             project_list = [{ "id": p.id, "name": p.name, "description": p.description } for p in projects]
             return project_list
         except Exception as e:
@@ -105,55 +106,55 @@ class CognitiveEngine:
 
     async def get_project_summary(self, project_id: str) -> Optional[Dict[str, int]]:
         """Get a summary of counts for a project."""
-        return self.server.memory.get_project_summary(project_id)
+        return await asyncio.to_thread(self.server.memory.get_project_summary, project_id)
 
     async def list_contexts(self, project_id: str) -> List[Dict[str, Any]]:
         """List all contexts for a given project ID."""
-        contexts = self.server.memory.list_contexts_by_project(project_id)
+        contexts = await asyncio.to_thread(self.server.memory.list_contexts_by_project, project_id)
         return [{k: v for k, v in c.dict().items() if k != 'fragment_ids'} for c in contexts]
 
     async def list_fragments_by_context(self, project_id: str, context_id: str) -> List[Dict[str, Any]]:
         """Get all fragments belonging to a specific context in a project."""
-        fragments = self.server.memory.get_fragments_by_context(project_id, context_id)
+        fragments = await asyncio.to_thread(self.server.memory.get_fragments_by_context, project_id, context_id)
         return [f.dict() for f in fragments]
 
     async def get_contexts_for_fragment(self, fragment_id: str) -> List[Dict[str, Any]]:
         """Get all contexts that contain a specific fragment."""
-        contexts = self.server.memory.get_contexts_by_fragment(fragment_id)
+        contexts = await asyncio.to_thread(self.server.memory.get_contexts_by_fragment, fragment_id)
         return [{k: v for k, v in c.dict().items() if k != 'fragment_ids'} for c in contexts]
 
     async def delete_fragment(self, fragment_id: str) -> bool:
         """Delete a fragment by its ID."""
-        return self.server.memory.delete_fragment(fragment_id)
+        return await asyncio.to_thread(self.server.memory.delete_fragment, fragment_id)
 
     async def delete_project(self, project_id: str) -> bool:
         """Delete a project by its ID."""
-        return self.server.memory.delete_project(project_id)
+        return await self.server.memory.delete_project(project_id)
 
     async def delete_context(self, project_id: str, context_id: str) -> bool:
         """Delete a context by its ID within a project."""
-        return self.server.memory.delete_context(project_id, context_id)
+        return await self.server.memory.delete_context(project_id, context_id)
 
     # ==================== TASK MANAGEMENT ====================
 
     async def create_task(self, project_id: str, title: str, description: str = "") -> Optional[str]:
         """Create a new task."""
-        return self.server.memory.create_task(project_id, title, description)
+        return await asyncio.to_thread(self.server.memory.create_task, project_id, title, description)
 
     async def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get a task by its ID."""
-        task = self.server.memory.get_task(task_id)
+        task = await asyncio.to_thread(self.server.memory.get_task, task_id)
         return task.model_dump(mode='json') if task else None
 
     async def list_tasks(self, project_id: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """List tasks for a project."""
-        tasks = self.server.memory.list_tasks(project_id, status)
+        tasks = await asyncio.to_thread(self.server.memory.list_tasks, project_id, status)
         return [t.model_dump(mode='json') for t in tasks]
 
     async def update_task(self, task_id: str, title: Optional[str] = None, description: Optional[str] = None, status: Optional[str] = None) -> bool:
         """Update a task."""
-        return self.server.memory.update_task(task_id, title, description, status)
+        return await asyncio.to_thread(self.server.memory.update_task, task_id, title, description, status)
 
     async def delete_task(self, task_id: str) -> bool:
         """Delete a task."""
-        return self.server.memory.delete_task(task_id)
+        return await asyncio.to_thread(self.server.memory.delete_task, task_id)
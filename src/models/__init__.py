@@ -9,12 +9,29 @@ This module defines the fundamental data structures that implement the core conc
 """
 
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
+import os
+import time
 import uuid
 
 
+def uuid7() -> str:
+    """Generate a time-ordered UUID (version 7) string.
+    
+    The leading 48 bits are the Unix time in milliseconds, so IDs created
+    later sort later and new rows land at the end of SQLite's primary-key
+    index instead of at random pages. The format is a regular dashed UUID.
+    """
+    value = int.from_bytes(os.urandom(10), "big")  # 80 random bits
+    value |= (time.time_ns() // 1_000_000) << 80
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # Version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
 # ProjectSettings removed - simplified single-user local system
 # Configuration now handled at application level
 
@@ -24,7 +41,7 @@ class Project(BaseModel):
     A project represents a separate semantic memory space for domain segregation.
     Simplified model for single-user local deployment.
     """
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     name: str
     description: str
     created_at: datetime = Field(default_factory=datetime.now)
@@ -58,6 +75,9 @@ class MemoryFragment(BaseModel):
     # System fields (not for user modification)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    # Fingerprint of content, used to skip duplicate ingestion. Internal: left
+    # out of serialized output and the JSON schema.
+    content_hash: SkipJsonSchema[Optional[str]] = Field(default=None, exclude=True)
     
     # Embedding stored separately in ChromaDB
     # embedding: List[float] - handled by storage layer
@@ -183,6 +203,7 @@ class Task(BaseModel):
 
 # Export all models
 __all__ = [
+    "uuid7",
     "Project", 
     "MemoryFragment", "MemoryContext", "CognitiveAnchor",
     "SearchOptions", "SearchResult", "Task", "TaskStatus"
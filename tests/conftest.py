@@ -0,0 +1,75 @@
+"""Shared fixtures: a throwaway StorageManager and a deterministic embedding service."""
+
+from typing import List
+
+import pytest
+
+from src.config import config
+from src.core.memory import search
+from src.core.storage import StorageManager
+from src.models import MemoryContext, Project
+
+DIMENSION = 4
+
+# Small vectors keep the in-memory Qdrant collections cheap; never saved to disk
+config.set("embedding.dimension", DIMENSION, save=False)
+
+
+class FakeEmbeddingService:
+    """Embeds text as a fixed vector derived from its length, without any API calls.
+    
+    Texts listed in ``failing`` get the zero vector, as ``batch_embeddings``
+    returns when the provider fails.
+    """
+    
+    model = "fake-embedding"
+    
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls: List[List[str]] = []
+    
+    def _embed(self, text: str) -> List[float]:
+        if text in self.failing:
+            return [0.0] * DIMENSION
+        return [1.0, float(len(text)), 0.5, 0.25]
+    
+    async def generate_embedding(self, text: str, task_type: str = None,
+                                 _skip_validation: bool = False) -> List[float]:
+        if not _skip_validation and (not text or text.isspace()):
+            raise ValueError("Text cannot be empty")
+        self.calls.append([text])
+        return self._embed(text)
+    
+    async def batch_embeddings(self, texts: List[str], task_type: str = None) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [self._embed(text) for text in texts]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """StorageManager over a temporary directory with project ``p1`` and contexts ``c1``-``c3``."""
+    manager = StorageManager(data_dir=str(tmp_path), use_memory=True)
+    manager.create_project(Project(id="p1", name="Project", description="Test project"))
+    for context_id in ("c1", "c2", "c3"):
+        manager.create_context(MemoryContext(id=context_id, project_id="p1", name=context_id))
+    yield manager
+    config.remove_observer(manager._on_config_change)
+
+
+@pytest.fixture
+def embedding_service():
+    return FakeEmbeddingService()
+
+
+@pytest.fixture
+def failing_embedding_service():
+    """Embedding service that cannot embed the text ``"broken"``."""
+    return FakeEmbeddingService(failing={"broken"})
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Search results are cached module-wide; keep tests independent."""
+    search._result_cache._entries.clear()
+    yield
+    search._result_cache._entries.clear()
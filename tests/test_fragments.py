@@ -0,0 +1,61 @@
+"""Tests for content-hash deduplication when storing fragments."""
+
+from src.core.memory import fragments
+from src.models import Project
+
+
+async def test_store_fragment_reuses_identical_content(storage, embedding_service):
+    first = await fragments.store_fragment(storage, embedding_service, "p1", "alpha", context_ids=["c1"])
+    second = await fragments.store_fragment(storage, embedding_service, "p1", "alpha",
+                                            context_ids=["c2"], anchor_ids=["a1"])
+    
+    assert second == first
+    # Only the first call needed an embedding
+    assert embedding_service.calls == [["alpha"]]
+    
+    fragment = storage.get_fragment(first)
+    assert fragment.context_ids == ["c1", "c2"]
+    assert fragment.anchor_ids == ["a1"]
+    assert fragment.content_hash and "content_hash" not in fragment.model_dump()
+    assert [f.id for f in storage.get_fragments_by_context("c2")] == [first]
+
+
+async def test_store_fragment_keeps_projects_apart(storage, embedding_service):
+    storage.create_project(Project(id="p2", name="Other", description="Other project"))
+    
+    first = await fragments.store_fragment(storage, embedding_service, "p1", "alpha")
+    other = await fragments.store_fragment(storage, embedding_service, "p2", "alpha")
+    
+    assert other != first
+
+
+async def test_store_fragments_reports_created_flags(storage, embedding_service):
+    existing = await fragments.store_fragment(storage, embedding_service, "p1", "alpha")
+    embedding_service.calls.clear()
+    
+    stored = await fragments.store_fragments(storage, embedding_service, "p1", [
+        {"content": "alpha", "context_ids": ["c3"]},
+        {"content": "beta", "context_ids": ["c1"]},
+        {"content": "beta", "context_ids": ["c2"]},
+    ])
+    
+    (alpha_id, alpha_created), (beta_id, beta_created), (beta_again_id, beta_again_created) = stored
+    assert (alpha_id, alpha_created) == (existing, False)
+    assert beta_created and not beta_again_created
+    assert beta_again_id == beta_id
+    # Duplicates within the batch are embedded once
+    assert embedding_service.calls == [["beta"]]
+    
+    assert storage.get_fragment(existing).context_ids == ["c3"]
+    assert storage.get_fragment(beta_id).context_ids == ["c1", "c2"]
+
+
+async def test_store_fragments_skips_failed_embeddings(storage, failing_embedding_service):
+    stored = await fragments.store_fragments(storage, failing_embedding_service, "p1", [
+        {"content": "broken"},
+        {"content": "fine"},
+    ])
+    
+    assert stored[0] == (None, False)
+    assert stored[1][1] is True
+    assert storage.get_fragment(stored[1][0]).content == "fine"
@@ -0,0 +1,98 @@
+"""Tests for search result caching and batch search."""
+
+import pytest
+
+from src.core.memory import fragments, search
+from src.core.memory.search import _normalize_query, _SearchResultCache
+from src.models import SearchOptions
+
+
+def _count_calls(monkeypatch, storage, name):
+    """Wrap ``storage.<name>`` and return the list its calls are recorded in."""
+    calls = []
+    original = getattr(storage, name)
+    
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+    
+    monkeypatch.setattr(storage, name, wrapper)
+    return calls
+
+
+def test_normalize_query_keeps_punctuation():
+    assert _normalize_query("  C++   Memory ") == "c++ memory"
+    assert len({_normalize_query(q) for q in ("C++ memory", "C# memory", "C memory")}) == 3
+
+
+def test_result_cache_does_not_collide_on_punctuation():
+    cache = _SearchResultCache()
+    namespace = ("model", ("p1",), "{}")
+    cache.put(namespace, "C++ memory", 1, ["cpp"])
+    
+    assert cache.get(namespace, "C memory", 1) is None
+    assert cache.get(namespace, "C# memory", 1) is None
+    assert cache.get(namespace, "c++   MEMORY", 1) == ["cpp"]
+
+
+def test_result_cache_is_scoped_by_namespace_and_version():
+    cache = _SearchResultCache()
+    namespace = ("model", ("p1",), "{}")
+    cache.put(namespace, "query", 1, ["old"])
+    
+    assert cache.get(namespace, "query", 2) is None
+    assert cache.get(("model", ("p2",), "{}"), "query", 1) is None
+    assert cache.get(namespace, "query", 1) == ["old"]
+
+
+async def test_search_results_are_reused_until_data_changes(storage, embedding_service, monkeypatch):
+    await fragments.store_fragment(storage, embedding_service, "p1", "first fragment")
+    searches = _count_calls(monkeypatch, storage, "search_fragments")
+    options = SearchOptions(similarity_threshold=0.0)
+    
+    first = await search.search_memory(storage, embedding_service, "fragment", options, "p1")
+    again = await search.search_memory(storage, embedding_service, "  FRAGMENT ", options, "p1")
+    assert len(searches) == 1
+    assert again == first
+    
+    version = storage.data_version
+    await fragments.store_fragment(storage, embedding_service, "p1", "second fragment")
+    assert storage.data_version > version
+    
+    updated = await search.search_memory(storage, embedding_service, "fragment", options, "p1")
+    assert len(searches) == 2
+    assert sum(len(results) for results in updated["p1"].values()) == 2
+
+
+async def test_batch_search_rejects_empty_queries(storage, embedding_service):
+    for queries in (["valid", ""], ["valid", "   "]):
+        with pytest.raises(ValueError):
+            await search.search_memory_batch(storage, embedding_service, queries, project_ids="p1")
+    assert embedding_service.calls == []
+
+
+async def test_batch_search_skips_failed_embeddings(storage, failing_embedding_service, monkeypatch):
+    embedding_service = failing_embedding_service
+    await fragments.store_fragment(storage, embedding_service, "p1", "stored fragment")
+    batches = _count_calls(monkeypatch, storage, "search_fragments_batch")
+    options = SearchOptions(similarity_threshold=0.0)
+    
+    results = await search.search_memory_batch(
+        storage, embedding_service, ["stored", "broken", "fragment"], options, "p1"
+    )
+    
+    assert len(results) == 3
+    assert results[1] == {}
+    assert results[0] and results[2]
+    # Only the two successfully embedded queries were sent to the vector store
+    assert len(batches) == 1 and len(batches[0][0]) == 2
+
+
+async def test_batch_search_with_only_failed_embeddings_does_not_search(storage, failing_embedding_service, monkeypatch):
+    embedding_service = failing_embedding_service
+    batches = _count_calls(monkeypatch, storage, "search_fragments_batch")
+    
+    results = await search.search_memory_batch(storage, embedding_service, ["broken"], project_ids="p1")
+    
+    assert results == [{}]
+    assert batches == []
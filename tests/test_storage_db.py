@@ -0,0 +1,97 @@
+"""Tests for SQLite schema migrations in init_sqlite."""
+
+import sqlite3
+
+import pytest
+
+from src.core.storage.db import _SCHEMA_VERSION, init_sqlite
+from src.core.storage.utils import content_fingerprint
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Database as written before the junction tables, content_hash and foreign key checks."""
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE projects (id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT,
+                               created_at TIMESTAMP, updated_at TIMESTAMP);
+        CREATE TABLE fragments (id TEXT PRIMARY KEY, project_id TEXT NOT NULL, content TEXT NOT NULL,
+                                category TEXT DEFAULT 'general', tags TEXT, source TEXT DEFAULT 'user',
+                                context_ids TEXT, anchor_ids TEXT, custom_fields TEXT,
+                                created_at TIMESTAMP, updated_at TIMESTAMP,
+                                FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE);
+        CREATE TABLE contexts (id TEXT PRIMARY KEY, project_id TEXT NOT NULL, name TEXT NOT NULL,
+                               description TEXT, fragment_ids TEXT, parent_context_id TEXT,
+                               child_context_ids TEXT, custom_fields TEXT, fragment_count INTEGER DEFAULT 0,
+                               created_at TIMESTAMP, updated_at TIMESTAMP,
+                               FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
+                               FOREIGN KEY (parent_context_id) REFERENCES contexts (id) ON DELETE SET NULL);
+        CREATE TABLE anchors (id TEXT PRIMARY KEY, project_id TEXT NOT NULL, title TEXT NOT NULL,
+                              description TEXT, priority TEXT DEFAULT 'medium', fragment_ids TEXT,
+                              context_ids TEXT, tags TEXT, access_count INTEGER DEFAULT 0, custom_fields TEXT,
+                              created_at TIMESTAMP, updated_at TIMESTAMP, last_accessed TIMESTAMP,
+                              FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE);
+        
+        INSERT INTO projects (id, name) VALUES ('p1', 'Project');
+        INSERT INTO fragments (id, project_id, content, context_ids)
+            VALUES ('f1', 'p1', 'alpha', '["c1"]'), ('f2', 'p1', 'beta', '["c1", "c2"]'),
+                   ('f3', 'deleted-project', 'gamma', '["c1"]');
+        INSERT INTO contexts (id, project_id, name, fragment_ids, parent_context_id)
+            VALUES ('c1', 'p1', 'First', '["f1", "f2"]', NULL),
+                   ('c2', 'p1', 'Second', 'not json', 'deleted-context');
+        INSERT INTO anchors (id, project_id, title, tags)
+            VALUES ('a1', 'p1', 'Anchor', '["x", "y"]'), ('a2', 'deleted-project', 'Orphan', '["z"]');
+    """)
+    conn.close()
+    return db_path
+
+
+def _rows(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.execute(sql).fetchall())
+    finally:
+        conn.close()
+
+
+def test_backfills_junction_tables(legacy_db):
+    init_sqlite(legacy_db)
+    
+    assert _rows(legacy_db, "SELECT fragment_id, context_id FROM context_fragments") == [
+        ("f1", "c1"), ("f2", "c1")
+    ]
+    assert _rows(legacy_db, "SELECT context_id, fragment_id FROM fragment_contexts") == [
+        ("c1", "f1"), ("c1", "f2"), ("c2", "f2")
+    ]
+    assert _rows(legacy_db, "SELECT tag, anchor_id FROM anchor_tags") == [("x", "a1"), ("y", "a1")]
+
+
+def test_fills_content_hashes(legacy_db):
+    init_sqlite(legacy_db)
+    
+    assert _rows(legacy_db, "SELECT content, content_hash FROM fragments") == [
+        ("alpha", content_fingerprint("alpha")), ("beta", content_fingerprint("beta"))
+    ]
+
+
+def test_removes_foreign_key_orphans(legacy_db):
+    init_sqlite(legacy_db)
+    
+    assert _rows(legacy_db, "PRAGMA foreign_key_check") == []
+    assert _rows(legacy_db, "SELECT id FROM fragments") == [("f1",), ("f2",)]
+    assert _rows(legacy_db, "SELECT id FROM anchors") == [("a1",)]
+    assert _rows(legacy_db, "SELECT id, parent_context_id FROM contexts") == [("c1", None), ("c2", None)]
+    assert _rows(legacy_db, "PRAGMA user_version") == [(_SCHEMA_VERSION,)]
+
+
+def test_is_idempotent(legacy_db):
+    init_sqlite(legacy_db)
+    conn = sqlite3.connect(legacy_db)
+    conn.execute("DELETE FROM context_fragments")
+    conn.commit()
+    conn.close()
+    
+    # Existing tables are not backfilled again
+    init_sqlite(legacy_db)
+    assert _rows(legacy_db, "SELECT * FROM context_fragments") == []